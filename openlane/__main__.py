@@ -22,6 +22,7 @@ from textwrap import dedent
 from functools import partial
 from typing import Tuple, Type, Optional, List, Union
 
+import click
 from click import Parameter, pass_context
 from cloup import (
     option,
@@ -44,7 +45,7 @@ from .logging import (
 )
 from . import common
 from .container import run_in_container
-from .plugins import discovered_plugins
+from .plugins import load_plugins
 from .config import Config, InvalidConfig
 from .common.cli import formatter_settings
 from .flows import Flow, SequentialFlow, FlowException, FlowError, cloup_flow_opts
@@ -62,8 +63,11 @@ def run(
     frm: Optional[str],
     to: Optional[str],
     skip: Tuple[str, ...],
+    parallel: bool,
+    incremental: bool,
     reproducible: Optional[str],
     with_initial_state: Optional[State],
+    profile_baseline: Optional[str],
     config_override_strings: List[str],
     _force_run_dir: Optional[str],
     _force_design_dir: Optional[str],
@@ -125,7 +129,10 @@ def run(
             frm=frm,
             to=to,
             skip=skip,
+            parallel=parallel,
+            incremental=incremental,
             with_initial_state=with_initial_state,
+            profile_baseline=profile_baseline,
             reproducible=reproducible,
             _force_run_dir=_force_run_dir,
         )
@@ -162,6 +169,7 @@ def print_version(ctx: Context, param: Parameter, value: bool):
 
     print(message)
 
+    discovered_plugins = load_plugins()
     if len(discovered_plugins) > 0:
         print("Discovered plugins:")
         for name, module in discovered_plugins.items():
@@ -228,7 +236,10 @@ def run_smoke_test(
             to=None,
             reproducible=None,
             skip=(),
+            parallel=False,
+            incremental=False,
             with_initial_state=None,
+            profile_baseline=None,
             config_override_strings=[],
             _force_run_dir=None,
             _force_design_dir=None,
@@ -249,6 +260,27 @@ def run_smoke_test(
     ctx.exit(status)
 
 
+def collect_garbage(
+    ctx: Context,
+    param: Parameter,
+    value: Optional[str],
+):
+    if value is None:
+        return
+
+    from .steps.object_store import ObjectStore, OBJECT_STORE_DIRNAME
+
+    if not os.path.isdir(os.path.join(value, OBJECT_STORE_DIRNAME)):
+        err(f"'{value}' is not a run directory with an object store.")
+        ctx.exit(-1)
+
+    removed, freed = ObjectStore(value).collect_garbage()
+    info(
+        f"Removed {removed} unreferenced objects, freeing {common.format_size(freed)}."
+    )
+    ctx.exit(0)
+
+
 def cli_in_container(
     ctx: Context,
     param: Parameter,
@@ -347,6 +379,14 @@ o = partial(option, show_default=True)
         help="Runs a basic OpenLane smoke test.",
         callback=run_smoke_test,
     ),
+    o(
+        "--gc",
+        type=click.Path(exists=True, file_okay=False, dir_okay=True),
+        default=None,
+        is_eager=True,
+        help="Removes all objects in a run directory's object store (see OPENLANE_OBJECT_STORE) that are no longer referenced by any step's output state, then exits.",
+        callback=collect_garbage,
+    ),
     constraint=mutually_exclusive,
 )
 @cloup_flow_opts(_enable_debug_flags=True, sequential_flow_reproducible=True)
@@ -373,6 +413,7 @@ def cli(ctx, /, **kwargs):
         "version",
         "bare_version",
         "smoke_test",
+        "gc",
     ]:
         if subcommand_flag in run_kwargs:
             del run_kwargs[subcommand_flag]
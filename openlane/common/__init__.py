@@ -17,8 +17,10 @@ Common Utilities Module
 
 A number of common utility functions and classes used throughout the codebase.
 """
-import os
 from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from deprecated.sphinx import deprecated
 
 from .tcl import TclUtils
 from .metrics import parse_metric_modifiers, aggregate_metrics
@@ -44,30 +46,59 @@ from .misc import (
     zip_first,
     format_size,
     format_elapsed_time,
+    get_cache_dir,
+    hash_file,
+    hash_file_memoized,
 )
+from .artifact_cache import ArtifactCache, set_artifact_cache, get_artifact_cache
+from .liberty import LibertyIndex, LibertyCell, get_liberty_index
 from .toolbox import Toolbox
 from .drc import DRC, Violation
+from .timing_paths import TimingPaths, TimingPath, TimingStage
+from .scheduler import (
+    ResourceScheduler,
+    ResourceHistory,
+    parse_size,
+    set_scheduler,
+    get_scheduler,
+)
 
 
 ## TPE
 
-TPE = ThreadPoolExecutor(max_workers=os.cpu_count())
+TPE: Optional[ThreadPoolExecutor] = None
 
 
+@deprecated(
+    version="2.0.0b16",
+    reason="Use get_scheduler().set_limits to change the number of CPU slots",
+    action="once",
+)
 def set_tpe(tpe: ThreadPoolExecutor):
     """
-    Allows replacing OpenLane's global ``ThreadPoolExecutor`` with a customized
-    one.
+    Allows replacing OpenLane's global ``ThreadPoolExecutor``, which OpenLane no
+    longer uses itself. The maximum worker count of ``tpe`` is also used as the
+    global scheduler's number of CPU slots.
 
-    :param tpe: The replacemend ThreadPoolExecutor
+    :param tpe: The replacement ThreadPoolExecutor
     """
     global TPE
     TPE = tpe
+    get_scheduler().set_limits(max_cpus=tpe._max_workers)
 
 
+@deprecated(
+    version="2.0.0b16",
+    reason="Use get_scheduler",
+    action="once",
+)
 def get_tpe() -> ThreadPoolExecutor:
     """
-    :returns: OpenLane's global ``ThreadPoolExecutor``
+    :returns: OpenLane's global ``ThreadPoolExecutor``, which OpenLane no longer
+        uses itself, created with as many workers as the global scheduler has CPU
+        slots
     """
     global TPE
+    if TPE is None:
+        TPE = ThreadPoolExecutor(max_workers=get_scheduler().max_cpus)
     return TPE
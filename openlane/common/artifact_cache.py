@@ -0,0 +1,223 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import os
+import json
+import stat
+import uuid
+import shutil
+import hashlib
+from threading import Lock
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+from .misc import mkdirp, get_cache_dir, hash_file
+from .scheduler import parse_size
+from ..logging import debug, warn
+from ..__version__ import __version__
+
+ARTIFACT_CACHE_ENV_VAR = "OPENLANE_ARTIFACT_CACHE"
+ARTIFACT_CACHE_SIZE_ENV_VAR = "OPENLANE_ARTIFACT_CACHE_SIZE"
+
+
+class ArtifactCache(object):
+    """
+    A persistent, content-addressed store for the artifacts created by the
+    :class:`Toolbox`, e.g. liberty files with cells removed, shared between
+    runs and processes.
+
+    Artifacts are keyed by the hashes of the files they were derived from and
+    the parameters used to derive them. Artifacts are restored by hard-linking
+    them (or copying them, where hard links are not possible) into the
+    toolbox's temporary directory, and are stored read-only so the links cannot
+    be used to corrupt the cache.
+
+    When the cache grows beyond ``max_size``, the least recently used artifacts
+    are evicted. Access is synchronized between processes using a lock file.
+
+    :param cache_dir: The directory in which to store the cache. If unset,
+        ``artifacts`` inside OpenLane's cache directory is used.
+    :param max_size: The maximum total size of the cached artifacts in bytes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_size: int = 4 * 1024 * 1024 * 1024,
+    ):
+        self.cache_dir = os.path.abspath(cache_dir or get_cache_dir("artifacts"))
+        self.max_size = max_size
+        self.__thread_lock = Lock()
+
+    @contextmanager
+    def __lock(self, exclusive: bool) -> Iterator[None]:
+        mkdirp(self.cache_dir)
+        with self.__thread_lock, open(os.path.join(self.cache_dir, ".lock"), "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def get_key(
+        self,
+        kind: str,
+        input_files: Iterable[str],
+        parameters: Iterable[str] = (),
+    ) -> str:
+        """
+        :param kind: The kind of artifact, e.g. the name of the function creating
+            it
+        :param input_files: The files the artifact is derived from. The order of
+            the files is ignored.
+        :param parameters: Any other strings affecting the content of the
+            artifact. The order of the parameters is ignored.
+        :returns: A hexadecimal cache key
+        """
+        key_material = json.dumps(
+            {
+                "kind": kind,
+                "openlane_version": __version__,
+                "inputs": sorted(hash_file(file) for file in input_files),
+                "parameters": sorted(parameters),
+            }
+        )
+        return hashlib.sha256(key_material.encode("utf8")).hexdigest()
+
+    def restore(self, key: str, target: str) -> bool:
+        """
+        Attempts to restore a cached artifact.
+
+        :param key: A key created using :meth:`get_key`
+        :param target: The path to restore the artifact to
+        :returns: Whether the artifact was found in the cache
+        """
+        entry_path = self.__entry_path(key)
+        with self.__lock(exclusive=False):
+            if not os.path.isfile(entry_path):
+                return False
+            try:
+                os.link(entry_path, target)
+            except OSError:
+                shutil.copyfile(entry_path, target)
+            try:
+                os.utime(entry_path)
+            except OSError:
+                pass
+        debug(f"Restored '{target}' from artifact cache entry '{entry_path}'.")
+        return True
+
+    def store(self, key: str, source: str):
+        """
+        Stores an artifact in the cache, evicting the least recently used
+        artifacts if the cache grows beyond its maximum size.
+
+        Failures are reported as warnings, as the cache is only an optimization.
+
+        :param key: A key created using :meth:`get_key`
+        :param source: The path to the artifact
+        """
+        entry_path = self.__entry_path(key)
+        staging_path = os.path.join(self.cache_dir, f".{key}.{uuid.uuid4().hex}")
+        try:
+            with self.__lock(exclusive=True):
+                if os.path.isfile(entry_path):
+                    return
+                mkdirp(os.path.dirname(entry_path))
+                shutil.copyfile(source, staging_path)
+                os.chmod(staging_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(staging_path, entry_path)
+                self.__evict()
+        except OSError as e:
+            warn(f"Failed to store '{source}' in the artifact cache: {e}")
+            try:
+                os.unlink(staging_path)
+            except FileNotFoundError:
+                pass
+
+    def __evict(self):
+        entries: List[Tuple[float, int, str]] = []
+        total_size = 0
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if prefix.startswith(".") or not os.path.isdir(prefix_dir):
+                continue
+            for entry in os.listdir(prefix_dir):
+                entry_path = os.path.join(prefix_dir, entry)
+                entry_stat = os.stat(entry_path)
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+                total_size += entry_stat.st_size
+
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+            debug(f"Evicting artifact cache entry '{entry_path}'.")
+            os.unlink(entry_path)
+            total_size -= size
+
+
+def _get_initial_artifact_cache() -> Optional[ArtifactCache]:
+    value = os.getenv(ARTIFACT_CACHE_ENV_VAR)
+    cache_dir: Optional[str] = None
+    if value is not None:
+        if value.lower() in ["0", "false", "no", "off"]:
+            return None
+        if value.lower() not in ["", "1", "true", "yes", "on"]:
+            cache_dir = value
+    cache = ArtifactCache(cache_dir)
+    if size := os.getenv(ARTIFACT_CACHE_SIZE_ENV_VAR):
+        try:
+            cache.max_size = parse_size(size)
+        except ValueError as e:
+            warn(f"Ignoring {ARTIFACT_CACHE_SIZE_ENV_VAR}: {e}")
+    return cache
+
+
+ARTIFACT_CACHE: Optional[ArtifactCache] = _get_initial_artifact_cache()
+
+
+def set_artifact_cache(cache: Optional[ArtifactCache]):
+    """
+    Replaces or disables (if set to ``None``) OpenLane's global toolbox
+    artifact cache.
+
+    The cache is enabled by default, unless the environment variable
+    ``OPENLANE_ARTIFACT_CACHE`` is set to ``0``. The variable may also be set
+    to a path to use as the cache directory. The maximum size of the cache
+    (4 GiB by default) may be set using ``OPENLANE_ARTIFACT_CACHE_SIZE``, e.g.
+    ``16G``.
+
+    :param cache: The replacement artifact cache
+    """
+    global ARTIFACT_CACHE
+    ARTIFACT_CACHE = cache
+
+
+def get_artifact_cache() -> Optional[ArtifactCache]:
+    """
+    :returns: OpenLane's global toolbox artifact cache, if enabled.
+    """
+    return ARTIFACT_CACHE
@@ -0,0 +1,571 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Fast scanning of Liberty files.
+
+Liberty files can be hundreds of megabytes large, so the functions in this
+module avoid parsing them line-by-line in Python: they operate on the raw bytes
+of memory-mapped files using compiled regular expressions, only tokenizing the
+groups they actually need to find the end of.
+
+Metadata that is frequently needed, such as the cells and operating conditions
+of a library, is stored in a persistent :class:`LibertyIndex` per file.
+"""
+from __future__ import annotations
+
+import os
+import re
+import json
+import mmap
+import uuid
+import multiprocessing
+from threading import Lock
+from decimal import Decimal, InvalidOperation
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .misc import mkdirp, get_cache_dir, hash_file
+from ..logging import debug
+
+# The header of a ``cell`` group, capturing its name. Starts with a literal so
+# the regular expression engine can skip ahead quickly: whether the header is
+# at the start of a line is checked separately (see :func:`get_indentation`).
+cell_header_rx = re.compile(rb'cell\s*\(\s*"?([^"()]*?)"?\s*\)\s*\{')
+# Tokens that affect brace balancing: strings and comments may contain braces
+# that have to be ignored.
+group_token_rx = re.compile(rb'"(?:[^"\\]|\\.)*"|/\*.*?\*/|[{}]', re.DOTALL)
+# Matches a span without strings or comments containing braces or escapes,
+# i.e., one where braces can simply be counted.
+plain_span_rx = re.compile(
+    rb'[^"/]*(?:(?:"[^"\\{}]*"|/\*[^*{}]*\*+(?:[^/*{}][^*{}]*\*+)*/|/(?!\*))[^"/]*)*'
+)
+
+Buffer = Union[bytes, mmap.mmap]
+
+# Below this total input size, the cost of starting worker processes outweighs
+# the benefit of processing files in parallel.
+PARALLEL_SIZE_THRESHOLD = 64 * 1024 * 1024
+
+
+@contextmanager
+def map_file(path: Union[str, os.PathLike]) -> Iterator[Buffer]:
+    """
+    Memory-maps a file for reading.
+
+    Falls back to reading the file into memory for files that cannot be
+    mapped, e.g. empty files.
+
+    :param path: The path to the file
+    :returns: A bytes-like object with the file's contents
+    """
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            yield f.read()
+            return
+        with buffer:
+            yield buffer
+
+
+def get_indentation(buffer: Buffer, offset: int) -> Optional[bytes]:
+    """
+    :param buffer: The contents of a Liberty file
+    :param offset: An offset in the buffer
+    :returns: The whitespace preceding the offset on its line, or ``None`` if
+        anything other than whitespace precedes it.
+    """
+    line_start = buffer.rfind(b"\n", 0, offset) + 1
+    indentation = buffer[line_start:offset]
+    if indentation.strip() != b"":
+        return None
+    return indentation
+
+
+def is_plain(buffer: Buffer) -> bool:
+    """
+    :param buffer: The contents of a Liberty file
+    :returns: Whether no string or comment in the buffer contains a brace, in
+        which case the ends of groups can be found by simply counting braces.
+    """
+    return plain_span_rx.match(buffer).end() == len(buffer)
+
+
+def find_group_end(buffer: Buffer, open_brace: int, plain: bool = False) -> int:
+    """
+    :param buffer: The contents of a Liberty file
+    :param open_brace: The offset of the opening brace of a group
+    :param plain: Whether the buffer is known to be plain (see
+        :func:`is_plain`.) Otherwise, the group is checked on its own.
+    :returns: The offset right after the group's matching closing brace, or
+        the length of the buffer if the group is never closed.
+    """
+    # Fast path: count braces using bytes methods, then check that no string
+    # or comment in the group could have thrown the count off
+    depth = 0
+    position = open_brace
+    while (close_brace := buffer.find(b"}", position)) != -1:
+        depth += buffer[position:close_brace].count(b"{") - 1
+        position = close_brace + 1
+        if depth == 0:
+            if plain or (
+                plain_span_rx.match(buffer, open_brace, position).end() == position
+            ):
+                return position
+            break
+
+    depth = 0
+    for token in group_token_rx.finditer(buffer, open_brace):
+        character = buffer[token.start()]
+        if character == ord("{"):
+            depth += 1
+        elif character == ord("}"):
+            depth -= 1
+            if depth == 0:
+                return token.end()
+    return len(buffer)
+
+
+def remove_cells(
+    input_path: Union[str, os.PathLike],
+    output_path: Union[str, os.PathLike],
+    excluded_cells: Collection[str],
+    cells: Optional[Sequence[LibertyCell]] = None,
+) -> int:
+    """
+    Writes a copy of a Liberty file with some cells removed. Each removed cell
+    is replaced with a comment, i.e., ``/* removed <name> */``.
+
+    The spans between removed cells are copied without being decoded or
+    tokenized.
+
+    :param input_path: The input Liberty file
+    :param output_path: The output Liberty file
+    :param excluded_cells: The names of the cells to remove
+    :param cells: The excluded cells' entries in the file's
+        :class:`LibertyIndex`, if available, in which case the file is not
+        scanned for them.
+    :returns: The number of cells removed
+    """
+    excluded = {cell.encode("utf8") for cell in excluded_cells}
+    removed = 0
+    with map_file(input_path) as buffer, open(output_path, "wb") as out:
+        view = memoryview(buffer)
+        try:
+            position = 0
+            for name, start, end in _find_excluded_cells(buffer, excluded, cells):
+                if start < position:
+                    # Inside a cell that has just been removed
+                    continue
+                whitespace = get_indentation(buffer, start)
+                if whitespace is None:
+                    continue
+                out.write(view[position : start - len(whitespace)])
+                out.write(whitespace + b"/* removed " + name + b" */\n")
+                removed += 1
+
+                # Like a line-based filter, drop the rest of the line the group
+                # ends on
+                line_end = buffer.find(b"\n", end)
+                position = len(buffer) if line_end == -1 else line_end + 1
+            out.write(view[position:])
+        finally:
+            view.release()
+    return removed
+
+
+def _find_excluded_cells(
+    buffer: Buffer,
+    excluded: Collection[bytes],
+    cells: Optional[Sequence[LibertyCell]],
+) -> Iterator[Tuple[bytes, int, int]]:
+    # Yields the names, starts and ends of the excluded cells, in order
+    if cells is not None:
+        for cell in sorted(cells, key=lambda cell: cell.start):
+            yield cell.name.encode("utf8"), cell.start, cell.end
+        return
+    for header in cell_header_rx.finditer(buffer):
+        if header[1] not in excluded:
+            continue
+        yield header[1], header.start(), find_group_end(buffer, header.end() - 1)
+
+
+def remove_cells_parallel(
+    jobs: Sequence[Tuple[str, str]],
+    excluded_cells: Collection[str],
+    max_workers: int = 1,
+    cells: Optional[Sequence[Optional[Sequence[LibertyCell]]]] = None,
+) -> List[int]:
+    """
+    Runs :func:`remove_cells` for multiple Liberty files, using up to
+    ``max_workers`` worker processes if the files are large enough for it to
+    be worthwhile.
+
+    :param jobs: A list of tuples of input and output paths
+    :param excluded_cells: The names of the cells to remove
+    :param max_workers: The maximum number of worker processes
+    :param cells: For each job, the ``cells`` argument of :func:`remove_cells`
+    :returns: The number of cells removed from each file
+    """
+    cells = cells or [None] * len(jobs)
+    max_workers = min(max_workers, len(jobs))
+    total_size = sum(os.path.getsize(input_path) for input_path, _ in jobs)
+    if max_workers <= 1 or total_size < PARALLEL_SIZE_THRESHOLD:
+        return [
+            remove_cells(input_path, output_path, excluded_cells, job_cells)
+            for (input_path, output_path), job_cells in zip(jobs, cells)
+        ]
+
+    # Scanning is CPU-bound and holds the GIL, so processes are used instead of
+    # threads. "spawn" is used as flows are multithreaded.
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = [
+            executor.submit(
+                remove_cells, input_path, output_path, excluded_cells, job_cells
+            )
+            for (input_path, output_path), job_cells in zip(jobs, cells)
+        ]
+        return [future.result() for future in futures]
+
+
+## Index
+
+library_header_rx = re.compile(rb'library\s*\(\s*("?[^"()]*"?)\s*\)\s*\{')
+# Whitespace, comments and line continuations between items of a group
+separator_rx = re.compile(rb"(?:\s+|/\*.*?\*/|\\\r?\n)*", re.DOTALL)
+item_name_rx = re.compile(rb"([A-Za-z_][\w.]*)\s*(:|\()")
+simple_value_rx = re.compile(rb'\s*("(?:[^"\\]|\\.)*"|[^;\n]*?)\s*(?:;|\n|$)')
+complex_value_rx = re.compile(rb'((?:"(?:[^"\\]|\\.)*"|[^")])*)\)\s*(\{)?\s*;?')
+statement_end_rx = re.compile(rb"[^;\n]*[;\n]?")
+
+LIBERTY_INDEX_VERSION = 1
+
+
+class LibertyItem(NamedTuple):
+    """
+    A simple attribute, complex attribute or group inside a Liberty group.
+
+    :param name: The name of the item, e.g. ``cell`` or ``area``
+    :param value: The value of a simple attribute or the arguments of a
+        complex attribute or group, with quotes removed from single values
+    :param start: The offset of the start of the item in the buffer
+    :param end: The offset right after the end of the item in the buffer
+    :param body_start: For groups, the offset of the opening brace, otherwise
+        ``-1``
+    """
+
+    name: str
+    value: str
+    start: int
+    end: int
+    body_start: int = -1
+
+    @property
+    def is_group(self) -> bool:
+        return self.body_start != -1
+
+
+def _decode(value: bytes) -> str:
+    value = value.strip()
+    if len(value) >= 2 and value[:1] == b'"' and value[-1:] == b'"':
+        value = value[1:-1]
+    return value.decode("utf8", errors="replace")
+
+
+def iter_group_items(
+    buffer: Buffer,
+    start: int,
+    end: int,
+    plain: bool = False,
+) -> Iterator[LibertyItem]:
+    """
+    Iterates over the items of a Liberty group without descending into nested
+    groups, which are skipped using :func:`find_group_end`.
+
+    Statements that cannot be parsed are skipped.
+
+    :param buffer: The contents of a Liberty file
+    :param start: The offset at which to start, i.e., right after the opening
+        brace of a group or ``0`` for the top level of the file
+    :param end: The offset at which to stop
+    :param plain: See :func:`find_group_end`
+    """
+    position = start
+    while True:
+        position = separator_rx.match(buffer, position, end).end()
+        if position >= end or buffer[position : position + 1] == b"}":
+            return
+        name_match = item_name_rx.match(buffer, position, end)
+        if name_match is None:
+            position = max(
+                statement_end_rx.match(buffer, position, end).end(), position + 1
+            )
+            continue
+        name = name_match[1].decode("utf8")
+        if name_match[2] == b":":
+            value_match = simple_value_rx.match(buffer, name_match.end(), end)
+            yield LibertyItem(
+                name, _decode(value_match[1]), position, value_match.end()
+            )
+            position = value_match.end()
+            continue
+        value_match = complex_value_rx.match(buffer, name_match.end(), end)
+        if value_match is None:
+            return
+        value = _decode(value_match[1])
+        if value_match[2] is None:
+            yield LibertyItem(name, value, position, value_match.end())
+            position = value_match.end()
+            continue
+        body_start = value_match.start(2)
+        group_end = find_group_end(buffer, body_start, plain)
+        yield LibertyItem(name, value, position, group_end, body_start)
+        position = group_end
+
+
+@dataclass
+class LibertyCell:
+    """
+    Metadata of a single cell in a Liberty file.
+
+    :param name: The name of the cell
+    :param start: The offset of the cell group in the file
+    :param end: The offset right after the end of the cell group in the file
+    :param area: The area of the cell, if specified
+    :param pins: A dictionary from the names of the cell's pins (and buses) to
+        their directions
+    """
+
+    name: str
+    start: int
+    end: int
+    area: Optional[Decimal] = None
+    pins: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+@dataclass
+class LibertyIndex:
+    """
+    Metadata of a Liberty file that is costly to extract from large files,
+    namely the library's cells and operating conditions.
+
+    Indices are created and cached using :func:`get_liberty_index`.
+
+    :param library: The name of the library
+    :param nom_voltage: The library's ``nom_voltage``, if specified
+    :param default_operating_conditions: The name of the library's default
+        operating conditions, if specified
+    :param operating_conditions: A dictionary from the names of operating
+        conditions to their simple attributes
+    :param cells: A dictionary from the names of cells to their metadata
+    """
+
+    library: Optional[str] = None
+    nom_voltage: Optional[Decimal] = None
+    default_operating_conditions: Optional[str] = None
+    operating_conditions: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    cells: Dict[str, LibertyCell] = field(default_factory=dict)
+
+    @classmethod
+    def from_buffer(Self, buffer: Buffer) -> "LibertyIndex":
+        """
+        Indexes the contents of a Liberty file.
+
+        :param buffer: The contents of a Liberty file
+        :returns: The index
+        """
+        index = Self()
+        library = library_header_rx.search(buffer)
+        if library is None:
+            return index
+        index.library = _decode(library[1])
+
+        plain = is_plain(buffer)
+        for item in iter_group_items(buffer, library.end(), len(buffer), plain):
+            if item.name == "cell" and item.is_group:
+                index.cells[item.value] = Self.__index_cell(buffer, item, plain)
+            elif item.name == "operating_conditions" and item.is_group:
+                index.operating_conditions[item.value] = {
+                    attribute.name: attribute.value
+                    for attribute in iter_group_items(
+                        buffer, item.body_start + 1, item.end, plain
+                    )
+                    if not attribute.is_group
+                }
+            elif item.name == "default_operating_conditions":
+                index.default_operating_conditions = item.value
+            elif item.name == "nom_voltage":
+                index.nom_voltage = _to_decimal(item.value)
+        return index
+
+    @staticmethod
+    def __index_cell(
+        buffer: Buffer,
+        cell_item: LibertyItem,
+        plain: bool,
+    ) -> LibertyCell:
+        cell = LibertyCell(cell_item.value, cell_item.start, cell_item.end)
+        groups = [cell_item]
+        while len(groups) != 0:
+            group = groups.pop()
+            for item in iter_group_items(
+                buffer, group.body_start + 1, group.end, plain
+            ):
+                if item.name == "area" and group is cell_item:
+                    cell.area = _to_decimal(item.value)
+                elif item.name in ["pin", "bus", "bundle"] and item.is_group:
+                    cell.pins[item.value] = None
+                    groups.append(item)
+                elif item.name == "direction" and group is not cell_item:
+                    cell.pins[group.value] = item.value
+        return cell
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["nom_voltage"] = _from_decimal(self.nom_voltage)
+        for cell in result["cells"].values():
+            cell["area"] = _from_decimal(cell["area"])
+        return result
+
+    @classmethod
+    def from_dict(Self, value: Dict[str, Any]) -> "LibertyIndex":
+        cells = {}
+        for name, cell in value["cells"].items():
+            cell = dict(cell)
+            cell["area"] = _to_decimal(cell["area"])
+            cells[name] = LibertyCell(**cell)
+        return Self(
+            library=value["library"],
+            nom_voltage=_to_decimal(value["nom_voltage"]),
+            default_operating_conditions=value["default_operating_conditions"],
+            operating_conditions=value["operating_conditions"],
+            cells=cells,
+        )
+
+
+def _to_decimal(value: Optional[str]) -> Optional[Decimal]:
+    if value is None:
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        return None
+
+
+def _from_decimal(value: Optional[Decimal]) -> Optional[str]:
+    if value is None:
+        return None
+    return str(value)
+
+
+# The maximum number of indices kept in the cache directory
+MAX_CACHED_LIBERTY_INDICES = 1024
+
+_index_memo: Dict[str, Tuple[Tuple[int, int], LibertyIndex]] = {}
+_index_memo_lock = Lock()
+
+
+def get_liberty_index(
+    path: Union[str, os.PathLike],
+    cache_dir: Optional[str] = None,
+) -> LibertyIndex:
+    """
+    Gets the index of a Liberty file, indexing it only if needed.
+
+    Indices are kept in memory, where they are invalidated if the size or
+    modification time of the file changes, and in JSON files named after the
+    hashes of the Liberty files' contents inside ``cache_dir``, so files that
+    are merely copied or linked (e.g. from the :class:`ArtifactCache`) are
+    not indexed again.
+
+    :param path: The path to the Liberty file
+    :param cache_dir: The directory in which to store indices. If unset,
+        ``liberty_index`` inside OpenLane's cache directory is used.
+    :returns: The file's index
+    """
+    path = os.path.realpath(path)
+    file_stat = os.stat(path)
+    stamp = (file_stat.st_size, file_stat.st_mtime_ns)
+    with _index_memo_lock:
+        if memo := _index_memo.get(path):
+            if memo[0] == stamp:
+                return memo[1]
+
+    cache_dir = cache_dir or get_cache_dir("liberty_index")
+    index_path = os.path.join(cache_dir, f"{hash_file(path)}.json")
+
+    index: Optional[LibertyIndex] = None
+    try:
+        with open(index_path, encoding="utf8") as f:
+            cached = json.load(f)
+        if cached["version"] == LIBERTY_INDEX_VERSION:
+            index = LibertyIndex.from_dict(cached["index"])
+            os.utime(index_path)
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if index is None:
+        debug(f"Indexing liberty file '{path}'…")
+        with map_file(path) as buffer:
+            index = LibertyIndex.from_buffer(buffer)
+        try:
+            mkdirp(cache_dir)
+            staging_path = f"{index_path}.{uuid.uuid4().hex}"
+            with open(staging_path, "w", encoding="utf8") as f:
+                json.dump(
+                    {"version": LIBERTY_INDEX_VERSION, "index": index.to_dict()},
+                    f,
+                )
+            os.replace(staging_path, index_path)
+            _evict_liberty_indices(cache_dir)
+        except OSError as e:
+            debug(f"Failed to store index of liberty file '{path}': {e}")
+
+    with _index_memo_lock:
+        _index_memo[path] = (stamp, index)
+    return index
+
+
+def _evict_liberty_indices(cache_dir: str):
+    entries = []
+    for entry in os.listdir(cache_dir):
+        if not entry.endswith(".json"):
+            continue
+        entry_path = os.path.join(cache_dir, entry)
+        try:
+            entries.append((os.stat(entry_path).st_mtime, entry_path))
+        except FileNotFoundError:
+            pass
+    entries.sort()
+    for _, entry_path in entries[: max(0, len(entries) - MAX_CACHED_LIBERTY_INDICES)]:
+        try:
+            os.unlink(entry_path)
+        except FileNotFoundError:
+            pass
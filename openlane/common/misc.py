@@ -14,14 +14,17 @@
 import os
 import re
 import sys
+import hashlib
 import typing
 import pathlib
 import unicodedata
 from enum import Enum
+from threading import Lock
 from collections import UserString
 from typing import (
     Any,
     ClassVar,
+    Dict,
     Iterable,
     Sequence,
     TypeVar,
@@ -259,3 +262,54 @@ def format_elapsed_time(elapsed_seconds: float) -> str:
     milliseconds = int((leftover % 1) * 1000)
 
     return f"{hours:02}:{minutes:02}:{seconds:02}.{milliseconds:03}"
+
+
+def get_cache_dir(*components: str) -> str:
+    """
+    :param components: Path components to append to OpenLane's cache directory
+    :returns: A path inside OpenLane's user-wide cache directory, i.e.
+        ``$XDG_CACHE_HOME/openlane`` (falling back to ``~/.cache/openlane``.)
+
+        The directory is not created.
+    """
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "openlane", *components)
+
+
+def hash_file(path: Union[str, os.PathLike], chunk_size: int = 1048576) -> str:
+    """
+    :param path: A path to a file
+    :param chunk_size: The number of bytes read from the file at a time
+    :returns: The hexadecimal SHA-256 digest of the file's content
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+_file_hash_memo: Dict[Tuple[str, int, int], str] = {}
+_file_hash_memo_lock = Lock()
+
+
+def hash_file_memoized(path: Union[str, os.PathLike]) -> str:
+    """
+    Like :func:`hash_file`, but memoized by the file's absolute path,
+    modification time and size, so unchanged files are only read once per
+    process.
+
+    :param path: A path to a file
+    :returns: The hexadecimal SHA-256 digest of the file's content
+    """
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _file_hash_memo_lock:
+        if digest := _file_hash_memo.get(memo_key):
+            return digest
+    digest = hash_file(path)
+    with _file_hash_memo_lock:
+        _file_hash_memo[memo_key] = digest
+    return digest
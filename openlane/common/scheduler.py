@@ -0,0 +1,373 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import os
+import json
+import math
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Executor, Future
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import psutil
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+from .misc import mkdirp, get_cache_dir
+
+
+class ResourceHistory(object):
+    """
+    A persistent record of the peak resource usage of previously-run
+    subprocesses, used to estimate the resources a subprocess would
+    need the next time it is run.
+
+    The history is shared between processes: entries recorded by other
+    processes are merged into the file under a lock instead of being
+    overwritten.
+
+    :param path: The path to the JSON file in which the history is stored.
+        If unset, ``resource_history.json`` inside OpenLane's cache directory
+        is used.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_cache_dir("resource_history.json")
+        self.__lock = Lock()
+        self.__entries: Optional[Dict[str, Dict[str, float]]] = None
+
+    @contextmanager
+    def __file_lock(self) -> Iterator[None]:
+        mkdirp(os.path.dirname(self.path))
+        with open(f"{self.path}.lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __read(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.path, encoding="utf8") as f:
+                entries = json.load(f)
+            if isinstance(entries, dict):
+                return entries
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def __load(self) -> Dict[str, Dict[str, float]]:
+        if self.__entries is None:
+            self.__entries = self.__read()
+        return self.__entries
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        """
+        :param key: A key identifying the subprocess
+        :returns: A dictionary with the keys ``memory_rss`` (peak, in bytes) and
+            ``cpu_percent`` (average), or ``None`` if the subprocess has never been
+            recorded.
+        """
+        with self.__lock:
+            return self.__load().get(key)
+
+    def record(self, key: str, memory_rss: float, cpu_percent: float):
+        """
+        Records the resource usage of a subprocess, persisting it to disk.
+
+        :param key: A key identifying the subprocess
+        :param memory_rss: The peak resident set size of the subprocess in bytes
+        :param cpu_percent: The average CPU usage of the subprocess, where 100
+            represents one fully-utilized CPU
+        """
+        entry = {"memory_rss": memory_rss, "cpu_percent": cpu_percent}
+        with self.__lock:
+            try:
+                with self.__file_lock():
+                    entries = self.__read()
+                    entries[key] = entry
+                    tmp_path = f"{self.path}.{uuid.uuid4().hex}"
+                    with open(tmp_path, "w", encoding="utf8") as f:
+                        json.dump(entries, f)
+                    os.replace(tmp_path, self.path)
+                self.__entries = entries
+            except OSError:
+                self.__load()[key] = entry
+
+
+class ResourceScheduler(Executor):
+    """
+    OpenLane's global job scheduler.
+
+    Jobs submitted using :meth:`submit` always run immediately on their own
+    thread, so a job may safely submit other jobs and wait on them (e.g. a step
+    running asynchronously within a flow fanning out per-corner jobs) without
+    risking a deadlock.
+
+    Hardware resources are instead accounted for where they are actually
+    consumed, i.e., subprocesses: :meth:`reserve` blocks until the requested
+    number of CPU slots and bytes of memory are available. As subprocesses
+    never wait on other jobs, a reservation is always eventually released.
+
+    Reservations are granted in the order they were requested.
+
+    :param max_cpus: The number of CPU slots available. If unset, the number
+        of CPUs is used.
+    :param max_memory: The memory budget in bytes. If unset, the total physical
+        memory is used.
+    :param history: A :class:`ResourceHistory` object used to estimate the
+        resource usage of subprocesses. If unset, the default one is used.
+    """
+
+    def __init__(
+        self,
+        max_cpus: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        history: Optional[ResourceHistory] = None,
+    ):
+        self.max_cpus: int = max_cpus or os.cpu_count() or 1
+        self.max_memory: int = max_memory or psutil.virtual_memory().total
+        self.history = history or ResourceHistory()
+        self.__condition = Condition()
+        self.__cpus_used = 0
+        self.__memory_used = 0
+        self.__queue: Deque[object] = deque()
+        self.__threads: List[Thread] = []
+        self.__shutdown = False
+
+    def set_limits(
+        self,
+        max_cpus: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ):
+        """
+        Updates the scheduler's resource limits.
+
+        :param max_cpus: The new number of CPU slots, if set
+        :param max_memory: The new memory budget in bytes, if set
+        """
+        with self.__condition:
+            if max_cpus is not None:
+                if max_cpus < 1:
+                    raise ValueError("max_cpus must be at least 1")
+                self.max_cpus = max_cpus
+            if max_memory is not None:
+                if max_memory < 1:
+                    raise ValueError("max_memory must be a positive number of bytes")
+                self.max_memory = max_memory
+            self.__condition.notify_all()
+
+    @property
+    def cpus_used(self) -> int:
+        """
+        :returns: The number of CPU slots currently reserved
+        """
+        return self.__cpus_used
+
+    @property
+    def memory_used(self) -> int:
+        """
+        :returns: The number of bytes of memory currently reserved
+        """
+        return self.__memory_used
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        """
+        Runs a callable on a new thread.
+
+        :param fn: The callable
+        :param args: Arguments to ``fn``
+        :param kwargs: Keyword arguments to ``fn``
+        :returns: A ``Future`` encapsulating the return value of ``fn``
+        """
+        future: Future = Future()
+
+        def worker():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        with self.__condition:
+            if self.__shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+            self.__threads = [thread for thread in self.__threads if thread.is_alive()]
+            thread = Thread(target=worker)
+            self.__threads.append(thread)
+        thread.start()
+        return future
+
+    def shutdown(self, wait: bool = True, **kwargs):
+        with self.__condition:
+            self.__shutdown = True
+            threads = self.__threads.copy()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def estimate(self, key: str) -> Tuple[int, int]:
+        """
+        :param key: A key identifying a subprocess in the :class:`ResourceHistory`
+        :returns: A tuple of the estimated number of CPU slots and bytes of
+            memory the subprocess needs.
+
+            If the subprocess has not been recorded, it is assumed to require one
+            CPU slot and no memory.
+        """
+        entry = self.history.get(key)
+        if entry is None:
+            return (1, 0)
+        cpus = max(1, math.ceil(entry.get("cpu_percent", 0) / 100))
+        memory = int(entry.get("memory_rss", 0))
+        return (cpus, memory)
+
+    @contextmanager
+    def reserve(self, cpus: int = 1, memory: int = 0) -> Iterator[Tuple[int, int]]:
+        """
+        Blocks until the requested resources are available, then reserves them
+        for the duration of the ``with`` block.
+
+        Requests exceeding the scheduler's limits are clamped to them, so they
+        may still run, albeit alone.
+
+        :param cpus: The number of CPU slots to reserve
+        :param memory: The number of bytes of memory to reserve
+        :returns: A tuple of the CPU slots and bytes of memory actually reserved
+        """
+        ticket = object()
+        with self.__condition:
+            cpus = max(1, min(cpus, self.max_cpus))
+            memory = max(0, min(memory, self.max_memory))
+            self.__queue.append(ticket)
+            try:
+                self.__condition.wait_for(
+                    lambda: self.__queue[0] is ticket
+                    and self.__cpus_used + min(cpus, self.max_cpus) <= self.max_cpus
+                    and self.__memory_used + min(memory, self.max_memory)
+                    <= self.max_memory
+                )
+            finally:
+                self.__queue.remove(ticket)
+                self.__condition.notify_all()
+            cpus = min(cpus, self.max_cpus)
+            memory = min(memory, self.max_memory)
+            self.__cpus_used += cpus
+            self.__memory_used += memory
+        try:
+            yield (cpus, memory)
+        finally:
+            with self.__condition:
+                self.__cpus_used -= cpus
+                self.__memory_used -= memory
+                self.__condition.notify_all()
+
+    @contextmanager
+    def reserve_up_to(self, cpus: int) -> Iterator[int]:
+        """
+        Blocks until at least one CPU slot is available, then reserves as many
+        of the idle CPU slots as possible, up to ``cpus``, for the duration of
+        the ``with`` block.
+
+        This is intended for sizing thread pools doing short-lived, divisible
+        work (e.g. copying or compressing files) so they do not oversubscribe
+        CPUs reserved by running subprocesses.
+
+        :param cpus: The maximum number of CPU slots to reserve
+        :returns: The number of CPU slots actually reserved, at least one
+        """
+        ticket = object()
+        with self.__condition:
+            self.__queue.append(ticket)
+            try:
+                self.__condition.wait_for(
+                    lambda: self.__queue[0] is ticket
+                    and self.__cpus_used < self.max_cpus
+                )
+            finally:
+                self.__queue.remove(ticket)
+                self.__condition.notify_all()
+            cpus = max(1, min(cpus, self.max_cpus - self.__cpus_used))
+            self.__cpus_used += cpus
+        try:
+            yield cpus
+        finally:
+            with self.__condition:
+                self.__cpus_used -= cpus
+                self.__condition.notify_all()
+
+
+def parse_size(size: Any) -> int:
+    """
+    Parses a number of bytes from a string, which may use the binary suffixes
+    ``K``, ``M``, ``G`` or ``T`` (e.g. ``16G``), optionally followed by ``iB``
+    or ``B``.
+
+    :param size: The string (or integer) to parse
+    :returns: The number of bytes
+    :raises ValueError: If the string is not a valid size
+    """
+    if isinstance(size, int):
+        return size
+    original = size
+    size = str(size).strip().upper()
+    for suffix in ["IB", "B"]:
+        if size.endswith(suffix) and len(size) > len(suffix):
+            size = size[: -len(suffix)]
+            break
+    multiplier = 1
+    for i, unit in enumerate(["K", "M", "G", "T"]):
+        if size.endswith(unit):
+            multiplier = 1024 ** (i + 1)
+            size = size[:-1]
+            break
+    try:
+        value = float(size)
+    except ValueError:
+        raise ValueError(f"Invalid size: '{original}'")
+    if value < 0:
+        raise ValueError(f"Invalid size: '{original}'")
+    return int(value * multiplier)
+
+
+SCHEDULER = ResourceScheduler()
+
+
+def set_scheduler(scheduler: ResourceScheduler):
+    """
+    Allows replacing OpenLane's global :class:`ResourceScheduler` with a
+    customized one.
+
+    :param scheduler: The replacement scheduler
+    """
+    global SCHEDULER
+    SCHEDULER = scheduler
+
+
+def get_scheduler() -> ResourceScheduler:
+    """
+    :returns: OpenLane's global :class:`ResourceScheduler`
+    """
+    return SCHEDULER
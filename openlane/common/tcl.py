@@ -13,8 +13,7 @@
 # limitations under the License.
 import os
 import re
-import tkinter
-from typing import Dict, Mapping, Any, Iterable
+from typing import Dict, List, Mapping, Any, Iterable, Optional
 
 _setter_rx = re.compile(r"set\s+(?:\:\:)?env\(\s*(\w+)\s*\)")
 _find_unsafe = re.compile(r"[^\w@%+=:,./-]", re.ASCII).search
@@ -53,10 +52,29 @@ class TclUtils(object):
         return " ".join(TclUtils.escape(arg) for arg in ss)
 
     @staticmethod
-    def _eval_env(env_in: Mapping[str, Any], tcl_in: str) -> Dict[str, Any]:
+    def _eval_env(
+        env_in: Mapping[str, Any],
+        tcl_in: str,
+        sourced: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        import tkinter
+
         interpreter = tkinter.Tcl()
         keys_modified = _setter_rx.findall(tcl_in)
 
+        if sourced is not None:
+            # The paths of all files sourced by the script are appended to
+            # sourced
+            interpreter.eval(
+                """
+                set ::__sourced [list]
+                proc ::__track_source {command op} {
+                    lappend ::__sourced [file normalize [lindex $command end]]
+                }
+                trace add execution source enter ::__track_source
+                """
+            )
+
         env_out = dict(env_in)
         rollback = {}
         for key, value in env_in.items():
@@ -74,6 +92,12 @@ class TclUtils(object):
         """
         interpreter.eval(tcl_script)
 
+        if sourced is not None:
+            sourced += [
+                str(path)
+                for path in interpreter.splitlist(interpreter.getvar("::__sourced"))
+            ]
+
         for key, value in rollback.items():
             if value is not None:
                 os.environ[key] = value
@@ -0,0 +1,430 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A columnar database of the timing paths in OpenSTA reports.
+
+Reports generated by ``report_checks -format full_clock_expanded`` can be
+hundreds of megabytes large. :meth:`TimingPaths.from_sta` reads them line by
+line into typed arrays, one per attribute of a path, with strings such as pin
+names interned. The stages of all paths are stored in the same way, with the
+stages of each path delimited by an array of offsets.
+
+The database is saved to a compact binary file, consisting of a JSON header
+followed by the raw contents of every array, which is loaded without parsing.
+"""
+from __future__ import annotations
+
+import io
+import os
+import sys
+import json
+import heapq
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+PATHS_MAGIC = b"OLPATHS\0"
+PATHS_VERSION = 1
+
+#: The extension of path databases written next to reports
+PATHS_EXTENSION = ".paths"
+
+NaN = float("nan")
+
+
+class TimingStage(NamedTuple):
+    pin: str
+    cell: Optional[str]
+    delay: float
+    time: float
+
+
+class TimingPath(NamedTuple):
+    startpoint: str
+    endpoint: str
+    group: str
+    corner: str
+    path_type: str
+    #: ``nan`` for unconstrained paths
+    slack: float
+    arrival: float
+    #: ``nan`` for unconstrained paths
+    required: float
+    stages: List[TimingStage]
+
+
+def _strings() -> array:
+    return array("i")
+
+
+def _floats() -> array:
+    return array("d")
+
+
+@dataclass
+class TimingPaths:
+    """
+    A database of timing paths, stored column-wise.
+
+    Each of the arrays has one element per path, save for those prefixed with
+    ``stage_``, which have one element per stage. The stages of path ``i`` are
+    at the indices ``stage_offsets[i]`` (inclusive) to ``stage_offsets[i + 1]``
+    (exclusive). String attributes are stored as indices into ``strings``;
+    ``-1`` stands for ``None``.
+
+    Use :meth:`path` to access a path as a whole.
+    """
+
+    strings: List[str] = field(default_factory=list)
+    startpoint: array = field(default_factory=_strings)
+    endpoint: array = field(default_factory=_strings)
+    group: array = field(default_factory=_strings)
+    corner: array = field(default_factory=_strings)
+    path_type: array = field(default_factory=_strings)
+    slack: array = field(default_factory=_floats)
+    arrival: array = field(default_factory=_floats)
+    required: array = field(default_factory=_floats)
+    stage_offsets: array = field(default_factory=lambda: array("q", [0]))
+    stage_pin: array = field(default_factory=_strings)
+    stage_cell: array = field(default_factory=_strings)
+    stage_delay: array = field(default_factory=_floats)
+    stage_time: array = field(default_factory=_floats)
+
+    def __post_init__(self):
+        self.__string_ids: Dict[str, int] = {
+            string: i for i, string in enumerate(self.strings)
+        }
+
+    def __len__(self) -> int:
+        return len(self.slack)
+
+    def intern(self, string: Optional[str]) -> int:
+        """
+        :param string: A string
+        :returns: The index of the string in :attr:`strings`, which it is
+            added to if needed.
+        """
+        if string is None:
+            return -1
+        if (id := self.__string_ids.get(string)) is None:
+            id = len(self.strings)
+            self.strings.append(string)
+            self.__string_ids[string] = id
+        return id
+
+    def get_string(self, id: int) -> Optional[str]:
+        if id == -1:
+            return None
+        return self.strings[id]
+
+    def path(self, index: int) -> TimingPath:
+        """
+        :param index: The index of a path
+        :returns: The path, with all of its attributes and stages
+        """
+        strings = self.strings
+        stages = [
+            TimingStage(
+                strings[self.stage_pin[i]],
+                self.get_string(self.stage_cell[i]),
+                self.stage_delay[i],
+                self.stage_time[i],
+            )
+            for i in range(self.stage_offsets[index], self.stage_offsets[index + 1])
+        ]
+        return TimingPath(
+            strings[self.startpoint[index]],
+            strings[self.endpoint[index]],
+            strings[self.group[index]],
+            strings[self.corner[index]],
+            strings[self.path_type[index]],
+            self.slack[index],
+            self.arrival[index],
+            self.required[index],
+            stages,
+        )
+
+    def __filter(
+        self,
+        corner: Optional[str],
+        path_type: Optional[str],
+        group: Optional[str],
+    ) -> Callable[[int], bool]:
+        criteria = []
+        for column, value in [
+            (self.corner, corner),
+            (self.path_type, path_type),
+            (self.group, group),
+        ]:
+            if value is not None:
+                criteria.append((column, self.__string_ids.get(value, -2)))
+
+        def matches(index: int) -> bool:
+            for column, id in criteria:
+                if column[index] != id:
+                    return False
+            return True
+
+        return matches
+
+    def worst(
+        self,
+        n: int = 10,
+        *,
+        corner: Optional[str] = None,
+        path_type: Optional[str] = None,
+        group: Optional[str] = None,
+    ) -> List[TimingPath]:
+        """
+        :param n: The number of paths to return
+        :param corner: Only consider paths of this timing corner
+        :param path_type: Only consider paths of this type, i.e. ``min``
+            or ``max``
+        :param group: Only consider paths of this path group
+        :returns: The ``n`` constrained paths with the lowest slack, in
+            ascending order of slack.
+        """
+        matches = self.__filter(corner, path_type, group)
+        slack = self.slack
+        indices = (
+            i
+            for i in range(len(self))
+            if slack[i] == slack[i] and matches(i)  # Not nan
+        )
+        return [
+            self.path(i) for i in heapq.nsmallest(n, indices, key=slack.__getitem__)
+        ]
+
+    def slack_histogram(
+        self,
+        edges: Sequence[float],
+        *,
+        path_type: Optional[str] = None,
+        group: Optional[str] = None,
+    ) -> Dict[str, List[int]]:
+        """
+        :param edges: The edges of the bins, in ascending order
+        :param path_type: Only consider paths of this type, i.e. ``min``
+            or ``max``
+        :param group: Only consider paths of this path group
+        :returns: For every timing corner, the number of constrained paths
+            whose slack is below ``edges[0]``, between each pair of
+            consecutive edges, and at or above ``edges[-1]``, i.e.
+            ``len(edges) + 1`` counts.
+        """
+        matches = self.__filter(None, path_type, group)
+        histograms: Dict[int, List[int]] = {}
+        for i, slack in enumerate(self.slack):
+            if slack != slack or not matches(i):
+                continue
+            corner = self.corner[i]
+            if (histogram := histograms.get(corner)) is None:
+                histogram = [0] * (len(edges) + 1)
+                histograms[corner] = histogram
+            histogram[bisect_right(edges, slack)] += 1
+        return {self.strings[corner]: counts for corner, counts in histograms.items()}
+
+    def extend(self, other: "TimingPaths"):
+        """
+        Appends the paths of another database to this one.
+
+        :param other: The other database
+        """
+        remap = [self.intern(string) for string in other.strings]
+        for name in ["startpoint", "endpoint", "group", "corner", "path_type"]:
+            getattr(self, name).extend(remap[id] for id in getattr(other, name))
+        self.stage_pin.extend(remap[id] for id in other.stage_pin)
+        self.stage_cell.extend(-1 if id == -1 else remap[id] for id in other.stage_cell)
+        for name in ["slack", "arrival", "required", "stage_delay", "stage_time"]:
+            getattr(self, name).extend(getattr(other, name))
+        base = self.stage_offsets[-1]
+        self.stage_offsets.extend(offset + base for offset in other.stage_offsets[1:])
+
+    @classmethod
+    def from_sta(
+        Self,
+        report: io.TextIOBase,
+        corner: Optional[str] = None,
+    ) -> "TimingPaths":
+        """
+        Parses the paths in a report generated by OpenSTA's ``report_checks``
+        with ``-format full_clock_expanded`` (or ``full_clock``/``full``.) Lines
+        that are not part of a path are ignored.
+
+        The stages of a path are the pins from its startpoint to its endpoint.
+
+        :param report: A **text** input stream containing the report in
+            question. You can pass the result of ``open("max.rpt")``, for
+            example. It is only read once, line by line.
+        :param corner: The timing corner of the paths, used if the report does
+            not specify it.
+        :returns: The database
+        """
+        paths = Self()
+        intern = paths.intern
+        stage_pin = paths.stage_pin
+        stage_cell = paths.stage_cell
+        stage_delay = paths.stage_delay
+        stage_time = paths.stage_time
+        default_corner = intern(corner or "")
+
+        started = False
+        in_arrival = False
+        startpoint = endpoint = group = path_type = -1
+        path_corner = default_corner
+        slack = arrival = required = NaN
+
+        def finish():
+            paths.startpoint.append(startpoint)
+            paths.endpoint.append(endpoint)
+            paths.group.append(group)
+            paths.corner.append(path_corner)
+            paths.path_type.append(path_type)
+            paths.slack.append(slack)
+            paths.arrival.append(arrival)
+            paths.required.append(required)
+            paths.stage_offsets.append(len(stage_pin))
+
+        for line in report:
+            if line.startswith("Startpoint: "):
+                if started:
+                    finish()
+                started = True
+                in_arrival = False
+                startpoint = intern(line[12:].split(maxsplit=1)[0])
+                endpoint = group = path_type = intern("")
+                path_corner = default_corner
+                slack = arrival = required = NaN
+                continue
+            if not started:
+                continue
+            if line.startswith("Endpoint: "):
+                endpoint = intern(line[10:].split(maxsplit=1)[0])
+                continue
+            if line.startswith("Path Group: "):
+                group = intern(line[12:].strip())
+                continue
+            if line.startswith("Path Type: "):
+                path_type = intern(line[11:].strip())
+                continue
+            if line.startswith("Corner: "):
+                path_corner = intern(line[8:].strip())
+                continue
+            if line.startswith("-----"):
+                # The table starts after the first separator
+                if arrival != arrival:
+                    in_arrival = True
+                continue
+
+            tokens = line.split()
+            if len(tokens) < 2:
+                continue
+            try:
+                if tokens[-1] == "time" and tokens[-3:-1] == ["data", "arrival"]:
+                    if in_arrival:
+                        arrival = float(tokens[0])
+                        in_arrival = False
+                elif tokens[-1] == "time" and tokens[-3:-1] == ["data", "required"]:
+                    if required != required:
+                        required = float(tokens[0])
+                elif tokens[1] == "slack":
+                    slack = float(tokens[0])
+                    finish()
+                    started = False
+                elif in_arrival:
+                    # [fanout] [cap] [slew] delay time edge pin [(cell)]
+                    cell = None
+                    if tokens[-1][0] == "(" and tokens[-1][-1] == ")":
+                        cell = tokens.pop()[1:-1]
+                    if len(tokens) < 3 or tokens[-2] not in ("^", "v"):
+                        continue
+                    time = float(tokens[-3])
+                    delay = float(tokens[-4]) if len(tokens) >= 4 else NaN
+                    stage_pin.append(intern(tokens[-1]))
+                    stage_cell.append(intern(cell))
+                    stage_delay.append(delay)
+                    stage_time.append(time)
+            except ValueError:
+                continue
+        if started:
+            finish()
+
+        return paths
+
+    def save(self, path: Union[str, os.PathLike]):
+        """
+        :param path: The path of the file to write the database to
+        """
+        columns = [f for f in fields(self) if f.name != "strings"]
+        header = json.dumps(
+            {
+                "version": PATHS_VERSION,
+                "byteorder": sys.byteorder,
+                "strings": self.strings,
+                "columns": [
+                    [f.name, getattr(self, f.name).typecode, len(getattr(self, f.name))]
+                    for f in columns
+                ],
+            }
+        ).encode("utf8")
+        with open(path, "wb") as f:
+            f.write(PATHS_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for column in columns:
+                getattr(self, column.name).tofile(f)
+
+    @classmethod
+    def load(Self, path: Union[str, os.PathLike]) -> "TimingPaths":
+        """
+        :param path: The path of a file written by :meth:`save`
+        :returns: The database
+        """
+        with open(path, "rb") as f:
+            if f.read(len(PATHS_MAGIC)) != PATHS_MAGIC:
+                raise ValueError(f"'{path}' is not a timing path database")
+            header_size = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_size).decode("utf8"))
+            if header["version"] != PATHS_VERSION:
+                raise ValueError(
+                    f"Unsupported timing path database version {header['version']} in '{path}'"
+                )
+            columns = {}
+            for name, typecode, length in header["columns"]:
+                column = array(typecode)
+                column.fromfile(f, length)
+                if header["byteorder"] != sys.byteorder:
+                    column.byteswap()
+                columns[name] = column
+        return Self(strings=header["strings"], **columns)
+
+
+def write_path_database(
+    report_path: Union[str, os.PathLike],
+    corner: Optional[str] = None,
+) -> str:
+    """
+    Parses an OpenSTA report and saves the resulting :class:`TimingPaths` next
+    to it, replacing the report's extension with :data:`PATHS_EXTENSION`.
+
+    :param report_path: The path to the report
+    :param corner: See :meth:`TimingPaths.from_sta`
+    :returns: The path to the database
+    """
+    with open(report_path, encoding="utf8") as f:
+        paths = TimingPaths.from_sta(f, corner)
+    database_path = os.path.splitext(report_path)[0] + PATHS_EXTENSION
+    paths.save(database_path)
+    return database_path
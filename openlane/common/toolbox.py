@@ -34,12 +34,14 @@ from typing import (
     Union,
 )
 
-import libparse
 from deprecated.sphinx import deprecated
 
 
-from .misc import Path, mkdirp
+from .misc import Path, mkdirp, hash_file
 from .metrics import aggregate_metrics
+from .artifact_cache import get_artifact_cache
+from .liberty import LibertyCell, remove_cells_parallel, get_liberty_index
+from .scheduler import get_scheduler
 from .design_format import DesignFormat
 from .generic_dict import GenericImmutableDict, is_string
 from ..logging import debug, warn, err
@@ -50,7 +52,9 @@ class Toolbox(object):
     An assisting object shared by a Flow and all its constituent Steps.
 
     The toolbox may create artifacts that are cached to avoid constant re-creation
-    between steps.
+    between steps. Artifacts derived solely from files, such as liberty files
+    with cells removed, are also stored in the persistent
+    :class:`ArtifactCache` (if enabled) to avoid re-creation between runs.
     """
 
     def __init__(self, tmp_dir: str) -> None:
@@ -296,7 +300,9 @@ class Toolbox(object):
         Creates a new lib file with some cells removed.
 
         This function is memoized, i.e., results are cached for a specific set
-        of inputs.
+        of inputs. Results are also stored in the persistent artifact cache, if
+        enabled. The cells to remove are looked up in each file's
+        :class:`LibertyIndex`.
 
         :param input_lib_files: A `frozenset` of input lib files.
         :param excluded_cells: A `frozenset` of either cells to be removed or
@@ -319,51 +325,45 @@ class Toolbox(object):
                 ]
             )
 
-        class State(IntEnum):
-            initial = 0
-            cell = 10
-            excluded_cell = 11
-
-        cell_start_rx = re.compile(r"(\s*)cell\s*\(\"?(.*?)\"?\)\s*\{")
+        artifact_cache = get_artifact_cache()
         out_paths = []
+        jobs: List[Tuple[str, str]] = []
+        job_cells: List[List[LibertyCell]] = []
+        cache_keys: Dict[str, str] = {}
 
         for file in input_lib_files:
-            input_lib_stream = open(file)
             out_filename = f"{uuid.uuid4().hex}.lib"
             out_path = os.path.join(self.tmp_dir, out_filename)
+            out_paths.append(out_path)
+
+            if artifact_cache is not None:
+                cache_key = artifact_cache.get_key(
+                    "remove_cells_from_lib",
+                    [file],
+                    excluded_cells,
+                )
+                if artifact_cache.restore(cache_key, out_path):
+                    continue
+                cache_keys[out_path] = cache_key
 
-            state = State.initial
-            brace_count = 0
-            output_file_handle = open(out_path, "w")
-            write = lambda x: print(x, file=output_file_handle, end="")
-            for line in input_lib_stream:
-                if state == State.initial:
-                    cell_m = cell_start_rx.search(line)
-                    if cell_m is not None:
-                        whitespace = cell_m[1]
-                        cell_name = cell_m[2]
-                        if cell_name in excluded_cells:
-                            state = State.excluded_cell
-                            write(f"{whitespace}/* removed {cell_name} */\n")
-                        else:
-                            state = State.cell
-                            write(line)
-                        brace_count = 1
-                    else:
-                        write(line)
-                elif state in [State.cell, State.excluded_cell]:
-                    if "{" in line:
-                        brace_count += 1
-                    if "}" in line:
-                        brace_count -= 1
-                    if state == State.cell:
-                        write(line)
-                    if brace_count == 0:
-                        state = State.initial
-
-            output_file_handle.close()
+            jobs.append((file, out_path))
+            index = get_liberty_index(file)
+            job_cells.append(
+                [index.cells[cell] for cell in excluded_cells if cell in index.cells]
+            )
 
-            out_paths.append(out_path)
+        if len(jobs) != 0:
+            # Only use idle CPUs: waiting for a reservation could take longer
+            # than processing the files serially.
+            scheduler = get_scheduler()
+            idle_cpus = scheduler.max_cpus - scheduler.cpus_used
+            remove_cells_parallel(
+                jobs, excluded_cells, max_workers=idle_cpus, cells=job_cells
+            )
+
+        if artifact_cache is not None:
+            for _, out_path in jobs:
+                artifact_cache.store(cache_keys[out_path], out_path)
 
         return out_paths
 
@@ -377,6 +377,19 @@ class Toolbox(object):
             dont = 1
 
         out_path = os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.bb.v")
+
+        yosys = shutil.which("yosys") or shutil.which("yowasp-yosys")
+        artifact_cache = get_artifact_cache()
+        cache_key: Optional[str] = None
+        if artifact_cache is not None and yosys is not None:
+            cache_key = artifact_cache.get_key(
+                "create_blackbox_model",
+                input_models,
+                list(defines) + [f"yosys:{hash_file(os.path.realpath(yosys))}"],
+            )
+            if artifact_cache.restore(cache_key, out_path):
+                return out_path
+
         bad_yosys_line = re.compile(r"^\s+(\w+|(\\\S+?))\s*\(.*\).*;")
         final_files = []
 
@@ -402,8 +415,6 @@ class Toolbox(object):
                 print("", file=out)
                 final_files.append(patched_path)
 
-        yosys = shutil.which("yosys") or shutil.which("yowasp-yosys")
-
         if yosys is None:
             warn(
                 "yosys and yowasp-yosys not found in PATH. This may trigger issues with blackboxing."
@@ -437,6 +448,10 @@ class Toolbox(object):
             err(f"Failed to pre-process input models for linting with Yosys: {e}")
             err(open(output_log_path, "r", encoding="utf8").read())
             err("Will attempt to load models into linter as-is.")
+            return out_path
+
+        if artifact_cache is not None and cache_key is not None:
+            artifact_cache.store(cache_key, out_path)
 
         return out_path
 
@@ -447,6 +462,9 @@ class Toolbox(object):
         """
         Extract the voltage from the default operating conditions of a liberty file.
 
+        The operating conditions are read from the file's :class:`LibertyIndex`,
+        so the file is only scanned the first time it is encountered.
+
         Returns ``None`` if and only if the ``default_operating_conditions`` key
         does not exist and the number of operating conditions enumerated is not
         exactly 1 (one).
@@ -454,17 +472,10 @@ class Toolbox(object):
         :param input_lib: The lib file in question
         :returns: The voltage in question
         """
-        parser = libparse.LibertyParser(open(input_lib, encoding="utf8"))
-        ast = parser.ast
-
-        default_operating_conditions_id = None
-        operating_conditions_raw = {}
-        for child in ast.children:
-            if child.id == "default_operating_conditions":
-                default_operating_conditions_id = child.value
-            if child.id == "operating_conditions":
-                operating_conditions_raw[child.args[0]] = child
+        index = get_liberty_index(input_lib)
 
+        default_operating_conditions_id = index.default_operating_conditions
+        operating_conditions_raw = index.operating_conditions
         if default_operating_conditions_id is None:
             if len(operating_conditions_raw) > 1:
                 warn(
@@ -478,7 +489,4 @@ class Toolbox(object):
             default_operating_conditions_id = list(operating_conditions_raw.keys())[0]
 
         operating_conditions = operating_conditions_raw[default_operating_conditions_id]
-        operating_condition_dict = {}
-        for child in operating_conditions.children:
-            operating_condition_dict[child.id] = child.value
-        return Decimal(operating_condition_dict["voltage"])
+        return Decimal(operating_conditions["voltage"])
@@ -0,0 +1,162 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Utilities to transfer large numbers of (large) files quickly, used to save
+snapshots of states.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+
+from .misc import mkdirp, hash_file_memoized
+from .scheduler import get_scheduler
+
+TransferMode = Literal["copy", "link"]
+
+#: Files at least this large are reflinked if possible, or copied in chunks of
+#: this size in parallel
+CHUNK_SIZE = 64 * 1024 * 1024
+
+# From linux/fs.h
+FICLONE = 0x40049409
+
+
+def reflink_file(source: str, target: str) -> bool:
+    """
+    Attempts to create a copy-on-write clone of a file, which is only
+    supported by some filesystems (e.g. btrfs, XFS) and only within the same
+    filesystem.
+
+    :param source: The file to clone
+    :param target: The path of the clone
+    :returns: Whether the clone was created.
+    """
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        return False
+    try:
+        with open(source, "rb") as s, open(target, "wb") as t:
+            fcntl.ioctl(t.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(target):
+            os.unlink(target)
+        return False
+
+
+def copy_range(source: str, target: str, offset: int, length: int):
+    """
+    Copies a range of bytes from a file into the same range of another,
+    existing file.
+    """
+    with open(source, "rb") as s, open(target, "r+b") as t:
+        end = offset + length
+        if hasattr(os, "copy_file_range"):
+            try:
+                while offset < end:
+                    copied = os.copy_file_range(
+                        s.fileno(), t.fileno(), end - offset, offset, offset
+                    )
+                    if copied == 0:
+                        break
+                    offset += copied
+                return
+            except OSError:
+                # Unsupported between these filesystems: fall back to
+                # copying through userspace
+                pass
+        while offset < end:
+            data = os.pread(s.fileno(), min(1024 * 1024, end - offset), offset)
+            if len(data) == 0:
+                break
+            offset += os.pwrite(t.fileno(), data, offset)
+
+
+def transfer_files(
+    files: Sequence[Tuple[str, str]],
+    mode: TransferMode = "copy",
+    chunk_size: int = CHUNK_SIZE,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Dict[str, object]]:
+    """
+    Transfers files to new locations in parallel.
+
+    Files at least ``chunk_size`` bytes large are reflinked if the filesystem
+    supports it, as reflinks are indistinguishable from copies. Otherwise,
+    they are copied in chunks of ``chunk_size`` bytes in parallel.
+
+    :param files: Pairs of source and target paths. The target's parent
+        directories are created if needed.
+    :param mode: ``copy`` to create independent copies, or ``link`` to create
+        hard links to the sources where possible. Hard links share their content
+        with the source, so modifying one modifies the other.
+    :param chunk_size: See above
+    :param max_workers: The maximum number of threads to use. The threads
+        are further limited to the CPU slots currently idle in the global
+        :class:`ResourceScheduler`.
+    :returns: A dictionary from every target to its ``size``, ``sha256`` hash
+        and the ``method`` used to create it (``link``, ``reflink`` or
+        ``copy``.)
+    """
+    result: Dict[str, Dict[str, object]] = {}
+    futures: List[Future] = []
+    hashes: Dict[str, Future] = {}
+    # As when copying serially, the last source for any target wins
+    sources = {target: source for source, target in files}
+    scheduler = get_scheduler()
+    with scheduler.reserve_up_to(
+        max_workers or scheduler.max_cpus
+    ) as workers, ThreadPoolExecutor(max_workers=workers) as executor:
+        for target, source in sources.items():
+            mkdirp(os.path.dirname(os.path.abspath(target)))
+            if os.path.lexists(target):
+                os.unlink(target)
+            size = os.path.getsize(source)
+            method = "copy"
+            if mode == "link":
+                try:
+                    os.link(source, target)
+                    method = "link"
+                except OSError:
+                    pass
+            if method == "copy" and size >= chunk_size:
+                if reflink_file(source, target):
+                    method = "reflink"
+                else:
+                    with open(target, "wb") as f:
+                        f.truncate(size)
+                    for offset in range(0, size, chunk_size):
+                        futures.append(
+                            executor.submit(
+                                copy_range,
+                                source,
+                                target,
+                                offset,
+                                min(chunk_size, size - offset),
+                            )
+                        )
+            elif method == "copy":
+                futures.append(executor.submit(shutil.copyfile, source, target))
+            result[target] = {"size": size, "method": method}
+            hashes[target] = executor.submit(hash_file_memoized, source)
+
+        for future in futures:
+            future.result()
+        for target, future in hashes.items():
+            result[target]["sha256"] = future.result()
+    return result
@@ -14,11 +14,13 @@
 import os
 import json
 import yaml
+import threading
 import dataclasses
 from glob import glob
 from decimal import Decimal
 from textwrap import dedent
 from functools import lru_cache
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import (
     Any,
@@ -41,6 +43,7 @@ from .variable import Variable
 from .removals import removed_variables
 from .flow import pdk_variables, scl_variables, flow_common_variables
 from .pdk_compat import migrate_old_config
+from .pdk_cache import load_pdk_env
 from .preprocessor import preprocess_dict, Keys as SpecialKeys
 from ..logging import info, warn
 from ..__version__ import __version__
@@ -99,6 +102,12 @@ class Meta:
         return dataclasses.replace(self)
 
 
+#: The number of :meth:`Config.with_increment` results kept in memory. A flow
+#: increments its configuration once per distinct step class, so this fits
+#: every step of the larger built-in flows.
+INCREMENT_CACHE_SIZE = 256
+
+
 class Config(GenericImmutableDict[str, Any]):
     """
     A map from OpenLane configuration variable keys to their values.
@@ -118,6 +127,9 @@ class Config(GenericImmutableDict[str, Any]):
     current_interactive: ClassVar[Optional["Config"]] = None
     meta: Meta
 
+    __increment_cache: ClassVar["OrderedDict[Tuple, Tuple]"] = OrderedDict()
+    __increment_cache_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def __init__(
         self,
         *args,
@@ -211,11 +223,78 @@ class Config(GenericImmutableDict[str, Any]):
         All values, including those in the base ``Config`` object and in
         ``other_inputs``, will be re-validated.
 
+        As ``Config`` objects are immutable, the result of validating the same
+        variables and inputs against the same ``Config`` object is reused
+        instead, so constructing a step repeatedly (or steps sharing a set of
+        variables) throughout a flow only validates its configuration once.
+
         :param config_vars: A list of configuration variables to include and
             validate.
         :param other_inputs: A mapping of other inputs.
         :returns: The new ``Config`` object
         """
+        # Keyed by identity: references to the Config and the Variables are
+        # held by the cache entry, so their IDs cannot be reused while it exists
+        key: Optional[Tuple] = None
+        try:
+            key = (
+                id(self),
+                tuple(id(variable) for variable in config_vars),
+                frozenset(other_inputs.items()),
+            )
+        except TypeError:  # Unhashable inputs, i.e. lists or dicts
+            pass
+
+        cached = None
+        if key is not None:
+            with Config.__increment_cache_lock:
+                if cached := Config.__increment_cache.get(key):
+                    Config.__increment_cache.move_to_end(key)
+
+        if cached is not None:
+            _, _, processed, design_warnings = cached
+        else:
+            processed, design_warnings = self.__validate_increment(
+                config_vars, other_inputs
+            )
+            if key is not None:
+                with Config.__increment_cache_lock:
+                    Config.__increment_cache[key] = (
+                        self,
+                        list(config_vars),
+                        processed,
+                        design_warnings,
+                    )
+                    while len(Config.__increment_cache) > INCREMENT_CACHE_SIZE:
+                        Config.__increment_cache.popitem(last=False)
+
+        if not config_quiet:
+            if len(design_warnings) > 0:
+                info(
+                    "Loading the incremental configuration has generated the following warnings:"
+                )
+            for warning in design_warnings:
+                warn(warning)
+
+        return Config(
+            processed,
+            meta=self.meta.copy(),
+        )
+
+    @classmethod
+    def clear_increment_cache(Self):
+        """
+        Discards all results memoized by :meth:`with_increment`, e.g. if files
+        referred to by a configuration have been created or removed since.
+        """
+        with Self.__increment_cache_lock:
+            Self.__increment_cache.clear()
+
+    def __validate_increment(
+        self,
+        config_vars: Sequence[Variable],
+        other_inputs: Mapping[str, Any],
+    ) -> Tuple[GenericDict[str, Any], List[str]]:
         incremental_pdk_vars = [variable for variable in config_vars if variable.pdk]
 
         mutable, _, _ = self.__get_pdk_config(
@@ -241,18 +320,7 @@ class Config(GenericImmutableDict[str, Any]):
                 "incremental configuration", design_warnings, design_errors
             )
 
-        if not config_quiet:
-            if len(design_warnings) > 0:
-                info(
-                    "Loading the incremental configuration has generated the following warnings:"
-                )
-            for warning in design_warnings:
-                warn(warning)
-
-        return Config(
-            processed,
-            meta=self.meta.copy(),
-        )
+        return processed, design_warnings
 
     @classmethod
     def get_meta(
@@ -722,20 +790,10 @@ class Config(GenericImmutableDict[str, Any]):
         return os.path.abspath(pdk_root)
 
     @staticmethod
-    @lru_cache(1, True)
+    @lru_cache(16, True)
     def __get_pdk_raw(
         pdk_root: str, pdk: str, scl: Optional[str]
     ) -> Tuple[immutabledict[str, Any], str, str]:
-        pdk_config: GenericDict[str, Any] = GenericDict(
-            {
-                SpecialKeys.pdk_root: pdk_root,
-                SpecialKeys.pdk: pdk,
-            }
-        )
-
-        if scl is not None:
-            pdk_config[SpecialKeys.scl] = scl
-
         pdkpath = os.path.join(pdk_root, pdk)
         if not os.path.exists(pdkpath):
             matches = sorted(glob(f"{pdkpath}*"))
@@ -746,28 +804,8 @@ class Config(GenericImmutableDict[str, Any]):
                 warnings.append(f"A similarly-named PDK was found: {basename}")
             raise InvalidConfig("PDK configuration", warnings, errors)
 
-        pdk_config_path = os.path.join(pdkpath, "libs.tech", "openlane", "config.tcl")
-
-        pdk_env = TclUtils._eval_env(
-            pdk_config,
-            open(pdk_config_path, encoding="utf8").read(),
-        )
-
-        scl = pdk_env["STD_CELL_LIBRARY"]
-        assert (
-            scl is not None
-        ), "Fatal error: STD_CELL_LIBRARY default value not set by PDK."
-
-        scl_config_path = os.path.join(
-            pdkpath, "libs.tech", "openlane", scl, "config.tcl"
-        )
-
-        scl_env = migrate_old_config(
-            TclUtils._eval_env(
-                pdk_env,
-                open(scl_config_path, encoding="utf8").read(),
-            )
-        )
+        scl_env_raw, scl = load_pdk_env(pdk_root, pdk, scl)
+        scl_env = migrate_old_config(scl_env_raw)
 
         return immutabledict(scl_env), pdkpath, scl
 
@@ -536,6 +536,24 @@ option_variables = [
         "Checks for assign statement in the generated gate level netlist and aborts if any were found.",
         default=False,
     ),
+    Variable(
+        "COMPRESS_VIEWS",
+        bool,
+        "Stores textual views created by steps (netlists, DEF, SDF, SPEF and SPICE files) gzip-compressed, including in the final views. Steps reading these views are given decompressed temporary copies.",
+        default=False,
+    ),
+    Variable(
+        "STEP_MEMORY_LIMIT",
+        Optional[Decimal],
+        "A limit on the memory each subprocess of a step may use. Subprocesses exceeding it are considered to have run out of memory. Enforced using a cgroup if OpenLane is permitted to create one, otherwise by limiting the subprocess's virtual memory, which is considerably stricter.",
+        units="GiB",
+    ),
+    Variable(
+        "STEP_OOM_RETRIES",
+        int,
+        "The number of times a step whose subprocess exceeded `STEP_MEMORY_LIMIT` is retried with reduced parallelism (e.g. fewer threads or smaller tiles), for steps that support it, before the step fails.",
+        default=2,
+    ),
     Variable(
         "FALLBACK_SDC_FILE",
         Path,
@@ -0,0 +1,213 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A persistent cache of evaluated PDK and SCL configuration files.
+
+Evaluating the ``config.tcl`` files of a PDK requires a Tcl interpreter, which
+every invocation of OpenLane would otherwise have to start. The resulting
+variables are instead stored in OpenLane's cache directory, keyed by the
+hashes of the files and the values they were evaluated with.
+
+An entry is only used while the files the configuration files sourced are
+unmodified, and the environment variables they reference (i.e. those named
+literally, as in ``$::env(NAME)``) have the same values. Other inputs, such
+as files merely checked for or globbed, or environment variables with
+computed names, are not tracked: set ``OPENLANE_PDK_CACHE`` to ``0`` to
+always evaluate the configuration files if they are used.
+"""
+from __future__ import annotations
+
+import os
+import re
+import json
+import uuid
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .preprocessor import Keys as SpecialKeys
+from ..logging import debug
+from ..__version__ import __version__
+from ..common import TclUtils, get_cache_dir, hash_file, mkdirp
+
+#: Incremented whenever the format of cache entries changes
+PDK_CACHE_VERSION = 2
+
+#: Set to ``0`` to always evaluate PDK configuration files using Tcl
+PDK_CACHE_ENV_VAR = "OPENLANE_PDK_CACHE"
+
+
+def pdk_cache_enabled() -> bool:
+    return os.getenv(PDK_CACHE_ENV_VAR, "1").lower() in ["1", "true", "yes", "on"]
+
+
+def get_pdk_config_path(pdk_root: str, pdk: str, scl: Optional[str] = None) -> str:
+    """
+    :param pdk_root: The PDK root
+    :param pdk: The name of the PDK
+    :param scl: The name of a standard cell library, or ``None`` for the PDK
+        itself
+    :returns: The path to the ``config.tcl`` file of the PDK or SCL
+    """
+    components = [pdk_root, pdk, "libs.tech", "openlane"]
+    if scl is not None:
+        components.append(scl)
+    return os.path.join(*components, "config.tcl")
+
+
+_env_reference_rx = re.compile(r"env\(\s*(\w+)\s*\)")
+
+
+def _eval_file(
+    env_in: Dict[str, Any],
+    path: str,
+    dependencies: Dict[str, str],
+    environment: Set[str],
+) -> Dict[str, Any]:
+    # Adds the hashes of the file and the files it sourced to dependencies,
+    # and the environment variables they reference to environment
+    sourced: List[str] = []
+    with open(path, encoding="utf8") as f:
+        env_out = TclUtils._eval_env(env_in, f.read(), sourced=sourced)
+    for file in [os.path.abspath(path)] + sourced:
+        if file in dependencies:
+            continue
+        dependencies[file] = hash_file(file)
+        with open(file, encoding="utf8") as f:
+            for name in _env_reference_rx.findall(f.read()):
+                # Variables passed in are always overridden
+                if name not in env_in:
+                    environment.add(name)
+    return env_out
+
+
+def _hash_environment(names: Iterable[str]) -> str:
+    values = [[name, os.getenv(name)] for name in names]
+    return hashlib.sha256(json.dumps(values).encode("utf8")).hexdigest()
+
+
+def _get_entry_path(pdk_root: str, pdk: str, scl: Optional[str]) -> str:
+    pdk_config_path = get_pdk_config_path(pdk_root, pdk)
+    key = json.dumps(
+        [
+            PDK_CACHE_VERSION,
+            __version__,
+            pdk_root,
+            pdk,
+            scl,
+            hash_file(pdk_config_path),
+        ]
+    )
+    digest = hashlib.sha256(key.encode("utf8")).hexdigest()
+    return get_cache_dir("pdk", f"{digest}.json")
+
+
+def _read_entry(
+    entry_path: str, pdk_root: str, pdk: str
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    try:
+        with open(entry_path, encoding="utf8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("version") != PDK_CACHE_VERSION:
+        return None
+    # Includes the SCL's configuration file, which is only known after
+    # evaluating the PDK's
+    for path, expected in entry["dependencies"].items():
+        try:
+            if hash_file(path) != expected:
+                return None
+        except OSError:
+            return None
+    if _hash_environment(entry["environment"]) != entry["environment_hash"]:
+        return None
+    return entry["env"], entry["scl"]
+
+
+def _write_entry(entry_path: str, entry: Dict[str, Any]):
+    try:
+        mkdirp(os.path.dirname(entry_path))
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, entry_path)
+    except OSError as e:
+        debug(f"Failed to cache PDK configuration at '{entry_path}': {e}")
+
+
+def load_pdk_env(
+    pdk_root: str,
+    pdk: str,
+    scl: Optional[str],
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Evaluates the configuration files of a PDK and one of its standard cell
+    libraries, or loads the result of a previous evaluation from the cache.
+
+    :param pdk_root: The PDK root
+    :param pdk: The name of the PDK
+    :param scl: The name of the standard cell library, or ``None`` to use
+        the PDK's default
+    :returns: A tuple of the variables set by both files (and the inputs
+        they were evaluated with) and the name of the standard cell library.
+    """
+    entry_path: Optional[str] = None
+    if pdk_cache_enabled():
+        entry_path = _get_entry_path(pdk_root, pdk, scl)
+        if cached := _read_entry(entry_path, pdk_root, pdk):
+            debug(f"Loaded PDK configuration from '{entry_path}'.")
+            return cached
+
+    env_in: Dict[str, Any] = {
+        SpecialKeys.pdk_root: pdk_root,
+        SpecialKeys.pdk: pdk,
+    }
+    if scl is not None:
+        env_in[SpecialKeys.scl] = scl
+
+    dependencies: Dict[str, str] = {}
+    environment: Set[str] = set()
+    pdk_env = _eval_file(
+        env_in,
+        get_pdk_config_path(pdk_root, pdk),
+        dependencies,
+        environment,
+    )
+    scl = pdk_env[SpecialKeys.scl]
+    assert (
+        scl is not None
+    ), "Fatal error: STD_CELL_LIBRARY default value not set by PDK."
+
+    scl_env = _eval_file(
+        pdk_env,
+        get_pdk_config_path(pdk_root, pdk, scl),
+        dependencies,
+        environment,
+    )
+
+    if entry_path is not None:
+        _write_entry(
+            entry_path,
+            {
+                "version": PDK_CACHE_VERSION,
+                "scl": scl,
+                "dependencies": dependencies,
+                "environment": sorted(environment),
+                "environment_hash": _hash_environment(sorted(environment)),
+                "env": scl_env,
+            },
+        )
+
+    return scl_env, scl
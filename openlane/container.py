@@ -19,7 +19,6 @@ import shlex
 import pathlib
 import getpass
 import tempfile
-import requests
 import subprocess
 from typing import List, Sequence, Optional, Union, Tuple
 
@@ -106,6 +105,9 @@ def remote_manifest_exists(image: str) -> bool:
         err(f"Unknown registry '{registry}'.")
         return False
 
+    # Only needed when pulling images, and slow to import
+    import requests
+
     try:
         request = requests.get(url, headers={"Accept": "application/json"})
         request.raise_for_status()
@@ -18,7 +18,26 @@ The Flow Module
 An API for implementing new flows using the OpenLane infrastructure, as well
 as a number of built-in flows.
 """
+import importlib
+from typing import Any
+
 from .flow import FlowError, FlowException, FlowProgressBar, Flow
 from .sequential import SequentialFlow
-from . import builtins
 from .cli import cloup_flow_opts
+from .batch import BatchResult, run_batch
+
+# Built-in flows import most steps, so they are only imported once retrieved
+for _name, _module in {
+    "Optimizing": "optimizing",
+    "Classic": "classic",
+    "VHDLClassic": "classic",
+    "OpenInKLayout": "misc",
+    "OpenInOpenROAD": "misc",
+}.items():
+    Flow.factory.register_lazy(_name, f"{__name__}.{_module}")
+
+
+def __getattr__(name: str) -> Any:
+    if name == "builtins":
+        return importlib.import_module(f"{__name__}.builtins")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,374 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Batch Runner
+------------
+
+Runs the flows of multiple designs within a single process, such that the
+startup cost of OpenLane (imports, plugin discovery and the evaluation of the
+PDK configuration) is only paid once, and artifacts created by the
+:class:`Toolbox` (e.g. lib files with cells removed) are shared between
+designs using the same PDK.
+
+Can be invoked from the command-line using ``openlane.batch``.
+"""
+from __future__ import annotations
+
+import os
+import csv
+import glob
+import time
+import datetime
+import traceback
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+from click import pass_context
+from cloup import command, option, option_group, Context
+from rich.table import Table
+
+from .flow import Flow, FlowError, FlowException, FlowProgressBar
+from .sequential import SequentialFlow
+from .cli import cloup_flow_opts
+from ..state import State
+from ..config import Config, InvalidConfig
+from ..common import Toolbox, mkdirp
+from ..common.cli import formatter_settings
+from ..logging import console, debug, err, info, success
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of running the flow of a single design in a batch.
+
+    :param config_file: The design's configuration file
+    :param design_name: The name of the design, if its configuration was loaded
+    :param run_dir: The run directory, if the flow was started
+    :param state: The final state, if the flow completed successfully
+    :param error: A description of the error that stopped the flow, if any
+    :param elapsed: The time it took to run the flow in seconds
+    """
+
+    config_file: str
+    design_name: Optional[str] = None
+    run_dir: Optional[str] = None
+    state: Optional[State] = None
+    error: Optional[str] = None
+    elapsed: float = 0
+
+    @property
+    def success(self) -> bool:
+        """
+        :returns: Whether the flow completed successfully
+        """
+        return self.error is None and self.state is not None
+
+
+def get_flow_class(config_file: str, flow_name: Optional[str] = None) -> Type[Flow]:
+    """
+    :param config_file: A design configuration file
+    :param flow_name: The ID of a flow overriding the one specified in the
+        configuration file's ``meta`` object, if any
+    :returns: The flow to use for the design, which is :class:`Classic` if
+        neither ``flow_name`` nor the configuration file specify one.
+    :raises FlowException: If the flow specified could not be found
+    """
+    flow_description: Any = flow_name or "Classic"
+    if meta := Config.get_meta(config_file, flow_override=flow_name):
+        if flow_ids := meta.flow:
+            flow_description = flow_ids
+
+    if not isinstance(flow_description, str):
+        return SequentialFlow.make(flow_description)
+    if FlowClass := Flow.factory.get(flow_description):
+        return FlowClass
+    raise FlowException(
+        f"Unknown flow '{flow_description}' specified in configuration file's 'meta' object."
+    )
+
+
+def expand_config_files(
+    config_files: Iterable[str],
+    globs: Iterable[str] = (),
+) -> List[str]:
+    """
+    :param config_files: Paths to design configuration files
+    :param globs: Glob patterns matching design configuration files, where
+        ``**`` matches any number of directories
+    :returns: The configuration files and files matched by the glob patterns,
+        without duplicates, in the order they were provided.
+    """
+    result: Dict[str, None] = {}
+    for file in config_files:
+        result[os.path.abspath(file)] = None
+    for pattern in globs:
+        for file in sorted(glob.glob(pattern, recursive=True)):
+            result[os.path.abspath(file)] = None
+    return list(result)
+
+
+def run_batch(
+    config_files: Sequence[str],
+    *,
+    flow_name: Optional[str] = None,
+    pdk_root: Optional[str] = None,
+    pdk: Optional[str] = None,
+    scl: Optional[str] = None,
+    config_override_strings: Optional[Sequence[str]] = None,
+    tag: Optional[str] = None,
+    batch_dir: Optional[str] = None,
+    max_designs: int = 1,
+    **kwargs,
+) -> List[BatchResult]:
+    """
+    Runs the flows of multiple designs, up to ``max_designs`` of which may run
+    at the same time. The subprocesses of all designs are subject to the
+    resource limits of the global :class:`ResourceScheduler`.
+
+    The configurations of all designs are loaded before any flow starts, so
+    the PDK configuration is only evaluated once per PDK and standard cell
+    library. All flows share one :class:`Toolbox` placed inside the batch
+    directory.
+
+    A failure in one design does not stop the other designs.
+
+    Please note that as all designs share one process, the ``warnings.log``
+    and ``errors.log`` files of designs running at the same time may contain
+    messages from one another.
+
+    :param config_files: Paths to the designs' configuration files
+    :param flow_name: A flow ID overriding the ones specified by the
+        configuration files
+    :param pdk_root: See :class:`Flow`
+    :param pdk: See :class:`Flow`
+    :param scl: See :class:`Flow`
+    :param config_override_strings: See :class:`Flow`. Applied to all designs.
+    :param tag: The tag used for the run directories of all designs. If not
+        provided, one based on a date string will be created.
+
+        If multiple configuration files share a design directory, a numeric
+        suffix is added to the tag to keep their run directories apart.
+    :param batch_dir: A directory for the shared toolbox and the aggregate
+        metrics table. If not provided, ``batch_runs/<tag>`` inside the current
+        working directory is used.
+    :param max_designs: The maximum number of flows to run at the same time
+    :param kwargs: Passed on to :meth:`Flow.start` for every design.
+    :returns: A list of :class:`BatchResult`\\s in the same order as
+        ``config_files``
+    """
+    if max_designs < 1:
+        raise ValueError("max_designs must be at least 1")
+
+    tag = tag or datetime.datetime.now().astimezone().strftime(
+        "BATCH_%Y-%m-%d_%H-%M-%S"
+    )
+    batch_dir = batch_dir or os.path.join(os.getcwd(), "batch_runs", tag)
+    mkdirp(batch_dir)
+    toolbox = Toolbox(os.path.join(batch_dir, "tmp"))
+
+    results: List[BatchResult] = []
+    flows: List[Optional[Flow]] = []
+    tags: List[str] = []
+    tag_counts: Dict[str, int] = {}
+    for config_file in config_files:
+        result = BatchResult(config_file)
+        results.append(result)
+        flow: Optional[Flow] = None
+        try:
+            TargetFlow = get_flow_class(config_file, flow_name)
+            flow = TargetFlow(
+                config_file,
+                pdk_root=pdk_root,
+                pdk=pdk,
+                scl=scl,
+                config_override_strings=config_override_strings,
+            )
+            result.design_name = str(flow.config["DESIGN_NAME"])
+        except InvalidConfig as e:
+            result.error = f"Invalid configuration: {'; '.join(e.errors)}"
+        except (FlowException, ValueError) as e:
+            result.error = str(e)
+        flows.append(flow)
+
+        design_tag = tag
+        if flow is not None:
+            count = tag_counts.get(flow.design_dir, 0)
+            tag_counts[flow.design_dir] = count + 1
+            if count != 0:
+                design_tag = f"{tag}-{count}"
+        tags.append(design_tag)
+
+    def run_one(result: BatchResult, flow: Flow, design_tag: str):
+        start_time = time.time()
+        try:
+            result.state = flow.start(
+                tag=design_tag,
+                toolbox=toolbox,
+                _progress=progress,
+                **kwargs,
+            )
+        except (FlowException, FlowError) as e:
+            result.error = str(e)
+        except Exception as e:
+            debug(traceback.format_exc())
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.run_dir = flow.run_dir
+            result.elapsed = time.time() - start_time
+        if result.success:
+            success(f"'{result.design_name}' completed.")
+        else:
+            err(f"'{result.design_name}' failed: {result.error}")
+
+    progress = FlowProgressBar.create_progress()
+    progress.start()
+    try:
+        with ThreadPoolExecutor(max_workers=max_designs) as executor:
+            futures = [
+                executor.submit(run_one, result, flow, design_tag)
+                for result, flow, design_tag in zip(results, flows, tags)
+                if flow is not None
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        progress.stop()
+
+    metrics_path = os.path.join(batch_dir, "metrics.csv")
+    write_metrics_table(results, metrics_path)
+    info(f"Aggregate metrics written to '{os.path.relpath(metrics_path)}'.")
+
+    return results
+
+
+def write_metrics_table(results: Iterable[BatchResult], path: str):
+    """
+    Writes the final metrics of all designs in a batch to a CSV file, with one
+    row per design and one column per metric. Metrics missing for a design
+    are left empty.
+
+    :param results: The results of :func:`run_batch`
+    :param path: The path of the CSV file
+    """
+    metric_names: Dict[str, None] = {}
+    for result in results:
+        if result.state is not None:
+            for name in result.state.metrics:
+                metric_names[name] = None
+
+    with open(path, "w", encoding="utf8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["design", "config_file", "status", "elapsed"] + list(metric_names)
+        )
+        for result in results:
+            metrics = {} if result.state is None else result.state.metrics
+            writer.writerow(
+                [
+                    result.design_name or "",
+                    result.config_file,
+                    "success" if result.success else "failed",
+                    f"{result.elapsed:.2f}",
+                ]
+                + [metrics.get(name, "") for name in metric_names]
+            )
+
+
+def print_summary(results: Iterable[BatchResult]):
+    """
+    Prints a table with the outcome of every design in a batch.
+
+    :param results: The results of :func:`run_batch`
+    """
+    table = Table()
+    table.add_column("Design")
+    table.add_column("Status")
+    table.add_column("Time (s)", justify="right")
+    table.add_column("Run Directory")
+    for result in results:
+        status = "[green]Success" if result.success else "[red]Failed"
+        table.add_row(
+            result.design_name or os.path.relpath(result.config_file),
+            status,
+            f"{result.elapsed:.1f}",
+            os.path.relpath(result.run_dir) if result.run_dir else "",
+        )
+    console.print(table)
+
+
+o = partial(option, show_default=True)
+
+
+@command(formatter_settings=formatter_settings)
+@option_group(
+    "Batch options",
+    o(
+        "-g",
+        "--glob",
+        "globs",
+        type=str,
+        multiple=True,
+        help="A glob pattern matching design configuration files, e.g. 'designs/**/config.json'. Can be specified multiple times.",
+    ),
+    o(
+        "--max-designs",
+        type=int,
+        default=1,
+        help="The maximum number of designs to run at the same time. Subprocesses are still subject to -j/--max-cpus and --max-memory.",
+    ),
+    o(
+        "--run-tag",
+        "tag",
+        type=str,
+        default=None,
+        help="A name for the run directory of every design.",
+    ),
+    o(
+        "--batch-dir",
+        type=str,
+        default=None,
+        help="A directory for the aggregate metrics table and artifacts shared between designs. Defaults to batch_runs/<tag>.",
+    ),
+)
+@cloup_flow_opts(run_options=False)
+@pass_context
+def cli(
+    ctx: Context,
+    /,
+    config_files: Sequence[str],
+    globs: Sequence[str],
+    **kwargs,
+):
+    """
+    Runs an OpenLane flow for multiple designs within one process, loading
+    each PDK once and sharing artifacts between designs.
+    """
+    files = expand_config_files(config_files, globs)
+    if len(files) == 0:
+        err("No design configuration files provided.")
+        ctx.exit(-1)
+
+    results = run_batch(files, **kwargs)
+    print_summary(results)
+
+    if not all(result.success for result in results):
+        ctx.exit(1)
+    ctx.exit(0)
+
+
+if __name__ == "__main__":
+    cli()
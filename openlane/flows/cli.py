@@ -14,7 +14,6 @@
 import os
 from textwrap import dedent
 from functools import partial
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Union
 
 
@@ -36,8 +35,9 @@ from openlane.state.state import InvalidState
 
 
 from .flow import Flow
-from ..common import set_tpe, get_opdks_rev
-from ..logging import set_log_level, err, LogLevelsDict
+from ..common import get_scheduler, get_opdks_rev, parse_size
+from ..steps.cache import StepCache, get_step_cache, set_step_cache
+from ..logging import set_log_level, err, warn, LogLevelsDict
 from ..state import State
 
 
@@ -59,7 +59,7 @@ def set_log_level_cb(
         ctx.exit(-1)
 
 
-def set_worker_count_cb(
+def set_max_cpus_cb(
     ctx: Context,
     param: Parameter,
     value: Optional[int],
@@ -67,7 +67,43 @@ def set_worker_count_cb(
     if value is None:
         return None
 
-    set_tpe(ThreadPoolExecutor(max_workers=value))
+    if param.name == "jobs":
+        warn("--jobs is deprecated. Please use -j/--max-cpus instead.")
+
+    try:
+        get_scheduler().set_limits(max_cpus=value)
+    except ValueError as e:
+        err(f"Invalid CPU count {value}: {e}.")
+        ctx.exit(-1)
+
+
+def set_max_memory_cb(
+    ctx: Context,
+    param: Parameter,
+    value: Optional[str],
+):
+    if value is None:
+        return None
+
+    try:
+        get_scheduler().set_limits(max_memory=parse_size(value))
+    except ValueError as e:
+        err(f"Invalid memory budget {value}: {e}.")
+        ctx.exit(-1)
+
+
+def step_cache_cb(
+    ctx: Context,
+    param: Parameter,
+    value: Optional[bool],
+):
+    if value is None:
+        return None
+
+    if not value:
+        set_step_cache(None)
+    elif get_step_cache() is None:
+        set_step_cache(StepCache())
 
 
 def initial_state_cb(
@@ -153,6 +189,7 @@ def cloup_flow_opts(
     pdk_options: bool = True,
     log_level: bool = True,
     jobs: bool = True,
+    step_cache: bool = True,
     accept_config_files: bool = True,
     volare_by_default: bool = True,
     _enable_debug_flags: bool = False,
@@ -172,12 +209,15 @@ def cloup_flow_opts(
         * ``frm``§: ``Optional[str]``: Start from a step with this ID. Supported by sequential flows.
         * ``to``§: ``Optional[str]``: Stop at a step with this id. Supported by sequential flows.
         * ``skip``§: ``Iterable[str]``: Skip these steps. Supported by sequential flows.
+        * ``parallel``§: ``bool``: Run independent steps concurrently. Supported by sequential flows.
+        * ``incremental``§: ``bool``: Reuse the results of unchanged steps when resuming a run. Supported by sequential flows.
     * Sequential flow reproducible (if parameter ``sequential_flow_reproducible`` is ``True``)
         * ``reproducible``§: ``str``: Create a reproducible for a step with is ID, aborting the flow afterwards. Supported by sequential flows.
     * Flow run options (if parameter ``run_options`` is ``True``):
         * ``tag``§: ``Optional[str]``
         * ``last_run``§: ``bool``: If ``True``, ``tag`` is guaranteed to be None.
         * ``with_initial_state``§: ``Optional[State]``
+        * ``profile_baseline``§: ``Optional[str]``
     * PDK options
         * ``use_volare``: ``bool``
         * ``pdk_root``‡: ``Optional[str]``
@@ -191,7 +231,8 @@ def cloup_flow_opts(
     :param flow_run_options: Enables tag CLI flags
     :param pdk_options: Enables PDK CLI flags
     :param log_level: Enables ``--log-level`` CLI flag
-    :param jobs: Enables ``-j/--jobs`` CLI flag
+    :param jobs: Enables ``-j/--max-cpus`` and ``--max-memory`` CLI flags
+    :param step_cache: Enables ``--step-cache/--no-step-cache`` CLI flag
     :param accept_config_files: Accepts configuration file paths as CLI arguments
     :param volare_by_default: If ``pdk_options`` is ``True``, this changes whether
         Volare is used by default for this CLI or not.
@@ -233,6 +274,16 @@ def cloup_flow_opts(
                 callback=initial_state_cb,
                 help="Use this JSON file as an initial state. If this is not specified, the latest `state_out.json` of the run directory will be used if available.",
             )(f)
+            f = o(
+                "--profile-baseline",
+                type=Path(
+                    exists=True,
+                    file_okay=False,
+                    dir_okay=True,
+                ),
+                default=None,
+                help="A previous run directory to compare the profiling report of this run against. Steps that became significantly slower or use significantly more memory are reported.",
+            )(f)
             if _enable_debug_flags:
                 f = option_group(
                     "Debug flags",
@@ -312,6 +363,18 @@ def cloup_flow_opts(
                     multiple=True,
                     help="Skip these steps. Supported by sequential flows.",
                 ),
+                o(
+                    "--parallel",
+                    is_flag=True,
+                    default=False,
+                    help="Run steps that do not depend on one another concurrently. Supported by sequential flows.",
+                ),
+                o(
+                    "--incremental",
+                    is_flag=True,
+                    default=False,
+                    help="When resuming a run, reuse the results of steps whose configuration and inputs are unchanged, up to the first step that differs. Supported by sequential flows.",
+                ),
             )(f)
         if sequential_flow_reproducible:
             f = o(
@@ -378,13 +441,42 @@ def cloup_flow_opts(
                 ),
             )(f)
         if jobs:
+            f = option_group(
+                "Resource options",
+                o(
+                    "-j",
+                    "--max-cpus",
+                    type=int,
+                    default=os.cpu_count(),
+                    help="The number of CPUs that may be used by OpenLane's subprocesses at any given time.",
+                    callback=set_max_cpus_cb,
+                    expose_value=False,
+                ),
+                o(
+                    "--max-memory",
+                    type=str,
+                    default=None,
+                    show_default=False,
+                    help="The amount of memory that may be used by OpenLane's subprocesses at any given time, e.g. 16G. Estimated using the peak memory usage of previous runs. Defaults to the total physical memory.",
+                    callback=set_max_memory_cb,
+                    expose_value=False,
+                ),
+                o(
+                    "--jobs",
+                    type=int,
+                    default=None,
+                    hidden=True,
+                    callback=set_max_cpus_cb,
+                    expose_value=False,
+                ),
+            )(f)
+        if step_cache:
             f = o(
-                "-j",
-                "--jobs",
-                type=int,
-                default=os.cpu_count(),
-                help="The maximum number of threads or processes that can be used by OpenLane.",
-                callback=set_worker_count_cb,
+                "--step-cache/--no-step-cache",
+                default=None,
+                show_default=False,
+                help="Restore the results of steps that have already run with identical configurations and inputs from an on-disk cache, and store the results of steps that have not. The cache directory may be set using the OPENLANE_STEP_CACHE environment variable, which also enables the cache by default.",
+                callback=step_cache_cb,
                 expose_value=False,
             )(f)
         if accept_config_files:
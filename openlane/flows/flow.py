@@ -15,13 +15,16 @@ from __future__ import annotations
 
 import os
 import glob
+import json
 import logging
 import datetime
 import textwrap
+import importlib
 from abc import abstractmethod, ABC
 from concurrent.futures import Future
 from functools import wraps
 from typing import (
+    Any,
     List,
     Sequence,
     Tuple,
@@ -51,14 +54,27 @@ from ..config import (
 )
 from ..state import State
 from ..steps import Step
+from ..plugins import load_plugins
+from ..steps.object_store import ObjectStore, object_store_enabled
+from .profiling import PROFILE_FILENAME, write_profile_report
 from ..logging import (
     console,
     info,
     verbose,
+    warn,
     register_additional_handler,
     deregister_additional_handler,
 )
-from ..common import get_tpe, mkdirp, protected, final, slugify, Toolbox
+from ..common import (
+    get_scheduler,
+    mkdirp,
+    protected,
+    final,
+    slugify,
+    format_size,
+    format_elapsed_time,
+    Toolbox,
+)
 
 
 class FlowError(RuntimeError):
@@ -121,15 +137,37 @@ class FlowProgressBar(object):
     """
     A wrapper for a flow's progress bar, rendered using Rich at the bottom of
     interactive terminals.
+
+    :param flow_name: The name of the flow
+    :param starting_ordinal: The ordinal of the first step directory
+    :param progress: A Rich ``Progress`` object that is shared with other
+        progress bars, e.g. when running multiple flows at once. The flow is
+        then rendered as a task within the shared object, which has to be
+        started and stopped by its owner.
+
+        If unset, the progress bar creates and renders its own object.
     """
 
-    def __init__(self, flow_name: str, starting_ordinal: int = 1) -> None:
+    def __init__(
+        self,
+        flow_name: str,
+        starting_ordinal: int = 1,
+        progress: Optional[Progress] = None,
+    ) -> None:
         self.__flow_name: str = flow_name
         self.__stages_completed: int = 0
         self.__max_stage: int = 0
         self.__task_id: TaskID = TaskID(-1)
         self.__ordinal: int = starting_ordinal
-        self.__progress = Progress(
+        self.__shared: bool = progress is not None
+        self.__progress = progress or self.create_progress()
+
+    @staticmethod
+    def create_progress() -> Progress:
+        """
+        :returns: A Rich ``Progress`` object styled for flow progress bars
+        """
+        return Progress(
             TextColumn("[progress.description]{task.description}"),
             BarColumn(),
             MofNCompleteColumn(),
@@ -141,7 +179,8 @@ class FlowProgressBar(object):
         """
         Starts rendering the progress bar.
         """
-        self.__progress.start()
+        if not self.__shared:
+            self.__progress.start()
         self.__task_id = self.__progress.add_task(
             f"{self.__flow_name}",
         )
@@ -150,7 +189,10 @@ class FlowProgressBar(object):
         """
         Stops rendering the progress bar.
         """
-        self.__progress.stop()
+        if self.__shared:
+            self.__progress.remove_task(self.__task_id)
+        else:
+            self.__progress.stop()
         self.__task_id = TaskID(-1)
 
     @property
@@ -200,6 +242,15 @@ class FlowProgressBar(object):
             self.__ordinal += 1
         self.__progress.update(self.__task_id, completed=float(self.__stages_completed))
 
+    @ensure_progress_started
+    def increment_ordinal(self):
+        """
+        Increments the step ordinal without ending the current stage, e.g. to
+        claim the directory of a step that is started later, while its stage
+        is ended with ``increment_ordinal`` set to ``False``.
+        """
+        self.__ordinal += 1
+
     @ensure_progress_started
     def get_ordinal_prefix(self) -> str:
         """
@@ -433,7 +484,11 @@ class Flow(ABC):
         with_initial_state: Optional[State] = None,
         tag: Optional[str] = None,
         last_run: bool = False,
+        incremental: bool = False,
+        toolbox: Optional[Toolbox] = None,
+        profile_baseline: Optional[str] = None,
         _force_run_dir: Optional[str] = None,
+        _progress: Optional[Progress] = None,
         **kwargs,
     ) -> State:
         """
@@ -454,6 +509,22 @@ class Flow(ABC):
 
             If ``last_run`` and ``tag`` are both set, a :class:`FlowException` will
             also be raised.
+        :param incremental: If resuming a previous run, reuse the results of the
+            steps in the run directory whose configuration and inputs are
+            unchanged instead of continuing from the latest ``state_out.json``.
+
+            Passed on to :meth:`run`. Supported by sequential flows.
+        :param toolbox: A :class:`Toolbox` to use for this invocation, which may
+            be shared with other flows so the artifacts it creates are only
+            created once.
+
+            If not provided, a new toolbox is created inside the run directory.
+        :param profile_baseline: A previous run directory to compare the
+            profiling report of this run against: steps that became
+            significantly slower or use significantly more memory are reported.
+
+            The report is written to ``profile.json`` in the run directory in
+            any case, alongside a timeline, ``profile.trace.json``.
 
         :returns: ``(success, state_list)``
         """
@@ -502,7 +573,7 @@ class Flow(ABC):
                 starting_ordinal = max(starting_ordinal, extracted_ordinal + 1)
 
             # Extract Maximum State
-            if with_initial_state is None:
+            if with_initial_state is None and not incremental:
                 latest_time = 0
                 latest_json: Optional[str] = None
                 state_out_jsons = sorted(
@@ -530,7 +601,10 @@ class Flow(ABC):
             mkdirp(self.run_dir)
 
         # Stored until next start()
-        self.toolbox = Toolbox(os.path.join(self.run_dir, "tmp"))
+        self.toolbox = toolbox or Toolbox(os.path.join(self.run_dir, "tmp"))
+
+        if object_store_enabled():
+            ObjectStore.create(self.run_dir)
 
         # log_path = os.path.join(self.run_dir, "flow.log")
         # log_handler = logging.FileHandler(log_path, mode="a+")
@@ -553,12 +627,15 @@ class Flow(ABC):
                 f.write(self.config.dumps())
 
             self.progress_bar = FlowProgressBar(
-                self.name, starting_ordinal=starting_ordinal
+                self.name,
+                starting_ordinal=starting_ordinal,
+                progress=_progress,
             )
             self.progress_bar.start()
             final_state, step_objects = self.run(
                 initial_state=initial_state,
                 starting_ordinal=starting_ordinal,
+                incremental=incremental,
                 **kwargs,
             )
             self.progress_bar.end()
@@ -566,12 +643,65 @@ class Flow(ABC):
             # Stored until next start()
             self.step_objects = step_objects
 
+            self._write_cache_summary(step_objects)
+            self._write_profile_report(step_objects, profile_baseline)
+
             return final_state
         finally:
             deregister_additional_handler(warning_handler)
             deregister_additional_handler(error_handler)
             # deregister_additional_handler(log_handler)
 
+    def _write_cache_summary(self, step_objects: List[Step]):
+        assert self.run_dir is not None
+        summary: Dict[str, Any] = {"hits": 0, "misses": 0, "bytes_restored": 0}
+        steps = {}
+        for step in step_objects:
+            if step.cache_stats is None:
+                continue
+            for key in summary:
+                summary[key] += step.cache_stats[key]
+            steps[step.id] = step.cache_stats
+        if len(steps) == 0:
+            return
+        summary["steps"] = steps
+        with open(os.path.join(self.run_dir, "step_cache.json"), "w") as f:
+            json.dump(summary, f, indent=4)
+        info(
+            f"Step cache: {summary['hits']} hit(s), {summary['misses']} miss(es), {format_size(summary['bytes_restored'])} restored."
+        )
+
+    def _write_profile_report(
+        self,
+        step_objects: List[Step],
+        baseline_dir: Optional[str],
+    ):
+        assert self.run_dir is not None
+        profiles = [
+            (step.get_profile(), step.step_dir)
+            for step in step_objects
+            if step.start_time is not None and step.end_time is not None
+        ]
+        try:
+            report = write_profile_report(self.run_dir, profiles, baseline_dir)
+        except (OSError, ValueError, KeyError) as e:
+            warn(f"Failed to write profiling report: {e}")
+            return
+        verbose(
+            f"Profiling report written to '{os.path.relpath(os.path.join(self.run_dir, PROFILE_FILENAME))}'."
+        )
+        for regression in report.get("regressions", []):
+            metric = regression["metric"]
+            if metric == "peak_memory_rss":
+                previous = format_size(int(regression["baseline"]))
+                current = format_size(int(regression["current"]))
+            else:
+                previous = format_elapsed_time(regression["baseline"])
+                current = format_elapsed_time(regression["current"])
+            warn(
+                f"Profiling: '{regression['step']}' regressed in {metric}: {previous} -> {current}."
+            )
+
     @protected
     @abstractmethod
     def run(
@@ -661,7 +791,7 @@ class Flow(ABC):
         kwargs["toolbox"] = self.toolbox
         kwargs["step_dir"] = self.dir_for_step(step)
 
-        return get_tpe().submit(step.start, *args, **kwargs)
+        return get_scheduler().submit(step.start, *args, **kwargs)
 
     @deprecated(
         version="2.0.0a46",
@@ -709,6 +839,7 @@ class Flow(ABC):
         """
 
         __registry: ClassVar[Dict[str, Type[Flow]]] = {}
+        __lazy_modules: ClassVar[Dict[str, str]] = {}
 
         @classmethod
         def register(
@@ -732,20 +863,43 @@ class Flow(ABC):
 
             return decorator
 
+        @classmethod
+        def register_lazy(Self, registered_name: str, module: str):
+            """
+            Declares that a flow is registered by a module, which is only
+            imported once the flow is retrieved.
+
+            :param registered_name: The registered name of the flow
+            :param module: The absolute name of the module
+            """
+            Self.__lazy_modules[registered_name] = module
+
         @classmethod
         def get(Self, name: str) -> Optional[Type[Flow]]:
             """
             Retrieves a Flow type from the registry using a lookup string.
 
+            If the flow is not registered, the module registering it (see
+            :meth:`register_lazy`) or otherwise plugins are imported.
+
             :param name: The registered name of the Flow. Case-sensitive.
             """
+            if name not in Self.__registry:
+                if module := Self.__lazy_modules.get(name):
+                    importlib.import_module(module)
+                else:
+                    load_plugins()
             return Self.__registry.get(name)
 
         @classmethod
         def list(Self) -> List[str]:
             """
-            :returns: A list of strings representing all registered flows.
+            :returns: A list of strings representing all registered flows,
+                including those that have not been imported yet.
             """
-            return list(Self.__registry.keys())
+            load_plugins()
+            return list(Self.__lazy_modules) + [
+                name for name in Self.__registry if name not in Self.__lazy_modules
+            ]
 
     factory = FlowFactory
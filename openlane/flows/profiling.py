@@ -0,0 +1,323 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Flow-level profiling reports, aggregating the ``profile.json`` written by
+every step into ``profile.json`` in the run directory, alongside a timeline
+in the Chrome trace event format (``profile.trace.json``) that can be opened
+in ``chrome://tracing`` or https://ui.perfetto.dev.
+"""
+from __future__ import annotations
+
+import os
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+PROFILE_VERSION = 1
+PROFILE_FILENAME = "profile.json"
+TRACE_FILENAME = "profile.trace.json"
+
+#: A step is flagged as a regression if a metric grows by more than this
+#: fraction compared to the baseline...
+REGRESSION_THRESHOLD = 0.2
+
+#: ...and by more than this absolute amount, so short steps jittering by
+#: fractions of a second are not flagged.
+REGRESSION_MINIMUM_DELTA = {
+    "wall_time": 5.0,
+    "cpu_time": 5.0,
+    "peak_memory_rss": 64 * 1024 * 1024,
+}
+
+# Steps starting within this many seconds of another step ending are
+# considered to have waited for it
+_TOLERANCE = 0.05
+
+
+def summarize_step(profile: Dict[str, Any], step_dir: str) -> Dict[str, Any]:
+    """
+    :param profile: A step's profile, as returned by :meth:`Step.get_profile`.
+    :param step_dir: The step's directory
+    :returns: The step's entry in the report, with the wall time, CPU time,
+        peak and average memory usage and I/O of the step summed up from its
+        subprocesses.
+    """
+    subprocesses = []
+    for subprocess in profile["subprocesses"]:
+        wall_time = subprocess["end_time"] - subprocess["start_time"]
+        cpu_time = subprocess["cpu_time_user"] + subprocess["cpu_time_system"]
+        subprocesses.append(
+            {**subprocess, "wall_time": wall_time, "cpu_time": cpu_time}
+        )
+
+    subprocess_time = sum(s["wall_time"] for s in subprocesses)
+    avg_memory_rss = 0.0
+    if subprocess_time > 0:
+        avg_memory_rss = (
+            sum(s["avg_memory_rss"] * s["wall_time"] for s in subprocesses)
+            / subprocess_time
+        )
+
+    return {
+        "id": profile["id"],
+        "name": profile["name"],
+        "dir": os.path.basename(step_dir),
+        "start_time": profile["start_time"],
+        "end_time": profile["end_time"],
+        "wall_time": profile["end_time"] - profile["start_time"],
+        "cpu_time": sum(s["cpu_time"] for s in subprocesses),
+        "peak_memory_rss": max((s["peak_memory_rss"] for s in subprocesses), default=0),
+        "avg_memory_rss": avg_memory_rss,
+        "read_bytes": sum(s.get("read_bytes", 0) for s in subprocesses),
+        "write_bytes": sum(s.get("write_bytes", 0) for s in subprocesses),
+        "cache_hit": profile.get("cache_hit", False),
+        "critical": False,
+        "subprocesses": subprocesses,
+    }
+
+
+def get_critical_path(steps: Sequence[Dict[str, Any]]) -> List[int]:
+    """
+    Finds the chain of steps that determined the duration of the flow: starting
+    from the step that ended last, each step is preceded by the step that ended
+    last before it started, i.e., the one it most likely waited for.
+
+    In sequential flows, this is simply every step.
+
+    :param steps: Step entries as returned by :func:`summarize_step`
+    :returns: The indices of the steps on the critical path, in order
+    """
+    if len(steps) == 0:
+        return []
+    current = max(range(len(steps)), key=lambda i: steps[i]["end_time"])
+    path = [current]
+    while True:
+        start_time = steps[current]["start_time"]
+        candidates = [
+            i
+            for i, step in enumerate(steps)
+            if i not in path and step["end_time"] <= start_time + _TOLERANCE
+        ]
+        if len(candidates) == 0:
+            break
+        current = max(candidates, key=lambda i: steps[i]["end_time"])
+        path.append(current)
+    return list(reversed(path))
+
+
+def compare_profiles(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """
+    Compares the wall time, CPU time and peak memory usage of every step with
+    those of the step with the same ID (and occurrence, if a step runs more
+    than once) in a baseline report.
+
+    :param report: A report as returned by :func:`create_profile_report`
+    :param baseline: Another report
+    :param threshold: See :data:`REGRESSION_THRESHOLD`
+    :returns: A list of regressions, each with the ``step`` ID, the ``metric``,
+        the ``baseline`` and ``current`` values and the ``ratio`` between them.
+    """
+
+    def key_steps(steps: List[Dict[str, Any]]) -> Dict[Tuple[str, int], Dict]:
+        result: Dict[Tuple[str, int], Dict] = {}
+        for step in steps:
+            occurrence = 0
+            while (step["id"], occurrence) in result:
+                occurrence += 1
+            result[(step["id"], occurrence)] = step
+        return result
+
+    baseline_steps = key_steps(baseline["steps"])
+    regressions = []
+    for key, step in key_steps(report["steps"]).items():
+        baseline_step = baseline_steps.get(key)
+        if baseline_step is None or step["cache_hit"] or baseline_step["cache_hit"]:
+            continue
+        for metric, minimum_delta in REGRESSION_MINIMUM_DELTA.items():
+            current = step[metric]
+            previous = baseline_step[metric]
+            if current - previous <= minimum_delta:
+                continue
+            if current <= previous * (1 + threshold):
+                continue
+            regressions.append(
+                {
+                    "step": step["id"],
+                    "metric": metric,
+                    "baseline": previous,
+                    "current": current,
+                    "ratio": current / previous if previous > 0 else None,
+                }
+            )
+    return regressions
+
+
+def create_profile_report(
+    profiles: Sequence[Tuple[Dict[str, Any], str]],
+    baseline: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    :param profiles: Pairs of step profiles, as returned by
+        :meth:`Step.get_profile`, and step directories. Profiles of steps that
+        did not run are skipped.
+    :param baseline: An optional baseline report to compare against.
+    :returns: The profiling report.
+    """
+    steps = [
+        summarize_step(profile, step_dir)
+        for profile, step_dir in profiles
+        if profile["start_time"] is not None and profile["end_time"] is not None
+    ]
+    steps.sort(key=lambda step: step["start_time"])
+    critical_path = get_critical_path(steps)
+    for i in critical_path:
+        steps[i]["critical"] = True
+
+    report: Dict[str, Any] = {
+        "version": PROFILE_VERSION,
+        "start_time": min((s["start_time"] for s in steps), default=None),
+        "end_time": max((s["end_time"] for s in steps), default=None),
+        "wall_time": 0.0,
+        "cpu_time": sum(s["cpu_time"] for s in steps),
+        "peak_memory_rss": max((s["peak_memory_rss"] for s in steps), default=0),
+        "critical_path": [steps[i]["id"] for i in critical_path],
+        "critical_path_time": sum(steps[i]["wall_time"] for i in critical_path),
+        "steps": steps,
+    }
+    if len(steps) != 0:
+        report["wall_time"] = report["end_time"] - report["start_time"]
+    if baseline is not None:
+        report["regressions"] = compare_profiles(report, baseline)
+    return report
+
+
+def to_chrome_trace(report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    :param report: A report as returned by :func:`create_profile_report`
+    :returns: The report as a timeline in the Chrome trace event format.
+
+        Steps running concurrently are placed on separate rows, with their
+        subprocesses nested underneath them. Steps on the critical path are
+        highlighted.
+    """
+    events: List[Dict[str, Any]] = []
+    origin = report["start_time"] or 0.0
+
+    def us(timestamp: float) -> float:
+        return round((timestamp - origin) * 1e6, 3)
+
+    lanes: List[float] = []
+    for step in report["steps"]:
+        # Greedily reuse the first row that is free by the time the step starts
+        for lane, available in enumerate(lanes):
+            if available <= step["start_time"]:
+                break
+        else:
+            lane = len(lanes)
+            lanes.append(0.0)
+        lanes[lane] = step["end_time"]
+
+        event = {
+            "name": step["id"],
+            "cat": "step",
+            "ph": "X",
+            "pid": 1,
+            "tid": lane,
+            "ts": us(step["start_time"]),
+            "dur": us(step["end_time"]) - us(step["start_time"]),
+            "args": {
+                k: step[k]
+                for k in [
+                    "dir",
+                    "cpu_time",
+                    "peak_memory_rss",
+                    "avg_memory_rss",
+                    "read_bytes",
+                    "write_bytes",
+                    "cache_hit",
+                    "critical",
+                ]
+            },
+        }
+        if step["critical"]:
+            event["cname"] = "bad"
+        events.append(event)
+        for subprocess in step["subprocesses"]:
+            events.append(
+                {
+                    "name": subprocess["command"],
+                    "cat": "subprocess",
+                    "ph": "X",
+                    "pid": 1,
+                    "tid": lane,
+                    "ts": us(subprocess["start_time"]),
+                    "dur": us(subprocess["end_time"]) - us(subprocess["start_time"]),
+                    "args": {
+                        k: v
+                        for k, v in subprocess.items()
+                        if k not in ["command", "start_time", "end_time"]
+                    },
+                }
+            )
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def load_profile_report(run_dir: str) -> Dict[str, Any]:
+    """
+    :param run_dir: A run directory
+    :returns: The profiling report of the run directory. If the run did not
+        finish, a report is created from the profiles of the steps that did.
+    """
+    report_path = os.path.join(run_dir, PROFILE_FILENAME)
+    if os.path.isfile(report_path):
+        with open(report_path, encoding="utf8") as f:
+            return json.load(f)
+
+    profiles = []
+    for entry in sorted(os.listdir(run_dir)):
+        profile_path = os.path.join(run_dir, entry, PROFILE_FILENAME)
+        if not os.path.isfile(profile_path):
+            continue
+        with open(profile_path, encoding="utf8") as f:
+            profiles.append((json.load(f), os.path.join(run_dir, entry)))
+    return create_profile_report(profiles)
+
+
+def write_profile_report(
+    run_dir: str,
+    profiles: Sequence[Tuple[Dict[str, Any], str]],
+    baseline_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Creates a profiling report and writes it, and its timeline, to the run
+    directory.
+
+    :param run_dir: The run directory
+    :param profiles: See :func:`create_profile_report`
+    :param baseline_dir: An optional baseline run directory to compare against
+    :returns: The profiling report.
+    """
+    baseline = None
+    if baseline_dir is not None:
+        baseline = load_profile_report(baseline_dir)
+    report = create_profile_report(profiles, baseline)
+    with open(os.path.join(run_dir, PROFILE_FILENAME), "w") as f:
+        json.dump(report, f, indent=4)
+    with open(os.path.join(run_dir, TRACE_FILENAME), "w") as f:
+        json.dump(to_chrome_trace(report), f)
+    return report
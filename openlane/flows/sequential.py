@@ -15,16 +15,20 @@ from __future__ import annotations
 import fnmatch
 
 import os
+from concurrent.futures import Future, wait, FIRST_COMPLETED
 from typing import Iterable, List, Set, Tuple, Optional, Type, Dict, Union
 
 from .flow import Flow, FlowException, FlowError
 from ..state import State
-from ..logging import info, success, err, debug
+from ..common import GenericImmutableDict, get_scheduler, slugify
+from ..logging import info, success, err, debug, verbose
 from ..steps import (
     Step,
     StepError,
     StepException,
     DeferredStepError,
+    MetricsUpdate,
+    ViewsUpdate,
 )
 
 
@@ -55,6 +59,24 @@ class SequentialFlow(Flow):
     :cvar gating_config_vars: A mapping from step ID (wildcards) to lists of
         boolean variable names. All boolean variables must be True for a step with
         a specific ID to execute.
+
+    If ``parallel`` is passed to :meth:`start`, steps that do not depend on one
+    another are instead run concurrently using :meth:`start_step_async`. A step
+    depends on an earlier step if:
+
+    * The earlier step outputs any of the step's inputs or outputs
+    * The step reads metrics (see :attr:`Step.reads_metrics`)
+
+    Each step's input state is then composed from the initial state and the
+    results of its (transitive) dependencies, and the final state is composed
+    from the results of all steps in the order they were declared, so the
+    result is deterministic regardless of the order in which steps finish.
+
+    If ``incremental`` is passed to :meth:`start` when resuming a run, the
+    results of the latest directory of each step in the run directory are
+    reused (see :meth:`Step.try_reuse`) until the first step whose
+    configuration, input state or input files have changed. That step and
+    every step after it are run again.
     """
 
     gating_config_vars: Dict[str, List[str]] = {}
@@ -178,6 +200,8 @@ class SequentialFlow(Flow):
         to: Optional[str] = None,
         skip: Optional[Iterable[str]] = None,
         reproducible: Optional[str] = None,
+        parallel: bool = False,
+        incremental: bool = False,
         **kwargs,
     ) -> Tuple[State, List[Step]]:
         step_ids = {cls.id.lower(): cls.id for cls in reversed(self.Steps)}
@@ -237,7 +261,18 @@ class SequentialFlow(Flow):
                 if fnmatch.fnmatch(id, key):
                     gating_cvars_expanded[id] = value
 
+        if parallel and reproducible is not None:
+            verbose("Reproducibles require steps to be run sequentially.")
+            parallel = False
+
+        previous_step_dirs: Dict[str, str] = {}
+        if incremental:
+            previous_step_dirs = self.__get_previous_step_dirs()
+
         current_state = initial_state
+        scheduled_steps: List[Step] = []
+        scheduled_dirs: List[str] = []
+        reusing = len(previous_step_dirs) != 0
         for cls in self.Steps:
             step = cls(config=self.config, state_in=current_state)
             if frm_resolved is not None and frm_resolved == step.id:
@@ -252,9 +287,29 @@ class SequentialFlow(Flow):
                         )
                         gated = True
 
+            skipped = not executing or cls.id in skipped_ids or gated
+            reused_state: Optional[State] = None
+            if not skipped and cls.id != reproducible_resolved and reusing:
+                reused_state = self.__try_reuse(step, previous_step_dirs)
+
+            if parallel and not skipped and reused_state is None:
+                reusing = False
+                # Its input state is realized once all of its dependencies
+                # are done. The step's directory is claimed now, so ordinals
+                # follow the order of the steps, while its stage is only
+                # started once the step is.
+                step.state_in = Future()
+                step_list.append(step)
+                scheduled_steps.append(step)
+                scheduled_dirs.append(self.dir_for_step(step))
+                self.progress_bar.increment_ordinal()
+                if to_resolved and to_resolved == step.id:
+                    executing = False
+                continue
+
             self.progress_bar.start_stage(step.name)
             increment_ordinal = True
-            if not executing or cls.id in skipped_ids or gated:
+            if skipped:
                 info(f"Skipping step '{step.name}'…")
                 increment_ordinal = False
             elif cls.id == reproducible_resolved:
@@ -265,7 +320,12 @@ class SequentialFlow(Flow):
                     )
                 )
                 break
+            elif reused_state is not None:
+                step_list.append(step)
+                current_state = reused_state
+                increment_ordinal = False
             else:
+                reusing = False
                 step_list.append(step)
                 try:
                     current_state = step.start(
@@ -283,6 +343,15 @@ class SequentialFlow(Flow):
 
             if to_resolved and to_resolved == step.id:
                 executing = False
+
+        if parallel:
+            current_state = self.__run_parallel(
+                current_state,
+                scheduled_steps,
+                scheduled_dirs,
+                deferred_errors,
+            )
+
         if len(deferred_errors) != 0:
             err("The following deferred step errors have been encountered:")
             for error in deferred_errors:
@@ -294,8 +363,140 @@ class SequentialFlow(Flow):
         info(f"Saving final views to '{final_views_path}'…")
         debug(f"'{self.run_dir}'")
         try:
-            current_state.save_snapshot(final_views_path)
+            # Step directories are not modified once a step is done, so the
+            # final views can safely share their contents
+            current_state.save_snapshot(final_views_path, mode="link")
         except Exception as e:
             raise FlowException(f"Failed to save final views: {e}")
         success("Flow complete.")
         return (current_state, step_list)
+
+    def __get_previous_step_dirs(self) -> Dict[str, str]:
+        assert self.run_dir is not None
+        previous_step_dirs: Dict[str, str] = {}
+        latest_ordinals: Dict[str, int] = {}
+        for entry in os.listdir(self.run_dir):
+            components = entry.split("-", maxsplit=1)
+            if len(components) < 2:
+                continue
+            try:
+                ordinal = int(components[0])
+            except ValueError:
+                continue
+            slug = components[1]
+            if ordinal > latest_ordinals.get(slug, 0):
+                latest_ordinals[slug] = ordinal
+                previous_step_dirs[slug] = os.path.join(self.run_dir, entry)
+        return previous_step_dirs
+
+    def __try_reuse(
+        self,
+        step: Step,
+        previous_step_dirs: Dict[str, str],
+    ) -> Optional[State]:
+        step_dir = previous_step_dirs.get(slugify(step.id))
+        if step_dir is None:
+            return None
+        state_out = step.try_reuse(step_dir)
+        if state_out is not None:
+            info(
+                f"Reusing the results of '{step.name}' from '{os.path.relpath(step_dir)}'…"
+            )
+        return state_out
+
+    @staticmethod
+    def depends_on(step: Type[Step], earlier: Type[Step]) -> bool:
+        """
+        :param step: A step
+        :param earlier: A step that precedes ``step`` in the flow
+        :returns: Whether ``step`` has to wait for ``earlier`` to finish
+        """
+        if step.reads_metrics:
+            return True
+        earlier_outputs = set(earlier.outputs)
+        return not earlier_outputs.isdisjoint(
+            step.inputs
+        ) or not earlier_outputs.isdisjoint(step.outputs)
+
+    def __run_parallel(
+        self,
+        initial_state: State,
+        steps: List[Step],
+        step_dirs: List[str],
+        deferred_errors: List[str],
+    ) -> State:
+        dependencies: List[Set[int]] = []
+        for i, step in enumerate(steps):
+            step_dependencies: Set[int] = set()
+            for j in range(i):
+                if self.depends_on(type(step), type(steps[j])):
+                    step_dependencies.add(j)
+                    step_dependencies.update(dependencies[j])
+            dependencies.append(step_dependencies)
+
+        results: Dict[int, Tuple[ViewsUpdate, MetricsUpdate]] = {}
+        running: Dict[Future[State], int] = {}
+        started: Set[int] = set()
+        error: Optional[Exception] = None
+
+        def compose(indices: Iterable[int]) -> State:
+            state = initial_state
+            for index in sorted(indices):
+                views_updates, metrics_updates = results[index]
+                state = State(
+                    state,
+                    overrides=views_updates,
+                    metrics=GenericImmutableDict(
+                        state.metrics, overrides=metrics_updates
+                    ),
+                )
+            return state
+
+        while True:
+            if error is None:
+                for i, step in enumerate(steps):
+                    if i in started or not dependencies[i].issubset(results):
+                        continue
+                    started.add(i)
+                    assert isinstance(step.state_in, Future)
+                    step.state_in.set_result(compose(dependencies[i]))
+                    self.progress_bar.start_stage(step.name)
+                    running[
+                        get_scheduler().submit(
+                            step.start,
+                            toolbox=self.toolbox,
+                            step_dir=step_dirs[i],
+                        )
+                    ] = i
+
+            if len(running) == 0:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                step = steps[i]
+                # The step's directory has already been claimed
+                self.progress_bar.end_stage(increment_ordinal=False)
+                try:
+                    future.result()
+                except StepException as e:
+                    error = error or FlowException(str(e))
+                    continue
+                except DeferredStepError as e:
+                    deferred_errors.append(str(e))
+                    results[i] = ({}, {})
+                    continue
+                except StepError as e:
+                    error = error or FlowError(str(e))
+                    continue
+
+                # Every update is kept, even those equal to the step's input:
+                # they still take precedence over those of earlier steps
+                assert step.updates is not None
+                results[i] = step.updates
+
+        if error is not None:
+            raise error
+
+        return compose(range(len(steps)))
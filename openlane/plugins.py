@@ -11,11 +11,120 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+"""
+Discovery of OpenLane plugins, i.e. modules on ``sys.path`` whose names start
+with ``openlane_plugin_``.
+
+Plugins are only imported once they are needed, i.e. when a step or a flow is
+not found in its factory, when all steps or flows are listed, or when
+``discovered_plugins`` is accessed. Finding them requires listing every
+directory on ``sys.path``, so the plugins found in each directory are stored
+in an index in OpenLane's cache directory and reused while the directory
+is unmodified.
+"""
+import os
+import sys
+import json
+import uuid
 import pkgutil
 import importlib
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+PLUGIN_PREFIX = "openlane_plugin_"
+
+#: Incremented whenever the format of the index changes
+PLUGIN_INDEX_VERSION = 1
+
+_discovered_plugins: Optional[Dict[str, ModuleType]] = None
+
+
+def _get_index_path() -> str:
+    from .common import get_cache_dir
+
+    return get_cache_dir("plugin_index.json")
+
+
+def _read_index(index_path: str) -> Dict[str, Any]:
+    try:
+        with open(index_path, encoding="utf8") as f:
+            index = json.load(f)
+        if index.get("version") == PLUGIN_INDEX_VERSION:
+            return index["entries"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def _write_index(index_path: str, entries: Dict[str, Any]):
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        tmp_path = f"{index_path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            json.dump({"version": PLUGIN_INDEX_VERSION, "entries": entries}, f)
+        os.replace(tmp_path, index_path)
+    except OSError:
+        pass
+
+
+def find_plugins(path: Optional[List[str]] = None) -> List[str]:
+    """
+    :param path: The directories to search. Defaults to ``sys.path``.
+    :returns: The names of the plugin modules in these directories, in
+        the order in which they would be imported.
+    """
+    if path is None:
+        path = sys.path
+
+    index_path = _get_index_path()
+    entries = _read_index(index_path)
+    modified = False
+
+    found: List[str] = []
+    for entry in path:
+        entry = os.path.abspath(entry or os.curdir)
+        try:
+            mtime = os.stat(entry).st_mtime
+        except OSError:
+            continue
+        cached = entries.get(entry)
+        if cached is None or cached["mtime"] != mtime:
+            cached = {
+                "mtime": mtime,
+                "plugins": [
+                    name
+                    for _, name, _ in pkgutil.iter_modules([entry])
+                    if name.startswith(PLUGIN_PREFIX)
+                ],
+            }
+            entries[entry] = cached
+            modified = True
+        for name in cached["plugins"]:
+            if name not in found:
+                found.append(name)
+
+    if modified:
+        _write_index(index_path, entries)
+
+    return found
+
+
+def load_plugins() -> Dict[str, ModuleType]:
+    """
+    Imports all plugins, unless they have already been imported.
+
+    :returns: A dictionary of the plugins, with the module name as a key and
+        the module as a value.
+    """
+    global _discovered_plugins
+    if _discovered_plugins is None:
+        _discovered_plugins = {}
+        for name in find_plugins():
+            _discovered_plugins[name] = importlib.import_module(name)
+    return _discovered_plugins
+
 
-discovered_plugins = {
-    name: importlib.import_module(name)
-    for finder, name, ispkg in pkgutil.iter_modules()
-    if name.startswith("openlane_plugin_")
-}
+def __getattr__(name: str) -> Any:
+    if name == "discovered_plugins":
+        return load_plugins()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,30 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# If the step passed its configuration in a file instead of environment
+# variables, loads it into ::env so scripts may access it as usual. Variables
+# already in the environment were set by the step itself and are kept.
+if { [info exists ::env(_OPENLANE_CONFIG_TCL)] && ![info exists ::openlane_config_loaded] } {
+    set ::openlane_config_loaded 1
+    set config_file [open $::env(_OPENLANE_CONFIG_TCL) r]
+    fconfigure $config_file -encoding utf-8
+    set config [read $config_file]
+    close $config_file
+    dict for {key value} $config {
+        if { ![info exists ::env($key)] } {
+            set ::env($key) $value
+        }
+    }
+    unset -nocomplain config_file config key value
+}
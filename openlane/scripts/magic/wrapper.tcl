@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+source $::env(SCRIPTS_DIR)/config.tcl
+
 if {[catch {source $::env(MAGIC_SCRIPT)} err]} {
     puts "Error: $err"
     exit 1
@@ -0,0 +1,170 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A long-lived worker running odbpy scripts inside a single OpenROAD process.
+
+Requests are read from standard input as JSON objects, one per line, with the
+keys ``script``, ``args``, ``env``, ``cwd``, ``log`` and ``metrics``. For
+every request, one JSON object with the keys ``status`` (``ok`` or
+``restart``) and ``returncode`` is written to the file descriptor passed
+using ``--response-fd``.
+
+The database last written to an ODB file is kept in memory: if the next
+script's input is that same, unmodified file, it is not read again. If it is
+any other file, the worker responds with ``restart``, as OpenROAD cannot
+replace a loaded design, and exits. The worker also exits after any script
+fails, as the in-memory database is then in an unknown state.
+"""
+# flake8: noqa E402
+import os
+import sys
+import json
+import runpy
+import traceback
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import utl
+import reader
+
+
+class RestartRequired(Exception):
+    pass
+
+
+def get_stamp(path: str) -> Tuple[int, int]:
+    file_stat = os.stat(path)
+    return (file_stat.st_size, file_stat.st_mtime_ns)
+
+
+loaded = False
+resident: Dict[str, Tuple[int, int]] = {}
+odb_written: Set[str] = set()
+metrics: Dict[str, Any] = {}
+
+original_init = reader.OdbReader.__init__
+
+
+def resident_init(self, *args, **kwargs):
+    global loaded
+    if not loaded:
+        loaded = True
+        original_init(self, *args, **kwargs)
+        return
+    if len(args) != 1:
+        raise RestartRequired()
+    db_in = os.path.realpath(args[0])
+    if resident.get(db_in) != get_stamp(db_in):
+        raise RestartRequired()
+    # The design is already loaded: only set up the reader's attributes
+    original_init(self, **kwargs)
+
+
+reader.OdbReader.__init__ = resident_init
+
+original_write_odb = reader.write_fn["odb"]
+
+
+def write_odb(reader_object, file):
+    original_write_odb(reader_object, file)
+    if file:
+        odb_written.add(os.path.realpath(file))
+
+
+reader.write_fn["odb"] = write_odb
+
+
+def record_metric(name, value):
+    metrics[name] = value
+
+
+for metric_fn in ["metric", "metric_integer", "metric_float"]:
+    if hasattr(utl, metric_fn):
+        setattr(utl, metric_fn, record_metric)
+
+
+def run_script(script: str, args: List[str]) -> int:
+    sys.argv = [script] + args
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except RestartRequired:
+        raise
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    odb_written.clear()
+    metrics.clear()
+
+    os.environ.clear()
+    os.environ.update(request["env"])
+    os.chdir(request["cwd"])
+
+    status = "ok"
+    returncode = 0
+    with open(request["log"], "w", encoding="utf8") as log:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_fds = [os.dup(1), os.dup(2)]
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            returncode = run_script(request["script"], request["args"])
+        except RestartRequired:
+            status = "restart"
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            for fd in saved_fds:
+                os.close(fd)
+
+    if len(metrics) != 0:
+        with open(request["metrics"], "w", encoding="utf8") as f:
+            json.dump(metrics, f)
+
+    resident.clear()
+    for path in odb_written:
+        resident[path] = get_stamp(path)
+
+    return {"status": status, "returncode": returncode}
+
+
+def main():
+    response_fd = int(sys.argv[sys.argv.index("--response-fd") + 1])
+    with os.fdopen(response_fd, "w", encoding="utf8") as responses:
+        for line in sys.stdin:
+            if line.strip() == "":
+                continue
+            response = handle(json.loads(line))
+            responses.write(json.dumps(response) + "\n")
+            responses.flush()
+            if response["status"] != "ok" or response["returncode"] != 0:
+                break
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+source $::env(SCRIPTS_DIR)/config.tcl
 source $::env(SCRIPTS_DIR)/openroad/common/set_global_connections.tcl
 
 proc string_in_file {file_path substring} {
@@ -75,39 +76,64 @@ proc read_current_netlist {args} {
 
 }
 
-proc read_timing_info {args} {
-    if { ![info exists ::env(CURRENT_CORNER_NAME)] } {
-        return
+proc get_timing_views {} {
+    # Either multiple corners, as a dict from each corner to its timing views,
+    # or a single one
+    if { [info exists ::env(CURRENT_CORNERS_TIMING_VIEWS)] } {
+        return $::env(CURRENT_CORNERS_TIMING_VIEWS)
+    }
+    if { [info exists ::env(CURRENT_CORNER_NAME)] } {
+        return [list $::env(CURRENT_CORNER_NAME) $::env(CURRENT_CORNER_TIMING_VIEWS)]
     }
-    set corner_name $::env(CURRENT_CORNER_NAME)
-    define_corners $corner_name
+    return [list]
+}
 
-    puts "Reading timing models for corner $corner_name…"
+proc read_timing_libs {args} {
+    # Defines all corners and reads their timing libraries. Macro netlists and
+    # parasitics are collected in ::macro_nls and ::macro_spefs respectively.
+    set ::macro_spefs [list]
+    set ::macro_nls [list]
 
-    set macro_spefs [list]
-    set macro_nls [list]
-    set corner_models $::env(CURRENT_CORNER_TIMING_VIEWS)
-    foreach model $corner_models {
-        if { [string match *.spef $model] || [string match *.spef.gz $model] } {
-            lappend macro_spefs $corner_name $model
-        } elseif { [string match *.v $model] } {
-            lappend macro_nls $model
-        } else {
-            puts "Reading timing library for the '$corner_name' corner at '$model'…"
-            read_liberty -corner $corner_name $model
-        }
+    set timing_views [get_timing_views]
+    if { [llength $timing_views] == 0 } {
+        return
     }
+    define_corners {*}[dict keys $timing_views]
+
+    dict for {corner_name corner_models} $timing_views {
+        puts "Reading timing models for corner $corner_name…"
+
+        foreach model $corner_models {
+            if { [string match *.spef $model] || [string match *.spef.gz $model] } {
+                lappend ::macro_spefs $corner_name $model
+            } elseif { [string match *.v $model] } {
+                if { [lsearch -exact $::macro_nls $model] == -1 } {
+                    lappend ::macro_nls $model
+                }
+            } else {
+                puts "Reading timing library for the '$corner_name' corner at '$model'…"
+                read_liberty -corner $corner_name $model
+            }
+        }
 
-    if { [info exists ::env(EXTRA_LIBS) ] } {
-        puts "Reading explicitly-specified extra libs for $corner_name…"
-        foreach extra_lib $::env(EXTRA_LIBS) {
-            puts "Reading extra timing library for the '$corner_name' corner at '$extra_lib'…"
-            read_liberty -corner $corner_name $extra_lib
+        if { [info exists ::env(EXTRA_LIBS) ] } {
+            puts "Reading explicitly-specified extra libs for $corner_name…"
+            foreach extra_lib $::env(EXTRA_LIBS) {
+                puts "Reading extra timing library for the '$corner_name' corner at '$extra_lib'…"
+                read_liberty -corner $corner_name $extra_lib
+            }
         }
     }
+}
+
+proc read_timing_info {args} {
+    if { [llength [get_timing_views]] == 0 } {
+        return
+    }
+    read_timing_libs
 
     set blackbox_wildcard {/// sta-blackbox}
-    foreach nl $macro_nls {
+    foreach nl $::macro_nls {
         puts "Reading macro netlist at '$nl'…"
         if { [catch {read_verilog $nl} err] } {
             puts "Error while reading macro netlist '$nl':"
@@ -129,7 +155,6 @@ proc read_timing_info {args} {
         }
     }
     read_current_netlist
-    set ::macro_spefs $macro_spefs
 }
 
 proc read_spefs {} {
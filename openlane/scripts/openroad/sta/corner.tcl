@@ -12,8 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-# This file supports one defined corner per-process.
-# Any more defined corners will be ignored.
+# This file analyzes every defined corner. If multiple corners are defined,
+# the reports for each corner are written to a subdirectory named after it.
 # Aggregation is left to the OpenLane step.
 
 
@@ -30,10 +30,19 @@ set_cmd_units\
 set sta_report_default_digits 6
 
 if { ![info exists ::env(OPENSTA)] || !$::env(OPENSTA) } {
+    if { ![info exists ::env(STA_PNR_LIBS)] || !$::env(STA_PNR_LIBS) } {
+        # The corners are defined before the database is read so that the
+        # libraries of the default corner are not read instead
+        read_timing_libs
+    }
+    # Otherwise, the PnR libraries of the default corner, i.e. with the
+    # excluded cells removed, are read along with the database
     read_current_odb
 
     # Internal API- brittle
-    if { [grt::have_routes] } {
+    if { [info exists ::env(CURRENT_SPEF_BY_CORNER)] } {
+        # Extracted parasitics are read below
+    } elseif { [grt::have_routes] } {
         estimate_parasitics -global_routing
     } elseif { [rsz::check_corner_wire_cap] } {
         estimate_parasitics -placement
@@ -45,190 +54,8 @@ read_spefs
 
 set_propagated_clock [all_clocks]
 
-set corner [lindex [sta::corners] 0]
-sta::set_cmd_corner $corner
-
 set clocks [sta::sort_by_name [sta::all_clocks]]
 
-puts "%OL_CREATE_REPORT min.rpt"
-puts "\n==========================================================================="
-puts "report_checks -path_delay min (Hold)"
-puts "============================================================================"
-puts "======================= [$corner name] Corner ===================================\n"
-report_checks -sort_by_slack -path_delay min -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000 -corner [$corner name]
-puts ""
-puts "%OL_END_REPORT"
-
-
-puts "%OL_CREATE_REPORT max.rpt"
-puts "\n==========================================================================="
-puts "report_checks -path_delay max (Setup)"
-puts "============================================================================"
-puts "======================= [$corner name] Corner ===================================\n"
-report_checks -sort_by_slack -path_delay max -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000 -corner [$corner name]
-puts ""
-puts "%OL_END_REPORT"
-
-
-puts "%OL_CREATE_REPORT checks.rpt"
-puts "\n==========================================================================="
-puts "report_checks -unconstrained"
-puts "==========================================================================="
-puts "======================= [$corner name] Corner ===================================\n"
-report_checks -unconstrained -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
-puts ""
-
-
-puts "\n==========================================================================="
-puts "report_checks --slack_max -0.01"
-puts "============================================================================"
-puts "======================= [$corner name] Corner ===================================\n"
-report_checks -slack_max -0.01 -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
-puts ""
-
-puts "\n==========================================================================="
-puts " report_check_types -max_slew -max_cap -max_fanout -violators"
-puts "============================================================================"
-puts "======================= [$corner name] Corner ===================================\n"
-report_check_types -max_slew -max_capacitance -max_fanout -violators -corner [$corner name]
-puts ""
-
-puts "\n==========================================================================="
-puts "report_parasitic_annotation -report_unannotated"
-puts "============================================================================"
-report_parasitic_annotation -report_unannotated
-
-puts "\n==========================================================================="
-puts "max slew violation count [sta::max_slew_violation_count]"
-write_metric_int "design__max_slew_violation__count__corner:[$corner name]" [sta::max_slew_violation_count]
-puts "max fanout violation count [sta::max_fanout_violation_count]"
-write_metric_int "design__max_fanout_violation__count__corner:[$corner name]" [sta::max_fanout_violation_count]
-puts "max cap violation count [sta::max_capacitance_violation_count]"
-write_metric_int "design__max_cap_violation__count__corner:[$corner name]" [sta::max_capacitance_violation_count]
-puts "============================================================================"
-
-puts "\n==========================================================================="
-puts "check_setup -verbose -unconstrained_endpoints -multiple_clock -no_clock -no_input_delay -loops -generated_clocks"
-puts "==========================================================================="
-check_setup -verbose -unconstrained_endpoints -multiple_clock -no_clock -no_input_delay -loops -generated_clocks
-puts "%OL_END_REPORT"
-
-
-
-puts "%OL_CREATE_REPORT power.rpt"
-puts "\n==========================================================================="
-puts " report_power"
-puts "============================================================================"
-puts "======================= [$corner name] Corner ===================================\n"
-report_power -corner [$corner name]
-
-set power_result [sta::design_power $corner]
-set totals       [lrange $power_result  0  3]
-lassign $totals design_internal design_switching design_leakage design_total
-
-write_metric_num "power__internal__total" $design_internal
-write_metric_num "power__switching__total" $design_switching
-write_metric_num "power__leakage__total" $design_leakage
-write_metric_num "power__total" $design_total
-
-puts ""
-puts "%OL_END_REPORT"
-
-
-puts "%OL_CREATE_REPORT skew.min.rpt"
-puts "\n==========================================================================="
-puts "Clock Skew (Hold)"
-puts "============================================================================"
-set skew_corner [sta::format_time [sta::worst_clk_skew_cmd "min"] $sta_report_default_digits]
-write_metric_num "clock__skew__worst_hold__corner:[$corner name]" $skew_corner
-
-puts "======================= [$corner name] Corner ===================================\n"
-report_clock_skew -corner [$corner name] -hold
-
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT skew.max.rpt"
-puts "\n==========================================================================="
-puts "Clock Skew (Setup)"
-puts "============================================================================"
-set skew_corner [sta::format_time [sta::worst_clk_skew_cmd "max"] $sta_report_default_digits]
-
-write_metric_num "clock__skew__worst_setup__corner:[$corner name]" $skew_corner
-
-puts "======================= [$corner name] Corner ===================================\n"
-report_clock_skew -corner [$corner name] -setup
-
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT ws.min.rpt"
-puts "\n==========================================================================="
-puts "Worst Slack (Hold)"
-puts "============================================================================"
-set ws [sta::format_time [sta::worst_slack_corner $corner "min"] $sta_report_default_digits]
-write_metric_num "timing__hold__ws__corner:[$corner name]" $ws
-puts "[$corner name]: $ws"
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT ws.max.rpt"
-puts "\n==========================================================================="
-puts "Worst Slack (Setup)"
-puts "============================================================================"
-
-set ws [sta::format_time [sta::worst_slack_corner $corner "max"] $sta_report_default_digits]
-write_metric_num "timing__setup__ws__corner:[$corner name]" $ws
-puts "[$corner name]: $ws"
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT tns.min.rpt"
-puts "\n==========================================================================="
-puts "Total Negative Slack (Hold)"
-puts "============================================================================"
-
-set tns [sta::format_time [sta::total_negative_slack_corner_cmd $corner "min"] $sta_report_default_digits]
-write_metric_num "timing__hold__tns__corner:[$corner name]" $tns
-puts "[$corner name]: $tns"
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT tns.max.rpt"
-puts "\n==========================================================================="
-puts "Total Negative Slack (Setup)"
-puts "============================================================================"
-set tns_design 0
-foreach corner [sta::corners] {
-    set tns [sta::format_time [sta::total_negative_slack_corner_cmd $corner "max"] $sta_report_default_digits]
-    write_metric_num "timing__setup__tns__corner:[$corner name]" $tns
-    puts "[$corner name]: $tns"
-}
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT wns.min.rpt"
-puts "\n==========================================================================="
-puts "Worst Negative Slack (Hold)"
-puts "============================================================================"
-
-set ws [sta::format_time [sta::worst_slack_corner $corner "min"] $sta_report_default_digits]
-set wns 0
-if { $ws < 0 } {
-    set wns $ws
-}
-write_metric_num "timing__hold__wns__corner:[$corner name]" $wns
-puts "[$corner name]: $wns"
-puts "%OL_END_REPORT"
-
-puts "%OL_CREATE_REPORT wns.max.rpt"
-puts "\n==========================================================================="
-puts "Worst Negative Slack (Setup)"
-puts "============================================================================"
-
-set ws [sta::format_time [sta::worst_slack_corner $corner "max"] $sta_report_default_digits]
-set wns 0.0
-if { $ws < 0 } {
-    set wns $ws
-}
-write_metric_num "timing__setup__wns__corner:[$corner name]" $wns
-puts "[$corner name]: $wns"
-puts "%OL_END_REPORT"
-
 proc check_if_terminal {pin_object} {
     set net [get_nets -of_object $pin_object]
     if { "$net" == "NULL" } {
@@ -237,71 +64,298 @@ proc check_if_terminal {pin_object} {
     return 0
 }
 
-puts "%OL_CREATE_REPORT violator_list.rpt"
-puts "\n==========================================================================="
-puts "Violator List"
-puts "============================================================================"
-
-set total_hold_vios 0
-set r2r_hold_vios 0
-set total_setup_vios 0
-set r2r_setup_vios 0
-
-set hold_timing_paths [find_timing_paths -unique_paths_to_endpoint -path_delay min -sort_by_slack -group_count 999999999 -slack_max 0]
-foreach path $hold_timing_paths {
-    set from "reg"
-    set to "reg"
+proc filter_unannotated {annotation_report corner_name} {
+    # Nets without wires need no parasitics, so only unannotated nets with
+    # wires are of concern. Equivalent to odbpy/filter_unannotated.py, which
+    # requires the database in designs read from a netlist.
+    #
+    # Sample report:
+    # Found 324 unannotated drivers.
+    #  analog_io[0]
+    # Found 68 partially unannotated drivers.
+    #  wbs_adr_i[0]
+    #   mprj/wbs_adr_i[31]
+    set block [ord::get_db_block]
+    set reported_count 0
+    set filtered_count 0
+    foreach line [split $annotation_report "\n"] {
+        if { ![regexp {^ (\S+)} $line -> net_name] } {
+            continue
+        }
+        incr reported_count
+        set net [$block findNet $net_name]
+        if { $net != "NULL" && [$net getWire] != "NULL" } {
+            incr filtered_count
+        }
+    }
+    write_metric_int "timing__unannotated_nets__count__corner:$corner_name" $reported_count
+    write_metric_int "timing__unannotated_nets_filtered__count__corner:$corner_name" $filtered_count
+}
 
-    set start_pin [get_property $path startpoint]
-    set end_pin [get_property $path endpoint]
+set corners [sta::corners]
+foreach corner $corners {
+    # Also selects the corner of the clock skew queries below
+    sta::set_cmd_corner $corner
 
-    if { [check_if_terminal $start_pin] } {
-        set from "in"
-    }
-    if { [check_if_terminal $end_pin] } {
-        set to "out"
+    set report_prefix ""
+    if { [llength $corners] > 1 } {
+        set report_prefix "[$corner name]/"
     }
-    set kind "$from-$to"
 
-    incr total_hold_vios
-    if { "$kind" == "reg-reg" } {
-        incr r2r_hold_vios
+    puts "%OL_CREATE_REPORT ${report_prefix}min.rpt"
+    puts "\n==========================================================================="
+    puts "report_checks -path_delay min (Hold)"
+    puts "============================================================================"
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_checks -sort_by_slack -path_delay min -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000 -corner [$corner name]
+    puts ""
+    puts "%OL_END_REPORT"
+
+
+    puts "%OL_CREATE_REPORT ${report_prefix}max.rpt"
+    puts "\n==========================================================================="
+    puts "report_checks -path_delay max (Setup)"
+    puts "============================================================================"
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_checks -sort_by_slack -path_delay max -fields {slew cap input nets fanout} -format full_clock_expanded -group_count 1000 -corner [$corner name]
+    puts ""
+    puts "%OL_END_REPORT"
+
+
+    puts "%OL_CREATE_REPORT ${report_prefix}checks.rpt"
+    puts "\n==========================================================================="
+    puts "report_checks -unconstrained"
+    puts "==========================================================================="
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_checks -unconstrained -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
+    puts ""
+
+
+    puts "\n==========================================================================="
+    puts "report_checks --slack_max -0.01"
+    puts "============================================================================"
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_checks -slack_max -0.01 -fields {slew cap input nets fanout} -format full_clock_expanded -corner [$corner name]
+    puts ""
+
+    puts "\n==========================================================================="
+    puts " report_check_types -max_slew -max_cap -max_fanout -violators"
+    puts "============================================================================"
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_check_types -max_slew -max_capacitance -max_fanout -violators -corner [$corner name]
+    puts ""
+
+    puts "\n==========================================================================="
+    puts "report_parasitic_annotation -report_unannotated"
+    puts "============================================================================"
+    if { [info exists ::env(STA_FILTER_UNANNOTATED)] && $::env(STA_FILTER_UNANNOTATED) } {
+        sta::redirect_string_begin
+        report_parasitic_annotation -report_unannotated
+        set annotation_report [sta::redirect_string_end]
+        puts -nonewline $annotation_report
+        filter_unannotated $annotation_report [$corner name]
+    } else {
+        report_parasitic_annotation -report_unannotated
     }
 
-    puts "\[hold $kind] [get_property $start_pin full_name] -> [get_property $end_pin full_name] : [get_property $path slack]"
-}
+    # sta::max_{slew,capacitance}_violation_count check all corners at once
+    set slew_violation_count [llength [sta::check_slew_limits "NULL" 1 $corner max]]
+    set fanout_violation_count [sta::max_fanout_violation_count]
+    set cap_violation_count [llength [sta::check_capacitance_limits "NULL" 1 $corner max]]
+    puts "\n==========================================================================="
+    puts "max slew violation count $slew_violation_count"
+    puts "max fanout violation count $fanout_violation_count"
+    puts "max cap violation count $cap_violation_count"
+    write_metric_int "design__max_slew_violation__count__corner:[$corner name]" $slew_violation_count
+    write_metric_int "design__max_fanout_violation__count__corner:[$corner name]" $fanout_violation_count
+    write_metric_int "design__max_cap_violation__count__corner:[$corner name]" $cap_violation_count
+    puts "============================================================================"
+
+    puts "\n==========================================================================="
+    puts "check_setup -verbose -unconstrained_endpoints -multiple_clock -no_clock -no_input_delay -loops -generated_clocks"
+    puts "==========================================================================="
+    check_setup -verbose -unconstrained_endpoints -multiple_clock -no_clock -no_input_delay -loops -generated_clocks
+    puts "%OL_END_REPORT"
+
+
+
+    puts "%OL_CREATE_REPORT ${report_prefix}power.rpt"
+    puts "\n==========================================================================="
+    puts " report_power"
+    puts "============================================================================"
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_power -corner [$corner name]
+
+    set power_result [sta::design_power $corner]
+    set totals       [lrange $power_result  0  3]
+    lassign $totals design_internal design_switching design_leakage design_total
+
+    write_metric_num "power__internal__total" $design_internal
+    write_metric_num "power__switching__total" $design_switching
+    write_metric_num "power__leakage__total" $design_leakage
+    write_metric_num "power__total" $design_total
+
+    puts ""
+    puts "%OL_END_REPORT"
+
+
+    puts "%OL_CREATE_REPORT ${report_prefix}skew.min.rpt"
+    puts "\n==========================================================================="
+    puts "Clock Skew (Hold)"
+    puts "============================================================================"
+    set skew_corner [sta::format_time [sta::worst_clk_skew_cmd "min"] $sta_report_default_digits]
+    write_metric_num "clock__skew__worst_hold__corner:[$corner name]" $skew_corner
+
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_clock_skew -corner [$corner name] -hold
+
+    puts "%OL_END_REPORT"
+
+    puts "%OL_CREATE_REPORT ${report_prefix}skew.max.rpt"
+    puts "\n==========================================================================="
+    puts "Clock Skew (Setup)"
+    puts "============================================================================"
+    set skew_corner [sta::format_time [sta::worst_clk_skew_cmd "max"] $sta_report_default_digits]
+
+    write_metric_num "clock__skew__worst_setup__corner:[$corner name]" $skew_corner
+
+    puts "======================= [$corner name] Corner ===================================\n"
+    report_clock_skew -corner [$corner name] -setup
+
+    puts "%OL_END_REPORT"
+
+    puts "%OL_CREATE_REPORT ${report_prefix}ws.min.rpt"
+    puts "\n==========================================================================="
+    puts "Worst Slack (Hold)"
+    puts "============================================================================"
+    set ws [sta::format_time [sta::worst_slack_corner $corner "min"] $sta_report_default_digits]
+    write_metric_num "timing__hold__ws__corner:[$corner name]" $ws
+    puts "[$corner name]: $ws"
+    puts "%OL_END_REPORT"
+
+    puts "%OL_CREATE_REPORT ${report_prefix}ws.max.rpt"
+    puts "\n==========================================================================="
+    puts "Worst Slack (Setup)"
+    puts "============================================================================"
+
+    set ws [sta::format_time [sta::worst_slack_corner $corner "max"] $sta_report_default_digits]
+    write_metric_num "timing__setup__ws__corner:[$corner name]" $ws
+    puts "[$corner name]: $ws"
+    puts "%OL_END_REPORT"
+
+    puts "%OL_CREATE_REPORT ${report_prefix}tns.min.rpt"
+    puts "\n==========================================================================="
+    puts "Total Negative Slack (Hold)"
+    puts "============================================================================"
+
+    set tns [sta::format_time [sta::total_negative_slack_corner_cmd $corner "min"] $sta_report_default_digits]
+    write_metric_num "timing__hold__tns__corner:[$corner name]" $tns
+    puts "[$corner name]: $tns"
+    puts "%OL_END_REPORT"
 
-set setup_timing_paths [find_timing_paths -unique_paths_to_endpoint -path_delay max -sort_by_slack -group_count 999999999 -slack_max 0]
-foreach path $setup_timing_paths {
-    set from "reg"
-    set to "reg"
+    puts "%OL_CREATE_REPORT ${report_prefix}tns.max.rpt"
+    puts "\n==========================================================================="
+    puts "Total Negative Slack (Setup)"
+    puts "============================================================================"
+    set tns [sta::format_time [sta::total_negative_slack_corner_cmd $corner "max"] $sta_report_default_digits]
+    write_metric_num "timing__setup__tns__corner:[$corner name]" $tns
+    puts "[$corner name]: $tns"
+    puts "%OL_END_REPORT"
 
-    set start_pin [get_property $path startpoint]
-    set end_pin [get_property $path endpoint]
+    puts "%OL_CREATE_REPORT ${report_prefix}wns.min.rpt"
+    puts "\n==========================================================================="
+    puts "Worst Negative Slack (Hold)"
+    puts "============================================================================"
 
-    if { [check_if_terminal $start_pin] } {
-        set from "in"
+    set ws [sta::format_time [sta::worst_slack_corner $corner "min"] $sta_report_default_digits]
+    set wns 0
+    if { $ws < 0 } {
+        set wns $ws
     }
-    if { [check_if_terminal $end_pin] } {
-        set to "out"
+    write_metric_num "timing__hold__wns__corner:[$corner name]" $wns
+    puts "[$corner name]: $wns"
+    puts "%OL_END_REPORT"
+
+    puts "%OL_CREATE_REPORT ${report_prefix}wns.max.rpt"
+    puts "\n==========================================================================="
+    puts "Worst Negative Slack (Setup)"
+    puts "============================================================================"
+
+    set ws [sta::format_time [sta::worst_slack_corner $corner "max"] $sta_report_default_digits]
+    set wns 0.0
+    if { $ws < 0 } {
+        set wns $ws
+    }
+    write_metric_num "timing__setup__wns__corner:[$corner name]" $wns
+    puts "[$corner name]: $wns"
+    puts "%OL_END_REPORT"
+
+
+    puts "%OL_CREATE_REPORT ${report_prefix}violator_list.rpt"
+    puts "\n==========================================================================="
+    puts "Violator List"
+    puts "============================================================================"
+
+    set total_hold_vios 0
+    set r2r_hold_vios 0
+    set total_setup_vios 0
+    set r2r_setup_vios 0
+
+    set hold_timing_paths [find_timing_paths -corner [$corner name] -unique_paths_to_endpoint -path_delay min -sort_by_slack -group_count 999999999 -slack_max 0]
+    foreach path $hold_timing_paths {
+        set from "reg"
+        set to "reg"
+
+        set start_pin [get_property $path startpoint]
+        set end_pin [get_property $path endpoint]
+
+        if { [check_if_terminal $start_pin] } {
+            set from "in"
+        }
+        if { [check_if_terminal $end_pin] } {
+            set to "out"
+        }
+        set kind "$from-$to"
+
+        incr total_hold_vios
+        if { "$kind" == "reg-reg" } {
+            incr r2r_hold_vios
+        }
+
+        puts "\[hold $kind] [get_property $start_pin full_name] -> [get_property $end_pin full_name] : [get_property $path slack]"
     }
 
-    set kind "$from-$to"
+    set setup_timing_paths [find_timing_paths -corner [$corner name] -unique_paths_to_endpoint -path_delay max -sort_by_slack -group_count 999999999 -slack_max 0]
+    foreach path $setup_timing_paths {
+        set from "reg"
+        set to "reg"
 
-    incr total_setup_vios
-    if { "$kind" == "reg-reg" } {
-        incr r2r_setup_vios
-    }
+        set start_pin [get_property $path startpoint]
+        set end_pin [get_property $path endpoint]
 
-    puts "\[setup $kind] [get_property $start_pin full_name] -> [get_property $end_pin full_name] : [get_property $path slack]"
-}
+        if { [check_if_terminal $start_pin] } {
+            set from "in"
+        }
+        if { [check_if_terminal $end_pin] } {
+            set to "out"
+        }
+
+        set kind "$from-$to"
 
-write_metric_int "timing__hold_vio__count__corner:[$corner name]" $total_hold_vios
-write_metric_int "timing__hold_r2r_vio__count__corner:[$corner name]" $r2r_hold_vios
-write_metric_int "timing__setup_vio__count__corner:[$corner name]" $total_setup_vios
-write_metric_int "timing__setup_r2r_vio__count__corner:[$corner name]" $r2r_setup_vios
-puts "%OL_END_REPORT"
+        incr total_setup_vios
+        if { "$kind" == "reg-reg" } {
+            incr r2r_setup_vios
+        }
 
+        puts "\[setup $kind] [get_property $start_pin full_name] -> [get_property $end_pin full_name] : [get_property $path slack]"
+    }
+
+    write_metric_int "timing__hold_vio__count__corner:[$corner name]" $total_hold_vios
+    write_metric_int "timing__hold_r2r_vio__count__corner:[$corner name]" $r2r_hold_vios
+    write_metric_int "timing__setup_vio__count__corner:[$corner name]" $total_setup_vios
+    write_metric_int "timing__setup_r2r_vio__count__corner:[$corner name]" $r2r_setup_vios
+    puts "%OL_END_REPORT"
+}
 
 write_sdfs
 write_libs
@@ -21,6 +21,14 @@ OpenLane step. The State is essentially a list of views in various formats in
 addition to the cumulative set of metrics created by previous Steps.
 """
 from .state import State, InvalidState, StateElement
+from .lazy import (
+    lazy_views_enabled,
+    register_materializer,
+    defer_view,
+    is_lazy_view,
+    materialize_view,
+)
+from .compression import compress_views, decompress_views, is_compressed_view
 from ..common import DesignFormat, DesignFormatObject
 
 # For backwards compatibility
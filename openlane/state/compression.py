@@ -0,0 +1,184 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Textual views, e.g. DEF or SPEF files, can optionally be stored
+gzip-compressed, in which case the state points to the compressed file (the
+path suffixed with ``.gz``.) Tools cannot read those directly, so steps are
+given decompressed temporary copies of their inputs.
+"""
+from __future__ import annotations
+
+import os
+import gzip
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+from .state import State, StateElement
+from ..common import DesignFormat, Path, mkdirp, copy_recursive, get_scheduler
+
+COMPRESSED_SUFFIX = ".gz"
+
+#: Levels above ~3 barely improve the ratio for netlists and parasitics while
+#: taking considerably longer
+COMPRESSION_LEVEL = 3
+
+COMPRESSIBLE_FORMATS = [
+    DesignFormat.NETLIST,
+    DesignFormat.POWERED_NETLIST,
+    DesignFormat.POWERED_NETLIST_SDF_FRIENDLY,
+    DesignFormat.POWERED_NETLIST_NO_PHYSICAL_CELLS,
+    DesignFormat.DEF,
+    DesignFormat.SDF,
+    DesignFormat.SPEF,
+    DesignFormat.SPICE,
+]
+
+
+def is_compressed_view(path: str) -> bool:
+    return path.endswith(COMPRESSED_SUFFIX)
+
+
+def compress_file(path: str) -> str:
+    """
+    Replaces a file with a gzip-compressed copy.
+
+    The output only depends on the contents of the file, so identical files
+    have identical compressed copies.
+
+    :param path: The file
+    :returns: The path of the compressed copy
+    """
+    compressed_path = f"{path}{COMPRESSED_SUFFIX}"
+    temporary_path = f"{compressed_path}.tmp"
+    with open(path, "rb") as i, open(temporary_path, "wb") as o:
+        with gzip.GzipFile(
+            filename="",
+            mode="wb",
+            fileobj=o,
+            compresslevel=COMPRESSION_LEVEL,
+            mtime=0,
+        ) as g:
+            shutil.copyfileobj(i, g, 1024 * 1024)
+    os.replace(temporary_path, compressed_path)
+    os.unlink(path)
+    return compressed_path
+
+
+def decompress_file(path: str, target: str):
+    """
+    Writes the decompressed contents of a gzip-compressed file to ``target``.
+    """
+    with gzip.open(path, "rb") as i, open(target, "wb") as o:
+        shutil.copyfileobj(i, o, 1024 * 1024)
+
+
+def compress_views(
+    views: Mapping[DesignFormat, StateElement],
+    directory: str,
+) -> Dict[DesignFormat, StateElement]:
+    """
+    Compresses, in parallel, all views of compressible formats that are
+    located inside a directory.
+
+    :param views: For example, the views update returned by :meth:`Step.run`
+    :param directory: The directory, e.g. a step directory
+    :returns: A copy of ``views`` pointing to the compressed views
+    """
+    directory = os.path.abspath(directory)
+    to_compress: List[str] = []
+
+    def collect(x: Any) -> Any:
+        if (
+            isinstance(x, Path)
+            and not is_compressed_view(x)
+            and os.path.isfile(x)
+            and not os.path.relpath(os.path.abspath(x), directory).startswith("..")
+        ):
+            to_compress.append(str(x))
+        return x
+
+    for format, value in views.items():
+        if format in COMPRESSIBLE_FORMATS:
+            copy_recursive(value, translator=collect)
+
+    if len(to_compress) == 0:
+        return dict(views)
+
+    with get_scheduler().reserve_up_to(len(to_compress)) as cpus:
+        with ThreadPoolExecutor(max_workers=cpus) as executor:
+            compressed = dict(
+                zip(to_compress, executor.map(compress_file, to_compress))
+            )
+
+    def replace(x: Any) -> Any:
+        if isinstance(x, Path) and str(x) in compressed:
+            return Path(compressed[str(x)])
+        return x
+
+    return {
+        format: copy_recursive(value, translator=replace)
+        for format, value in views.items()
+    }
+
+
+def decompress_views(
+    state: State,
+    formats: Iterable[DesignFormat],
+    directory: str,
+) -> Tuple[State, Dict[str, str]]:
+    """
+    Decompresses, in parallel, the compressed views of a state into a
+    directory.
+
+    :param state: The state
+    :param formats: The formats of the views to decompress
+    :param directory: The directory to decompress the views into. Views keep
+        their file names, minus the compression suffix.
+    :returns: A copy of the state pointing to the decompressed views and a
+        dictionary from every decompressed view to the compressed original.
+    """
+    originals: Dict[str, str] = {}
+
+    def visitor(x: Any) -> Any:
+        if not isinstance(x, Path) or not is_compressed_view(x):
+            return x
+        name = os.path.basename(x)[: -len(COMPRESSED_SUFFIX)]
+        target = os.path.join(directory, name)
+        counter = 1
+        while target in originals and originals[target] != str(x):
+            target = os.path.join(directory, str(counter), name)
+            counter += 1
+        originals[target] = str(x)
+        return Path(target)
+
+    overrides: Dict[DesignFormat, StateElement] = {}
+    for format in formats:
+        if state[format] is not None:
+            overrides[format] = copy_recursive(state[format], translator=visitor)
+
+    if len(originals) == 0:
+        return state, {}
+
+    for target in originals:
+        mkdirp(os.path.dirname(target))
+    with get_scheduler().reserve_up_to(len(originals)) as cpus:
+        with ThreadPoolExecutor(max_workers=cpus) as executor:
+            for future in [
+                executor.submit(decompress_file, original, target)
+                for target, original in originals.items()
+            ]:
+                future.result()
+
+    return state.__class__(state, overrides=overrides, metrics=state.metrics), originals
@@ -0,0 +1,147 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Lazy views are views that can be derived from another view of the same
+design, e.g. a DEF file from an ODB file, and are thus only written the first
+time they are actually needed.
+
+A lazy view is a path in a :class:`State` that does not exist yet, accompanied
+by a recipe file (the path suffixed with ``.lazy.json``) naming the view it
+is derived from. It is materialized by a function registered for the pair of
+formats using :func:`register_materializer`, after which the recipe is
+removed.
+"""
+from __future__ import annotations
+
+import os
+import json
+import uuid
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+from ..common import DesignFormat, DesignFormatObject
+
+LAZY_VIEWS_ENV_VAR = "OPENLANE_LAZY_VIEWS"
+LAZY_VIEW_SUFFIX = ".lazy.json"
+
+Materializer = Callable[[str, str], None]
+
+_materializers: Dict[Tuple[str, str], Materializer] = {}
+_locks: Dict[str, Lock] = {}
+_locks_lock = Lock()
+
+
+def lazy_views_enabled() -> bool:
+    """
+    :returns: Whether steps should record derivable views as lazy views instead
+        of writing them, which is the default unless the environment variable
+        ``OPENLANE_LAZY_VIEWS`` is set to ``0``.
+    """
+    return os.getenv(LAZY_VIEWS_ENV_VAR, "1").lower() not in ["0", "false", "no", "off"]
+
+
+def register_materializer(source_format: DesignFormat, format: DesignFormat):
+    """
+    A decorator registering a function that writes a view in ``format``
+    derived from a view in ``source_format``.
+
+    The function is called with the path of the source view and the path the
+    derived view should be written to.
+    """
+    assert isinstance(source_format.value, DesignFormatObject)
+    assert isinstance(format.value, DesignFormatObject)
+
+    def decorator(fn: Materializer) -> Materializer:
+        _materializers[(source_format.value.id, format.value.id)] = fn
+        return fn
+
+    return decorator
+
+
+def get_recipe_path(path: str) -> str:
+    return f"{path}{LAZY_VIEW_SUFFIX}"
+
+
+def defer_view(
+    path: str,
+    format: DesignFormat,
+    source: str,
+    source_format: DesignFormat,
+):
+    """
+    Records ``path`` as a lazy view in ``format`` derivable from ``source``.
+
+    :param path: The path the view will be materialized at
+    :param format: The format of the view
+    :param source: The path of the view it is derived from, which should be
+        located in the same directory or one of its subdirectories so the
+        recipe stays valid if the directory is copied.
+    :param source_format: The format of the source view
+    """
+    assert isinstance(source_format.value, DesignFormatObject)
+    assert isinstance(format.value, DesignFormatObject)
+    if (source_format.value.id, format.value.id) not in _materializers:
+        raise ValueError(
+            f"No way to derive a {format.value.id} view from a {source_format.value.id} view is registered."
+        )
+    recipe = {
+        "format": format.value.id,
+        "source": os.path.relpath(source, os.path.dirname(os.path.abspath(path))),
+        "source_format": source_format.value.id,
+    }
+    with open(get_recipe_path(path), "w", encoding="utf8") as f:
+        json.dump(recipe, f)
+
+
+def is_lazy_view(path: str) -> bool:
+    """
+    :returns: Whether ``path`` is a lazy view that has not been materialized.
+    """
+    return not os.path.exists(path) and os.path.isfile(get_recipe_path(path))
+
+
+def materialize_view(path: str) -> bool:
+    """
+    Writes a lazy view if it has not been materialized already.
+
+    Materialization is atomic and guarded against concurrent materialization
+    of the same view by other threads.
+
+    :param path: The path of the lazy view
+    :returns: Whether the view was materialized by this call.
+    """
+    path = os.path.abspath(path)
+    with _locks_lock:
+        lock = _locks.setdefault(path, Lock())
+    with lock:
+        if not is_lazy_view(path):
+            return False
+        recipe_path = get_recipe_path(path)
+        with open(recipe_path, encoding="utf8") as f:
+            recipe = json.load(f)
+        source = os.path.join(os.path.dirname(path), recipe["source"])
+        materializer = _materializers.get((recipe["source_format"], recipe["format"]))
+        if materializer is None:
+            raise ValueError(
+                f"No way to derive a {recipe['format']} view from a {recipe['source_format']} view is registered."
+            )
+        temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            materializer(source, temporary_path)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.unlink(temporary_path)
+        os.unlink(recipe_path)
+        return True
@@ -15,10 +15,10 @@ from __future__ import annotations
 
 import os
 import json
-import shutil
 from decimal import Decimal
-from typing import List, Mapping, Union, Optional, Dict, Any
+from typing import Iterable, List, Mapping, Tuple, Union, Optional, Dict, Any
 
+from .lazy import is_lazy_view, materialize_view
 from ..common import (
     Path,
     GenericImmutableDict,
@@ -27,6 +27,9 @@ from ..common import (
     DesignFormat,
     DesignFormatObject,
 )
+from ..common.transfer import TransferMode, transfer_files
+
+SNAPSHOT_MANIFEST_VERSION = 1
 
 
 class InvalidState(RuntimeError):
@@ -126,10 +129,29 @@ class State(GenericImmutableDict[str, StateElement]):
         new = State(self, metrics=metrics)
         return new
 
-    def __save_snapshot_recursive(
+    def materialize(self, formats: Optional[Iterable[DesignFormat]] = None):
+        """
+        Writes any lazy views in the state that have not been materialized yet.
+
+        :param formats: The formats of the views to materialize. If unset, all
+            views are materialized.
+        """
+        if formats is None:
+            formats = DesignFormat
+
+        def visitor(x: Any) -> Any:
+            if isinstance(x, Path):
+                materialize_view(x)
+            return x
+
+        for format in formats:
+            copy_recursive(self[format], translator=visitor)
+
+    def __get_snapshot_files_recursive(
         self,
         path: Union[str, os.PathLike],
         views: Union[Dict, "State"],
+        files: List[Tuple[str, str]],
         key_path: str = "",
     ):
         mkdirp(path)
@@ -145,9 +167,10 @@ class State(GenericImmutableDict[str, StateElement]):
 
             if isinstance(value, dict):
                 subdirectory = os.path.join(path, current_folder)
-                self.__save_snapshot_recursive(
+                self.__get_snapshot_files_recursive(
                     subdirectory,
                     value,
+                    files,
                     key_path=current_key_path,
                 )
             else:
@@ -157,17 +180,33 @@ class State(GenericImmutableDict[str, StateElement]):
                 )
                 mkdirp(target_dir)
                 target_path = os.path.join(target_dir, os.path.basename(value))
-                shutil.copyfile(value, target_path, follow_symlinks=True)
+                files.append((os.path.realpath(value), target_path))
 
-    def save_snapshot(self, path: Union[str, os.PathLike]):
+    def save_snapshot(
+        self,
+        path: Union[str, os.PathLike],
+        mode: TransferMode = "copy",
+    ):
         """
-        Validates the current state then saves all views to a folder by
-        design format, including the metrics.
+        Validates the current state, materializes any lazy views, then saves
+        all views to a folder by design format, including the metrics.
+
+        Views are transferred in parallel (see :func:`transfer_files`.) A
+        manifest, ``manifest.json``, lists the size and SHA-256 hash of every
+        view in the snapshot, so it may be verified without reading the views.
 
         :param path: The folder that would contain other folders.
+        :param mode: ``copy`` to save independent copies of the views, or
+            ``link`` to hard-link them where possible, which takes no time nor
+            disk space, but means that modifying a view in the snapshot also
+            modifies it wherever it was created.
         """
         self.validate()
-        self.__save_snapshot_recursive(path, self)
+        self.materialize()
+        files: List[Tuple[str, str]] = []
+        self.__get_snapshot_files_recursive(path, self, files)
+        transferred = transfer_files(files, mode=mode)
+
         metrics_csv_path = os.path.join(path, "metrics.csv")
         with open(metrics_csv_path, "w", encoding="utf8") as f:
             f.write("Metric,Value\n")
@@ -178,6 +217,16 @@ class State(GenericImmutableDict[str, StateElement]):
         with open(metrics_json_path, "w", encoding="utf8") as f:
             f.write(self.metrics.dumps())
 
+        manifest = {
+            "version": SNAPSHOT_MANIFEST_VERSION,
+            "files": {
+                os.path.relpath(target, path): transferred[target]
+                for target in sorted(transferred)
+            },
+        }
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=4)
+
     def __validate_recursive(
         self,
         views: Dict,
@@ -192,7 +241,7 @@ class State(GenericImmutableDict[str, StateElement]):
                 )
             if value is not None:
                 if isinstance(value, Path):
-                    if not value.exists():
+                    if not value.exists() and not is_lazy_view(value):
                         raise InvalidState(
                             f"Path for format {current_key_path} does not exist: '{value}'."
                         )
@@ -207,7 +256,8 @@ class State(GenericImmutableDict[str, StateElement]):
 
     def validate(self):
         """
-        Ensures that all paths exist in a State.
+        Ensures that all paths exist in a State, or are lazy views that can be
+        materialized.
         """
         self.__validate_recursive(self.to_raw_dict(metrics=False))
 
@@ -232,7 +282,11 @@ class State(GenericImmutableDict[str, StateElement]):
                     key_path=current_key_path,
                 )
             else:
-                if validate_path and not os.path.exists(value):
+                if (
+                    validate_path
+                    and not os.path.exists(value)
+                    and not is_lazy_view(value)
+                ):
                     raise ValueError(
                         f"Provided path '{value}' to design format '{current_key_path}' does not exist."
                     )
@@ -19,6 +19,9 @@ The Step Module
 This modules includes various functions for importing and/or generating OpenLane
 configuration objects. Configuration objects are the primary input to a flow.
 """
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
 from .step import (
     StepError,
     DeferredStepError,
@@ -26,27 +29,68 @@ from .step import (
     Step,
     MetricsUpdate,
     ViewsUpdate,
+    OutputProcessor,
+    MetricsProcessor,
+    ReportProcessor,
 )
 from .tclstep import TclStep
-from . import checker as Checker
 
-# You'll notice some TclStep subclasses are exposed separately-
-# this is for documentation.
-from . import yosys as Yosys
-from .yosys import YosysStep
+if TYPE_CHECKING:
+    from . import checker as Checker
+
+    from . import yosys as Yosys
+    from .yosys import YosysStep
+
+    from . import openroad as OpenROAD
+    from .openroad import OpenROADStep
+
+    from . import magic as Magic
+    from .magic import MagicStep
+
+    from . import odb as Odb
+    from .odb import OdbpyStep
+
+    from . import netgen as Netgen
+    from .netgen import NetgenStep
 
-from . import openroad as OpenROAD
-from .openroad import OpenROADStep
+    from . import klayout as KLayout
+    from . import misc as Misc
+    from . import verilator as Verilator
 
-from . import magic as Magic
-from .magic import MagicStep
+# The modules of each tool are only imported once they are accessed, either
+# as attributes of this module or by retrieving one of their steps from
+# Step.factory, which finds them using the prefix of the step's ID.
+_tool_modules: Dict[str, str] = {
+    "Checker": "checker",
+    "Yosys": "yosys",
+    "OpenROAD": "openroad",
+    "Magic": "magic",
+    "Odb": "odb",
+    "Netgen": "netgen",
+    "KLayout": "klayout",
+    "Misc": "misc",
+    "Verilator": "verilator",
+}
+_tool_step_classes: Dict[str, Tuple[str, str]] = {
+    "YosysStep": ("yosys", "YosysStep"),
+    "OpenROADStep": ("openroad", "OpenROADStep"),
+    "MagicStep": ("magic", "MagicStep"),
+    "OdbpyStep": ("odb", "OdbpyStep"),
+    "NetgenStep": ("netgen", "NetgenStep"),
+}
 
-from . import odb as Odb
-from .odb import OdbpyStep
+for _prefix, _module in _tool_modules.items():
+    Step.factory.register_lazy(_prefix, f"{__name__}.{_module}")
 
-from . import netgen as Netgen
-from .netgen import NetgenStep
 
-from . import klayout as KLayout
-from . import misc as Misc
-from . import verilator as Verilator
+def __getattr__(name: str) -> Any:
+    value: Any
+    if module := _tool_modules.get(name):
+        value = importlib.import_module(f"{__name__}.{module}")
+    elif name in _tool_step_classes:
+        module, attribute = _tool_step_classes[name]
+        value = getattr(importlib.import_module(f"{__name__}.{module}"), attribute)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
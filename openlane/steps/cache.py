@@ -0,0 +1,313 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from ..state import State, StateElement, is_lazy_view
+from ..state.lazy import get_recipe_path
+from ..common import (
+    GenericDictEncoder,
+    DesignFormat,
+    Path,
+    mkdirp,
+    copy_recursive,
+    get_cache_dir,
+    hash_file_memoized,
+)
+from ..logging import debug, warn
+from ..__version__ import __version__
+
+CACHE_ENV_VAR = "OPENLANE_STEP_CACHE"
+
+
+def hash_path(path: str) -> str:
+    """
+    :param path: A path to a file or directory
+    :returns: The SHA-256 hash of the file's contents. Directories and missing
+        files are instead identified by their path.
+
+        Hashes are memoized by the file's path, modification time and size.
+    """
+    if not os.path.isfile(path):
+        # Directories (e.g. DESIGN_DIR) and missing files are keyed by path
+        return f"path:{path}"
+    return hash_file_memoized(path)
+
+
+def get_input_hashes(
+    config: Mapping[str, Any],
+    state_in: State,
+    inputs: Any,
+) -> Dict[str, str]:
+    """
+    :param config: A step's raw configuration dictionary
+    :param state_in: The step's resolved input state
+    :param inputs: The :class:`DesignFormat`\\s declared as the step's inputs
+    :returns: A dictionary of every file referenced by either the configuration
+        or the input views to its hash (see :func:`hash_path`).
+    """
+    hashes: Dict[str, str] = {}
+
+    def visitor(x: Any) -> Any:
+        if isinstance(x, Path):
+            hashes[str(x)] = hash_path(str(x))
+        return x
+
+    copy_recursive(config, translator=visitor)
+    for input in inputs:
+        copy_recursive(state_in[input], translator=visitor)
+    return hashes
+
+
+class StepCache(object):
+    """
+    An on-disk, content-addressed cache of step results.
+
+    Each entry is keyed by a hash of:
+
+    * The step's implementation ID and the version of OpenLane
+    * The step's configuration (i.e. the contents of its ``config.json``), where
+      the contents of any files pointed to by the configuration are hashed as
+      well
+    * The contents of the step's input views and the input metrics
+    * Anything else affecting the step's results, as returned by
+      :meth:`Step.get_cache_key_extras`
+
+    A hit restores the output views into the step directory and returns
+    the metrics the step originally generated, skipping :meth:`Step.run`
+    entirely.
+
+    Only results where every output view is located inside the step directory
+    are stored.
+
+    :param cache_dir: The directory in which to store the cache. If unset,
+        ``steps`` inside OpenLane's cache directory is used.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = os.path.abspath(cache_dir or get_cache_dir("steps"))
+
+    def get_key(
+        self,
+        implementation_id: str,
+        config: Mapping[str, Any],
+        state_in: State,
+        inputs: Any,
+        extras: Optional[Mapping[str, Any]] = None,
+    ) -> str:
+        """
+        :param implementation_id: The output of :meth:`Step.get_implementation_id`
+        :param config: The step's raw configuration dictionary
+        :param state_in: The step's resolved input state
+        :param inputs: The :class:`DesignFormat`\\s declared as the step's inputs
+        :param extras: The output of :meth:`Step.get_cache_key_extras`
+        :returns: A hexadecimal cache key
+        """
+
+        def visitor(x: Any) -> Any:
+            if isinstance(x, Path):
+                return hash_path(str(x))
+            return x
+
+        config_hashed = copy_recursive(
+            {k: v for k, v in config.items() if k != "meta"}, translator=visitor
+        )
+        inputs_hashed = {}
+        for input in inputs:
+            inputs_hashed[input.value.id] = copy_recursive(
+                state_in[input], translator=visitor
+            )
+        key_dict = {
+            "step": implementation_id,
+            "openlane_version": __version__,
+            "config": config_hashed,
+            "inputs": inputs_hashed,
+            "metrics": state_in.metrics,
+        }
+        if extras:
+            key_dict["extras"] = extras
+        key_material = json.dumps(
+            key_dict,
+            cls=GenericDictEncoder,
+            sort_keys=True,
+        )
+        return hashlib.sha256(key_material.encode("utf8")).hexdigest()
+
+    def __entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def restore(
+        self,
+        key: str,
+        step_dir: str,
+    ) -> Optional[Tuple[Dict[DesignFormat, StateElement], Dict[str, Any], int]]:
+        """
+        Attempts to restore a cached result into a step directory.
+
+        :param key: A key created using :meth:`get_key`
+        :param step_dir: The step directory to restore the output views into
+        :returns: ``None`` on a miss, or a tuple of the views update, the metrics
+            update and the number of bytes restored on a hit.
+        """
+        entry_dir = self.__entry_dir(key)
+        result_path = os.path.join(entry_dir, "result.json")
+        try:
+            with open(result_path, encoding="utf8") as f:
+                result = json.load(f, parse_float=Decimal)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            warn(f"Ignoring corrupted step cache entry '{entry_dir}': {e}")
+            return None
+
+        bytes_restored = 0
+
+        def visitor(x: Any) -> Any:
+            nonlocal bytes_restored
+            if not isinstance(x, str):
+                return x
+            source = os.path.join(entry_dir, "files", x)
+            target = os.path.join(step_dir, x)
+            mkdirp(os.path.dirname(target))
+            if not os.path.exists(source) and os.path.exists(get_recipe_path(source)):
+                shutil.copyfile(get_recipe_path(source), get_recipe_path(target))
+                return Path(target)
+            shutil.copyfile(source, target)
+            bytes_restored += os.path.getsize(target)
+            return Path(target)
+
+        views_updates: Dict[DesignFormat, StateElement] = {}
+        try:
+            for id, value in result["views"].items():
+                format = DesignFormat.by_id(id)
+                if format is None:
+                    return None
+                views_updates[format] = copy_recursive(value, translator=visitor)
+        except FileNotFoundError as e:
+            warn(f"Ignoring incomplete step cache entry '{entry_dir}': {e}")
+            return None
+
+        return views_updates, result["metrics"], bytes_restored
+
+    def store(
+        self,
+        key: str,
+        step_dir: str,
+        views_updates: Mapping[DesignFormat, StateElement],
+        metrics_updates: Mapping[str, Any],
+    ) -> bool:
+        """
+        Stores the result of a step in the cache.
+
+        :param key: A key created using :meth:`get_key`
+        :param step_dir: The step directory in which the views were created
+        :param views_updates: The views update returned by :meth:`Step.run`
+        :param metrics_updates: The metrics update returned by :meth:`Step.run`
+        :returns: Whether the result was stored or not.
+        """
+        entry_dir = self.__entry_dir(key)
+        if os.path.isdir(entry_dir):
+            return True
+
+        step_dir = os.path.abspath(step_dir)
+        relative_paths = []
+
+        def visitor(x: Any) -> Any:
+            if not isinstance(x, Path):
+                return x
+            relative = os.path.relpath(os.path.abspath(x), step_dir)
+            if relative.startswith(".."):
+                raise ValueError(f"'{x}' is not a file inside the step directory")
+            if is_lazy_view(x):
+                # Only the recipe is stored: it is materialized on restoration
+                relative_paths.append(get_recipe_path(relative))
+                return relative
+            if not os.path.isfile(x):
+                raise ValueError(f"'{x}' is not a file inside the step directory")
+            relative_paths.append(relative)
+            return relative
+
+        try:
+            views_serialized = {
+                format.value.id: copy_recursive(value, translator=visitor)
+                for format, value in views_updates.items()
+            }
+        except ValueError as e:
+            debug(f"Not caching step result: {e}")
+            return False
+
+        staging_dir = os.path.join(
+            os.path.dirname(entry_dir), f".{key}.{uuid.uuid4().hex}"
+        )
+        try:
+            for relative in relative_paths:
+                target = os.path.join(staging_dir, "files", relative)
+                mkdirp(os.path.dirname(target))
+                shutil.copyfile(os.path.join(step_dir, relative), target)
+            mkdirp(staging_dir)
+            with open(os.path.join(staging_dir, "result.json"), "w") as f:
+                json.dump(
+                    {"views": views_serialized, "metrics": metrics_updates},
+                    f,
+                    cls=GenericDictEncoder,
+                )
+            os.rename(staging_dir, entry_dir)
+        except OSError as e:
+            # Most likely another process stored the same entry first
+            debug(f"Failed to store step cache entry '{entry_dir}': {e}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return os.path.isdir(entry_dir)
+
+        return True
+
+
+def _get_initial_step_cache() -> Optional[StepCache]:
+    value = os.getenv(CACHE_ENV_VAR)
+    if value is None or value.lower() in ["", "0", "false", "no", "off"]:
+        return None
+    if value.lower() in ["1", "true", "yes", "on"]:
+        return StepCache()
+    return StepCache(value)
+
+
+STEP_CACHE: Optional[StepCache] = _get_initial_step_cache()
+
+
+def set_step_cache(cache: Optional[StepCache]):
+    """
+    Enables, replaces or disables (if set to ``None``) OpenLane's global step
+    result cache.
+
+    The cache is disabled by default, unless the environment variable
+    ``OPENLANE_STEP_CACHE`` is set to either ``1`` (for the default directory)
+    or a path to a cache directory.
+
+    :param cache: The replacement step cache
+    """
+    global STEP_CACHE
+    STEP_CACHE = cache
+
+
+def get_step_cache() -> Optional[StepCache]:
+    """
+    :returns: OpenLane's global step result cache, if enabled.
+    """
+    return STEP_CACHE
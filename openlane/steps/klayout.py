@@ -16,7 +16,7 @@ import sys
 import shutil
 import subprocess
 from base64 import b64encode
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 
 from .step import ViewsUpdate, MetricsUpdate, Step, StepError, StepException
 
@@ -237,6 +237,11 @@ class StreamOut(KLayoutStep):
         return None
 
 
+# Used by xor.drc if no tile size is specified, in µm
+XOR_DEFAULT_TILE_SIZE = 500
+XOR_MINIMUM_TILE_SIZE = 50
+
+
 @Step.factory.register()
 class XOR(KLayoutStep):
     """
@@ -326,6 +331,17 @@ class XOR(KLayoutStep):
 
         return {}, {"design__xor_difference__count": difference_count}
 
+    def reduce_memory_usage(self) -> Optional[Dict[str, Any]]:
+        # Fewer threads process fewer tiles at once, while smaller tiles need
+        # less memory each
+        thread_count = self.config["KLAYOUT_XOR_THREADS"] or os.cpu_count() or 1
+        if thread_count > 1:
+            return {"KLAYOUT_XOR_THREADS": thread_count // 2}
+        tile_size = self.config["KLAYOUT_XOR_TILE_SIZE"] or XOR_DEFAULT_TILE_SIZE
+        if tile_size > XOR_MINIMUM_TILE_SIZE:
+            return {"KLAYOUT_XOR_TILE_SIZE": max(tile_size // 2, XOR_MINIMUM_TILE_SIZE)}
+        return None
+
 
 class DRC(KLayoutStep):
     id = "KLayout.DRC"
@@ -368,6 +384,8 @@ class OpenGUI(KLayoutStep):
     inputs = [DesignFormat.DEF]
     outputs = []
 
+    cacheable = False
+
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         lyp = self.config["KLAYOUT_PROPERTIES"]
         lyt = self.config["KLAYOUT_TECH"]
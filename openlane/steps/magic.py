@@ -13,9 +13,11 @@
 # limitations under the License.
 import os
 import re
+import json
 import shutil
 from decimal import Decimal
 from abc import abstractmethod
+from concurrent.futures import Future
 from typing import Any, Dict, Literal, List, Optional, Sequence, Tuple, Union
 
 from .step import StepError, StepException, ViewsUpdate, MetricsUpdate, Step
@@ -23,10 +25,20 @@ from .tclstep import TclStep
 from ..state import DesignFormat, State
 
 from ..config import Variable
-from ..common import get_script_dir, DRC as DRCObject, Path
+from ..logging import debug
+from ..common import (
+    get_script_dir,
+    get_scheduler,
+    get_artifact_cache,
+    DRC as DRCObject,
+    GenericDictEncoder,
+    Path,
+)
 
 
 class MagicStep(TclStep):
+    reads_config_file = True
+
     inputs = [DesignFormat.GDS]
     outputs = []
 
@@ -223,6 +235,9 @@ class StreamOut(MagicStep):
     inputs = [DesignFormat.DEF]
     outputs = [DesignFormat.GDS, DesignFormat.MAG_GDS, DesignFormat.MAG]
 
+    # The die area is read from the metrics
+    reads_metrics = True
+
     config_vars = MagicStep.config_vars + [
         Variable(
             "DIE_AREA",
@@ -257,6 +272,50 @@ class StreamOut(MagicStep):
     def get_script_path(self):
         return os.path.join(get_script_dir(), "magic", "def", "mag_gds.tcl")
 
+    def __get_macro_bbox(
+        self,
+        macro: str,
+        gds: str,
+        env: Dict[str, Any],
+    ) -> List[Any]:
+        # The PR boundary of a macro only depends on its GDSII view, so it is
+        # stored in the artifact cache keyed by the view's hash
+        artifact_cache = get_artifact_cache()
+        bbox_path = os.path.join(self.step_dir, f"{macro}.bbox.json")
+        cache_key: Optional[str] = None
+        if artifact_cache is not None:
+            cache_key = artifact_cache.get_key(
+                "magic_get_bbox",
+                [gds, str(self.config["MAGIC_TECH"])],
+                [macro],
+            )
+            if artifact_cache.restore(cache_key, bbox_path):
+                debug(f"Using cached PR boundary for macro '{macro}'.")
+                with open(bbox_path, encoding="utf8") as f:
+                    return json.load(f)
+
+        env = env.copy()
+        env["_GDS_IN"] = gds
+        env["_MACRO_NAME_IN"] = macro
+        generated_metrics = self.run_subprocess(
+            self.get_command(),
+            env=env,
+            log_to=os.path.join(self.step_dir, f"{macro}.get_bbox.log"),
+            _script=os.path.join(get_script_dir(), "magic", "get_bbox.tcl"),
+        )
+
+        if generated_metrics == {}:
+            raise StepError(
+                f"Failed to extract PR boundary from GDSII view of macro '{macro}'. Ensure that the GDSII view has a PR boundary layer."
+            )
+        bbox = list(generated_metrics.values())
+
+        with open(bbox_path, "w", encoding="utf8") as f:
+            json.dump(bbox, f, cls=GenericDictEncoder)
+        if artifact_cache is not None and cache_key is not None:
+            artifact_cache.store(cache_key, bbox_path)
+        return bbox
+
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         kwargs, env = self.extract_env(kwargs)
 
@@ -271,28 +330,23 @@ class StreamOut(MagicStep):
             and self.config["MAGIC_MACRO_STD_CELL_SOURCE"] == "macro"
         ):
             macro_gds = []
-            env_copy = env.copy()
+            futures: Dict[str, Future[List[Any]]] = {}
             for macro in self.config["MACROS"].keys():
                 macro_gdses = [str(path) for path in self.config["MACROS"][macro].gds]
                 if len(macro_gdses) > 1:
                     raise StepException(
                         "Multiple GDSII files in one Macro currently unsupported when MAGIC_MACRO_STD_CELL_SOURCE is set to 'macro'."
                     )
-                env_copy["_GDS_IN"] = macro_gdses[0]
-                env_copy["_MACRO_NAME_IN"] = macro
-
-                generated_metrics = super().run_subprocess(
-                    self.get_command(),
-                    env=env_copy,
-                    log_to=os.path.join(self.step_dir, f"{macro}.get_bbox.log"),
-                    _script=os.path.join(get_script_dir(), "magic", "get_bbox.tcl"),
+                futures[macro] = get_scheduler().submit(
+                    self.__get_macro_bbox,
+                    macro,
+                    macro_gdses[0],
+                    env,
                 )
 
-                if generated_metrics == {}:
-                    raise StepError(
-                        f"Failed to extract PR boundary from GDSII view of macro '{macro}'. Ensure that the GDSII view has a PR boundary layer."
-                    )
-                macro_gds.append([macro, macro_gdses, generated_metrics.values()])
+            for macro, bbox_future in futures.items():
+                macro_gdses = [str(path) for path in self.config["MACROS"][macro].gds]
+                macro_gds.append([macro, macro_gdses, bbox_future.result()])
 
             env["__MACRO_GDS"] = TclStep.value_to_tcl(macro_gds)
 
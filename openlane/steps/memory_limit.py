@@ -0,0 +1,162 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Memory limits for subprocesses, enforced using a cgroup (v2) if OpenLane is
+allowed to create one, or ``RLIMIT_AS`` otherwise.
+"""
+from __future__ import annotations
+
+import os
+import re
+import uuid
+import subprocess
+from typing import Iterable, Optional
+
+import psutil
+
+from ..logging import debug
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# Printed by tools that fail to allocate memory: C++ (OpenROAD, Yosys,
+# KLayout), Python, Tcl and libc respectively
+OOM_PATTERN = re.compile(
+    r"std::bad_alloc|MemoryError|unable to (re)?alloc|Cannot allocate memory|out of memory",
+    re.IGNORECASE,
+)
+
+
+class OutOfMemoryError(subprocess.CalledProcessError):
+    """
+    Raised by :meth:`Step.run_subprocess` if a subprocess failed because it
+    exceeded its memory limit.
+    """
+
+    pass
+
+
+def _get_own_cgroup() -> Optional[str]:
+    try:
+        with open("/proc/self/cgroup", encoding="utf8") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    cgroup = os.path.join(CGROUP_ROOT, line[3:].strip().lstrip("/"))
+                    # Otherwise, cgroup v2 is not mounted at CGROUP_ROOT
+                    if os.path.isfile(os.path.join(cgroup, "cgroup.controllers")):
+                        return cgroup
+    except OSError:
+        pass
+    return None
+
+
+class MemoryLimit(object):
+    """
+    Limits the memory usage of a subprocess (and its descendants.)
+
+    If OpenLane's cgroup allows it, a child cgroup with ``memory.max`` set to
+    the limit is created for the subprocess, and processes exceeding it are
+    killed by the kernel. Otherwise, the virtual memory of the subprocess is
+    limited using ``RLIMIT_AS``, which makes allocations beyond the limit fail.
+    As virtual memory includes reserved but unused address space, the latter
+    is considerably stricter.
+
+    :param limit: The limit in bytes
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.cgroup: Optional[str] = None
+
+    def apply(self, process: psutil.Popen):
+        """
+        Applies the limit to a newly-created process. Processes it creates
+        afterwards are subject to the same limit.
+        """
+        if own_cgroup := _get_own_cgroup():
+            cgroup = os.path.join(own_cgroup, f"openlane-{uuid.uuid4().hex[:16]}")
+            try:
+                os.mkdir(cgroup)
+                # Only present if the memory controller is delegated to us
+                memory_max = os.path.join(cgroup, "memory.max")
+                if not os.path.isfile(memory_max):
+                    raise FileNotFoundError(memory_max)
+                with open(memory_max, "w") as f:
+                    f.write(str(self.limit))
+                with open(os.path.join(cgroup, "cgroup.procs"), "w") as f:
+                    f.write(str(process.pid))
+                self.cgroup = cgroup
+                debug(f"Limited memory of process {process.pid} using '{cgroup}'.")
+                return
+            except OSError:
+                self.__remove_cgroup(cgroup)
+        try:
+            import resource
+
+            process.rlimit(resource.RLIMIT_AS, (self.limit, self.limit))
+        except (ImportError, AttributeError, psutil.Error) as e:
+            debug(f"Failed to limit memory of process {process.pid}: {e}")
+
+    def ran_out(
+        self,
+        returncode: int,
+        output: Iterable[str],
+        peak_process_memory_vms: float,
+    ) -> bool:
+        """
+        :param returncode: The exit code of the process
+        :param output: The last lines printed by the process
+        :param peak_process_memory_vms: The peak virtual memory usage of any
+            single process of the process tree
+        :returns: Whether the process failed because it exceeded the limit,
+            i.e., with a cgroup, whether the kernel killed one of its
+            processes for exceeding it, and otherwise, whether one of its
+            processes came close to the limit or an allocation failure was
+            printed.
+        """
+        if returncode == 0:
+            return False
+        if self.cgroup is not None:
+            try:
+                with open(os.path.join(self.cgroup, "memory.events")) as f:
+                    for line in f:
+                        key, value = line.split()
+                        if key == "oom_kill" and int(value) > 0:
+                            return True
+            except OSError:
+                pass
+            return False
+        # RLIMIT_AS applies to every process separately
+        if peak_process_memory_vms >= 0.9 * self.limit:
+            return True
+        return indicates_allocation_failure(output)
+
+    def release(self):
+        if self.cgroup is not None:
+            self.__remove_cgroup(self.cgroup)
+            self.cgroup = None
+
+    @staticmethod
+    def __remove_cgroup(cgroup: str):
+        try:
+            os.rmdir(cgroup)
+        except OSError:
+            pass
+
+
+def indicates_allocation_failure(output: Iterable[str]) -> bool:
+    """
+    :param output: The last lines printed by a failed process
+    :returns: Whether the process printed an allocation failure.
+    """
+    return any(OOM_PATTERN.search(line) is not None for line in output)
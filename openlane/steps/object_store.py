@@ -0,0 +1,182 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import os
+import glob
+import uuid
+from typing import Any, Optional, Set, Tuple
+
+from ..state import State, InvalidState
+from ..common import Path, mkdirp, copy_recursive, hash_file_memoized
+from ..logging import debug, warn
+
+OBJECT_STORE_ENV_VAR = "OPENLANE_OBJECT_STORE"
+OBJECT_STORE_DIRNAME = ".objects"
+
+
+def object_store_enabled() -> bool:
+    """
+    :returns: Whether new runs should deduplicate their views using an
+        :class:`ObjectStore`, which is opted into by setting the environment
+        variable ``OPENLANE_OBJECT_STORE`` to ``1``.
+    """
+    return os.getenv(OBJECT_STORE_ENV_VAR, "0").lower() in ["1", "true", "yes", "on"]
+
+
+class ObjectStore(object):
+    """
+    A content-addressed store of views inside a run directory, located at
+    ``<run_dir>/.objects``.
+
+    Views created by steps are hard-linked into the store by the hash of their
+    contents. If an identical view is already stored, the view in the step
+    directory is replaced with a hard link to the stored one, so every
+    distinct view occupies disk space only once per run.
+
+    As views in step directories remain regular (hard-linked) files, removing
+    objects from the store never removes the contents of a view still present
+    in a step directory.
+
+    :param run_dir: The run directory
+    """
+
+    def __init__(self, run_dir: str):
+        self.run_dir = os.path.abspath(run_dir)
+        self.path = os.path.join(self.run_dir, OBJECT_STORE_DIRNAME)
+
+    @classmethod
+    def create(Self, run_dir: str) -> ObjectStore:
+        """
+        Creates a store inside a run directory if it does not already exist.
+        Steps running in that run directory use it from then on.
+        """
+        store = Self(run_dir)
+        mkdirp(store.path)
+        return store
+
+    @classmethod
+    def find(Self, step_dir: str) -> Optional[ObjectStore]:
+        """
+        :param step_dir: A step directory
+        :returns: The store of the run directory containing the step
+            directory, if one was created.
+        """
+        current = os.path.abspath(step_dir)
+        while True:
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+            if os.path.isdir(os.path.join(current, OBJECT_STORE_DIRNAME)):
+                return Self(current)
+
+    def get_object_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest)
+
+    def put(self, path: str) -> str:
+        """
+        Adds a file to the store, replacing it with a hard link to an identical
+        stored file if there is one.
+
+        :param path: The file
+        :returns: The hash of the file
+        """
+        digest = hash_file_memoized(path)
+        object_path = self.get_object_path(digest)
+        mkdirp(os.path.dirname(object_path))
+        try:
+            os.link(path, object_path)
+            return digest
+        except FileExistsError:
+            pass
+        if os.path.samefile(path, object_path):
+            return digest
+        temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.link(object_path, temporary_path)
+        os.replace(temporary_path, path)
+        return digest
+
+    def put_views(self, step_dir: str, views: Any) -> int:
+        """
+        Adds every file referenced by (a nested structure of) views and
+        located inside a step directory to the store.
+
+        :param step_dir: The step directory
+        :param views: For example, the views update returned by :meth:`Step.run`
+        :returns: The number of bytes that were deduplicated
+        """
+        step_dir = os.path.abspath(step_dir)
+        saved = 0
+
+        def visitor(x: Any) -> Any:
+            nonlocal saved
+            if not isinstance(x, Path) or not os.path.isfile(x):
+                return x
+            if os.path.relpath(os.path.abspath(x), step_dir).startswith(".."):
+                return x
+            try:
+                size = os.path.getsize(x)
+                self.put(x)
+                if os.stat(x).st_nlink > 2:
+                    saved += size
+            except OSError as e:
+                warn(f"Failed to add '{x}' to the object store: {e}")
+            return x
+
+        copy_recursive(views, translator=visitor)
+        return saved
+
+    def collect_garbage(self) -> Tuple[int, int]:
+        """
+        Removes all objects that are not referenced by the ``state_out.json``
+        of any step in the run directory.
+
+        :returns: The number of objects removed and the number of bytes freed.
+        """
+        referenced: Set[Tuple[int, int]] = set()
+
+        def visitor(x: Any) -> Any:
+            if isinstance(x, Path):
+                try:
+                    stat = os.stat(x)
+                    referenced.add((stat.st_dev, stat.st_ino))
+                except OSError:
+                    pass
+            return x
+
+        for state_out_path in glob.glob(
+            os.path.join(self.run_dir, "**", "state_out.json"), recursive=True
+        ):
+            try:
+                with open(state_out_path, encoding="utf8") as f:
+                    state_out = State.loads(f.read(), validate_path=False)
+            except (OSError, InvalidState) as e:
+                warn(f"Failed to read '{state_out_path}': {e}")
+                continue
+            copy_recursive(state_out, translator=visitor)
+
+        removed = 0
+        freed = 0
+        for object_path in glob.glob(os.path.join(self.path, "*", "*")):
+            stat = os.stat(object_path)
+            if (stat.st_dev, stat.st_ino) in referenced:
+                continue
+            debug(f"Removing unreferenced object '{object_path}'…")
+            os.unlink(object_path)
+            removed += 1
+            if stat.st_nlink == 1:
+                # Otherwise, the contents are still linked from elsewhere
+                freed += stat.st_size
+        return removed, freed
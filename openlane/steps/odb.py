@@ -15,19 +15,29 @@ import os
 import re
 import json
 import shutil
+import psutil
+import subprocess
 from math import inf
 from decimal import Decimal
 from functools import reduce
 from abc import abstractmethod
-from typing import List, Literal, Optional, Tuple
+from typing import Dict, List, Literal, Optional, Tuple
 
 from .common_variables import io_layer_variables
 from .openroad import DetailedPlacement, GlobalRouting
-from .step import ViewsUpdate, MetricsUpdate, Step, StepException, CompositeStep
+from .step import (
+    ViewsUpdate,
+    MetricsUpdate,
+    Step,
+    StepException,
+    CompositeStep,
+    ProcessStatsThread,
+)
+from .odbpy_worker import odbpy_worker_enabled, get_odbpy_worker_pool
 from ..logging import warn, info
 from ..config import Variable, Macro
-from ..state import State, DesignFormat
-from ..common import Path, get_script_dir
+from ..state import State, DesignFormat, defer_view, lazy_views_enabled
+from ..common import Path, get_script_dir, get_scheduler
 
 inf_rx = re.compile(r"\b(-?)inf\b")
 
@@ -36,6 +46,8 @@ class OdbpyStep(Step):
     inputs = [DesignFormat.ODB]
     outputs = [DesignFormat.ODB, DesignFormat.DEF]
 
+    reads_metrics = False
+
     def run(self, state_in, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         kwargs, env = self.extract_env(kwargs)
 
@@ -45,9 +57,12 @@ class OdbpyStep(Step):
         for output in [DesignFormat.ODB, DesignFormat.DEF]:
             filename = f"{self.config['DESIGN_NAME']}.{output.value.extension}"
             file_path = os.path.join(self.step_dir, filename)
+            out_paths[output] = Path(file_path)
+            if output == DesignFormat.DEF and lazy_views_enabled():
+                # Recorded as a lazy view after the script runs
+                continue
             command.append(f"--output-{output.value.id}")
             command.append(file_path)
-            out_paths[output] = Path(file_path)
 
         command += [
             str(state_in[DesignFormat.ODB]),
@@ -56,11 +71,22 @@ class OdbpyStep(Step):
             "PYTHONPATH"
         ] = f"{env['PYTHONPATH']}:{os.path.join(get_script_dir(), 'odbpy')}"
 
-        generated_metrics = self.run_subprocess(
-            command,
-            env=env,
-            **kwargs,
-        )
+        # Limits cannot be applied to persistent workers, which are shared
+        # between steps
+        if odbpy_worker_enabled() and not self.config.get("STEP_MEMORY_LIMIT"):
+            generated_metrics = self.__run_in_worker(
+                command,
+                env=env,
+                input_odb=str(state_in[DesignFormat.ODB]),
+                output_odb=str(out_paths[DesignFormat.ODB]),
+                **kwargs,
+            )
+        else:
+            generated_metrics = self.run_subprocess(
+                command,
+                env=env,
+                **kwargs,
+            )
 
         metrics_path = os.path.join(self.step_dir, "or_metrics_out.json")
         metrics_updates: MetricsUpdate = generated_metrics
@@ -73,12 +99,90 @@ class OdbpyStep(Step):
                     or_metrics_out[key] = -inf
             metrics_updates.update(or_metrics_out)
 
+        if lazy_views_enabled():
+            defer_view(
+                str(out_paths[DesignFormat.DEF]),
+                DesignFormat.DEF,
+                str(out_paths[DesignFormat.ODB]),
+                DesignFormat.ODB,
+            )
+
         views_updates: ViewsUpdate = {}
         for output in [DesignFormat.ODB, DesignFormat.DEF]:
             views_updates[output] = out_paths[output]
 
         return views_updates, metrics_updates
 
+    def __run_in_worker(
+        self,
+        command: List[str],
+        env: Dict[str, str],
+        input_odb: str,
+        output_odb: str,
+        log_to: Optional[str] = None,
+        silent: bool = False,
+        **kwargs,
+    ) -> MetricsUpdate:
+        # Equivalent to run_subprocess(command), but the script is run by a
+        # persistent OpenROAD worker that may already have the input resident
+        command = [str(arg) for arg in command]
+        python_index = command.index("-python")
+        script = command[python_index + 1]
+        args = command[python_index + 2 :]
+        metrics_path = command[command.index("-metrics") + 1]
+        log_path = log_to or self.get_log_path()
+
+        with open(os.path.join(self.step_dir, "COMMANDS"), "a+") as f:
+            f.write(" ".join(command))
+            f.write("\n")
+
+        pool = get_odbpy_worker_pool()
+        scheduler = get_scheduler()
+        history_key = self.get_resource_history_key(log_path)
+        cpus, memory = scheduler.estimate(history_key)
+        with scheduler.reserve(cpus, memory):
+            returncode: Optional[int] = None
+            for fresh in [False, True]:
+                with pool.acquire(input_odb, env, fresh=fresh) as worker:
+                    # Samples the worker while it runs the script, which
+                    # includes the database already resident in it
+                    process_stats_thread = ProcessStatsThread(
+                        psutil.Process(worker.process.pid)
+                    )
+                    process_stats_thread.start()
+                    try:
+                        returncode = worker.run(
+                            script,
+                            args,
+                            env,
+                            log_path,
+                            metrics_path,
+                            output_odb,
+                        )
+                    finally:
+                        process_stats_thread.stop()
+                        process_stats_thread.join()
+                if returncode is not None:
+                    break
+
+        scheduler.history.record(
+            history_key,
+            memory_rss=process_stats_thread.peak_resources["memory_rss"],
+            cpu_percent=process_stats_thread.avg_resources["cpu_percent"],
+        )
+
+        if not os.path.exists(log_path):
+            # The worker exited before running the script
+            open(log_path, "w").close()
+        with open(log_path, encoding="utf8", errors="replace") as log:
+            generated_metrics, tail = self.process_output(log, self.step_dir, silent)
+
+        if returncode != 0:
+            self.report_subprocess_failure(returncode or 1, tail, log_path)
+            raise subprocess.CalledProcessError(returncode or 1, command)
+
+        return generated_metrics
+
     def get_command(self) -> List[str]:
         metrics_path = os.path.join(self.step_dir, "or_metrics_out.json")
 
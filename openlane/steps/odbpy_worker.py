@@ -0,0 +1,217 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import annotations
+
+import os
+import json
+import atexit
+import subprocess
+from threading import Lock
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Set
+
+from ..common import get_script_dir
+from ..logging import debug
+
+ODBPY_WORKER_ENV_VAR = "OPENLANE_ODBPY_WORKER"
+
+
+def odbpy_worker_enabled() -> bool:
+    """
+    :returns: Whether :class:`OdbpyStep`\\s should run their scripts in
+        persistent OpenROAD workers, which is opted into by setting the
+        environment variable ``OPENLANE_ODBPY_WORKER`` to ``1``.
+    """
+    return os.getenv(ODBPY_WORKER_ENV_VAR, "0").lower() in ["1", "true", "yes", "on"]
+
+
+class OdbpyWorker(object):
+    """
+    A long-lived OpenROAD process running odbpy scripts, which keeps the last
+    database it has written resident in memory so that a following script
+    reading the same ODB file does not have to load it again.
+
+    See ``scripts/odbpy/worker.py`` for the protocol.
+
+    :param env: The environment of the OpenROAD process
+    """
+
+    def __init__(self, env: Dict[str, str]):
+        read_fd, write_fd = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                [
+                    "openroad",
+                    "-exit",
+                    "-no_splash",
+                    "-python",
+                    os.path.join(get_script_dir(), "odbpy", "worker.py"),
+                    "--response-fd",
+                    str(write_fd),
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=[write_fd],
+                env=env,
+                encoding="utf8",
+            )
+        finally:
+            os.close(write_fd)
+        self.responses = os.fdopen(read_fd, "r", encoding="utf8")
+        self.resident: Set[str] = set()
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(
+        self,
+        script: str,
+        args: List[str],
+        env: Dict[str, str],
+        log_path: str,
+        metrics_path: str,
+        output_odb: Optional[str],
+    ) -> Optional[int]:
+        """
+        Runs an odbpy script inside the worker.
+
+        :param script: The path to the script
+        :param args: The arguments of the script
+        :param env: The environment of the script
+        :param log_path: The file to which the script's output is written
+        :param metrics_path: The file to which metrics reported by the script
+            using ``utl.metric*`` are written as a JSON object
+        :param output_odb: The ODB file written by the script, if any
+        :returns: The script's exit code, or ``None`` if the worker could not
+            load the script's input because another design is resident, in
+            which case the worker exits and the script must be run elsewhere.
+        """
+        request = {
+            "script": script,
+            "args": args,
+            "env": env,
+            "cwd": os.getcwd(),
+            "log": log_path,
+            "metrics": metrics_path,
+        }
+        self.resident = set()
+        try:
+            assert self.process.stdin is not None
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+            line = self.responses.readline()
+        except BrokenPipeError:
+            line = ""
+        if line == "":
+            returncode = self.process.wait()
+            return returncode if returncode != 0 else 1
+
+        response = json.loads(line)
+        if response["status"] != "ok" or response["returncode"] != 0:
+            # The worker exits on its own
+            self.process.wait()
+        if response["status"] == "restart":
+            return None
+        if response["returncode"] == 0 and output_odb is not None:
+            self.resident = {os.path.realpath(output_odb)}
+        return response["returncode"]
+
+    def close(self, timeout: float = 10):
+        try:
+            if stdin := self.process.stdin:
+                stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.responses.close()
+
+
+class OdbpyWorkerPool(object):
+    """
+    A pool of :class:`OdbpyWorker`\\s. When a worker is requested for a script,
+    idle workers in which the script's input database is already resident
+    are preferred.
+
+    :param max_idle: The maximum number of idle workers to keep alive. As
+        idle workers hold entire designs in memory, this should be kept low.
+    """
+
+    def __init__(self, max_idle: int = 2):
+        self.max_idle = max_idle
+        self.__idle: List[OdbpyWorker] = []
+        self.__lock = Lock()
+
+    @contextmanager
+    def acquire(
+        self,
+        input_odb: str,
+        env: Dict[str, str],
+        fresh: bool = False,
+    ) -> Iterator[OdbpyWorker]:
+        """
+        :param input_odb: The ODB file the script is going to read
+        :param env: The environment used if a new worker has to be started
+        :param fresh: If set, a new worker is always started
+        :returns: A worker, which is returned to the pool once the ``with``
+            block is exited, unless it has exited in the meantime.
+        """
+        input_odb = os.path.realpath(input_odb)
+        worker: Optional[OdbpyWorker] = None
+        with self.__lock:
+            if not fresh:
+                for candidate in self.__idle:
+                    if input_odb in candidate.resident:
+                        worker = candidate
+                        self.__idle.remove(candidate)
+                        break
+        if worker is None:
+            debug(f"Starting OpenROAD worker for '{input_odb}'…")
+            worker = OdbpyWorker(env)
+        try:
+            yield worker
+        finally:
+            to_close = []
+            with self.__lock:
+                if worker.alive:
+                    self.__idle.insert(0, worker)
+                else:
+                    to_close.append(worker)
+                to_close += self.__idle[self.max_idle :]
+                self.__idle = self.__idle[: self.max_idle]
+            for closed in to_close:
+                closed.close()
+
+    def close(self):
+        """
+        Stops all idle workers.
+        """
+        with self.__lock:
+            idle = self.__idle
+            self.__idle = []
+        for worker in idle:
+            worker.close()
+
+
+ODBPY_WORKER_POOL = OdbpyWorkerPool()
+atexit.register(ODBPY_WORKER_POOL.close)
+
+
+def get_odbpy_worker_pool() -> OdbpyWorkerPool:
+    """
+    :returns: The global pool of persistent OpenROAD workers
+    """
+    return ODBPY_WORKER_POOL
@@ -19,13 +19,13 @@ import shlex
 import tempfile
 import subprocess
 from math import inf
-from glob import glob
 from decimal import Decimal
 from base64 import b64encode
 from abc import abstractmethod
 from concurrent.futures import Future
 from typing import (
     Any,
+    ClassVar,
     Callable,
     Iterable,
     List,
@@ -52,16 +52,69 @@ from .common_variables import (
 
 from ..config import Variable
 from ..config.flow import option_variables
-from ..state import State, DesignFormat
+from ..state import (
+    State,
+    DesignFormat,
+    defer_view,
+    lazy_views_enabled,
+    register_materializer,
+)
 from ..logging import debug, err, info, warn, verbose
 from ..common import (
     Path,
     TclUtils,
     get_script_dir,
-    get_tpe,
+    get_scheduler,
     mkdirp,
     aggregate_metrics,
 )
+from ..common.timing_paths import write_path_database
+
+
+@register_materializer(DesignFormat.ODB, DesignFormat.DEF)
+def write_def_from_odb(odb: str, def_out: str):
+    """
+    Writes a DEF view of an OpenROAD database, materializing lazy DEF views
+    recorded by :class:`OpenROADStep`\\s and ``OdbpyStep``\\s.
+
+    :param odb: The OpenROAD database
+    :param def_out: The DEF file to write
+    """
+    env = os.environ.copy()
+    env["PYTHONPATH"] = ":".join(
+        [
+            element
+            for element in [
+                env.get("PYTHONPATH"),
+                os.path.join(get_script_dir(), "odbpy"),
+            ]
+            if element
+        ]
+    )
+    command = [
+        "openroad",
+        "-exit",
+        "-no_splash",
+        "-python",
+        os.path.join(get_script_dir(), "odbpy", "write_views.py"),
+        "--output-def",
+        def_out,
+        odb,
+    ]
+    debug(f"Materializing '{def_out}' from '{odb}'…")
+    with get_scheduler().reserve():
+        process = subprocess.run(
+            command,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding="utf8",
+        )
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, command, output=process.stdout
+        )
+
 
 EXAMPLE_INPUT = """
 li1 X 0.23 0.46
@@ -99,6 +152,23 @@ timing_metric_aggregation: Dict[str, Tuple[Any, Callable[[Iterable], Any]]] = {
 }
 
 
+def load_or_metrics(metrics_path: str) -> MetricsUpdate:
+    """
+    :param metrics_path: The path to a metrics file written by OpenROAD
+    :returns: The metrics in the file, or an empty dictionary if it does not
+        exist.
+    """
+    if not os.path.exists(metrics_path):
+        return {}
+    or_metrics_out = json.loads(open(metrics_path).read(), parse_float=Decimal)
+    for key, value in or_metrics_out.items():
+        if value == "Infinity":
+            or_metrics_out[key] = inf
+        elif value == "-Infinity":
+            or_metrics_out[key] = -inf
+    return or_metrics_out
+
+
 def old_to_new_tracks(old_tracks: str) -> str:
     """
     >>> old_to_new_tracks(EXAMPLE_INPUT)
@@ -178,6 +248,8 @@ class CheckSDCFiles(Step):
 
 
 class OpenROADStep(TclStep):
+    reads_config_file = True
+
     inputs = [DesignFormat.ODB]
     outputs = [
         DesignFormat.ODB,
@@ -247,8 +319,18 @@ class OpenROADStep(TclStep):
             ]
         )
 
+        if self.__defers_def():
+            env.pop("SAVE_DEF", None)
+
         return env
 
+    def __defers_def(self) -> bool:
+        return (
+            lazy_views_enabled()
+            and DesignFormat.ODB in self.outputs
+            and DesignFormat.DEF in self.outputs
+        )
+
     def run(self, state_in, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         """
         The `run()` override for the OpenROADStep class handles two things:
@@ -259,20 +341,25 @@ class OpenROADStep(TclStep):
 
         2. After the `super()` call: Processes the `or_metrics_out.json` file and
         updates the State's `metrics` property with any new metrics in that object.
+
+        Unless lazy views are disabled, the DEF view is not written by OpenROAD
+        but recorded as a lazy view derived from the ODB view, which is only
+        materialized once it is needed.
         """
         kwargs, env = self.extract_env(kwargs)
 
         views_updates, metrics_updates = super().run(state_in, env=env, **kwargs)
 
+        if self.__defers_def() and (odb := views_updates.get(DesignFormat.ODB)):
+            def_path = os.path.join(
+                self.step_dir,
+                f"{self.config['DESIGN_NAME']}.{DesignFormat.DEF.value.extension}",
+            )
+            defer_view(def_path, DesignFormat.DEF, str(odb), DesignFormat.ODB)
+            views_updates[DesignFormat.DEF] = Path(def_path)
+
         metrics_path = os.path.join(self.step_dir, "or_metrics_out.json")
-        if os.path.exists(metrics_path):
-            or_metrics_out = json.loads(open(metrics_path).read(), parse_float=Decimal)
-            for key, value in or_metrics_out.items():
-                if value == "Infinity":
-                    or_metrics_out[key] = inf
-                elif value == "-Infinity":
-                    or_metrics_out[key] = -inf
-            metrics_updates.update(or_metrics_out)
+        metrics_updates.update(load_or_metrics(metrics_path))
 
         metric_updates_with_aggregates = aggregate_metrics(
             metrics_updates,
@@ -307,23 +394,377 @@ class OpenROADStep(TclStep):
         return None
 
 
+def choose_sta_corner_mode(
+    corner_count: int,
+    cpus_available: int,
+    memory_available: int,
+    memory_per_process: int,
+) -> Literal["parallel", "sequential"]:
+    """
+    Chooses how the timing corners of an STA step are analyzed if
+    ``STA_CORNER_MODE`` is unset.
+
+    Analyzing each corner in its own process is the fastest, but every process
+    reads the whole design. If there are not enough idle CPUs for the processes
+    to actually run concurrently, or not enough memory for all of them, the
+    design is instead read once and the corners are analyzed sequentially.
+
+    :param corner_count: The number of timing corners
+    :param cpus_available: The number of idle CPU slots
+    :param memory_available: The number of bytes of memory not yet reserved
+    :param memory_per_process: The estimated memory usage of one STA process
+    :returns: ``parallel`` or ``sequential``
+    """
+    if corner_count <= 1:
+        return "parallel"
+    if cpus_available < 2:
+        return "sequential"
+    if memory_per_process * min(corner_count, cpus_available) > memory_available:
+        return "sequential"
+    return "parallel"
+
+
+# Rough peak memory usage of an STA process per byte of its design inputs
+STA_MEMORY_PER_INPUT_BYTE = 10
+
+
 class STAStep(OpenROADStep):
     """
     Abstract class for an STA step
+
+    The timing corners returned by :meth:`get_corners` are analyzed either by
+    one process per corner or by a single process analyzing the corners in
+    turn, as chosen by ``STA_CORNER_MODE``. Either way, the reports of every
+    corner are written to a subdirectory of the step directory named after it,
+    and the per-corner metrics are aggregated.
+
+    Unless :attr:`sequential_corners_equivalent` is ``False``, both modes
+    perform the same analysis, and the mode may be chosen automatically
+    according to the available resources.
+
+    The chosen mode is available to the hooks below as :attr:`corner_mode`,
+    and is part of the step's metrics and its key in the step cache.
     """
 
+    #: Whether analyzing the corners sequentially gives the same results as
+    #: analyzing them in parallel. If not, sequential mode is only used if
+    #: ``STA_CORNER_MODE`` explicitly requests it.
+    sequential_corners_equivalent: ClassVar[bool] = True
+
+    config_vars = OpenROADStep.config_vars + [
+        Variable(
+            "STA_CORNER_MODE",
+            Optional[Literal["parallel", "sequential"]],
+            "How the timing corners are analyzed: `parallel` analyzes each corner in its own process, while `sequential` reads the design once and analyzes the corners in turn, which is slower but uses considerably less memory. If unset, `parallel` is used unless there are not enough idle CPUs or memory for it, and a step that runs out of memory is retried in `sequential` mode. Steps for which `sequential` mode performs a different analysis, such as post-PnR STA, only use it if it is explicitly set.",
+        ),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.corner_mode: Optional[Literal["parallel", "sequential"]] = None
+
     def layout_preview(self) -> Optional[str]:
         return None
 
     def get_script_path(self):
         return os.path.join(get_script_dir(), "openroad", "sta", "corner.tcl")
 
+    def get_corner_command(self, metrics_path: str) -> List[str]:
+        """
+        :param metrics_path: The path to which OpenROAD writes metrics
+        :returns: The command of an STA process
+        """
+        return [
+            "openroad",
+            "-exit",
+            "-no_splash",
+            "-metrics",
+            metrics_path,
+            self.get_script_path(),
+        ]
+
+    def get_corners(self) -> List[str]:
+        """
+        :returns: The timing corners to analyze
+        """
+        return self.config["STA_CORNERS"]
+
+    def get_corner_timing_views(self, corner: str) -> List[str]:
+        """
+        :param corner: A timing corner
+        :returns: The timing views for the corner, in the format returned by
+            :meth:`Toolbox.get_timing_files`
+        """
+        _, timing_file_list = self.toolbox.get_timing_files(self.config, corner)
+        return [str(file) for file in timing_file_list]
+
+    def get_corner_env(self, corner: str, state_in: State) -> Dict[str, str]:
+        """
+        :param corner: A timing corner
+        :param state_in: The input state
+        :returns: Additional environment variables for the corner, each a Tcl
+            list. When the corners are analyzed sequentially, the lists of all
+            corners are concatenated.
+        """
+        return {}
+
+    def process_corner(
+        self,
+        corner: str,
+        corner_dir: str,
+        env: Dict[str, Any],
+        state_in: State,
+    ) -> MetricsUpdate:
+        """
+        Called once a corner has been analyzed, e.g. to post-process its
+        reports.
+
+        :param corner: The timing corner
+        :param corner_dir: The directory containing the reports of the corner
+        :param env: The environment of the step
+        :param state_in: The input state
+        :returns: Additional metrics
+        """
+        return {}
+
+    def reduce_memory_usage(self) -> Optional[Dict[str, Any]]:
+        if not self.sequential_corners_equivalent:
+            return None
+        if self.corner_mode == "sequential" or len(self.get_corners()) <= 1:
+            return None
+        info("Analyzing all timing corners in a single process…")
+        return {"STA_CORNER_MODE": "sequential"}
+
+    def __estimate_memory_usage(self, state_in: State) -> int:
+        input_size = 0
+        for input in self.inputs:
+            value = state_in[input]
+            if isinstance(value, dict):
+                # Only one view per corner is read by each process
+                sizes = [
+                    os.path.getsize(path)
+                    for path in value.values()
+                    if isinstance(path, str) and os.path.isfile(path)
+                ]
+                input_size += max(sizes, default=0)
+            elif value is not None and os.path.isfile(value):
+                input_size += os.path.getsize(value)
+        return input_size * STA_MEMORY_PER_INPUT_BYTE
+
+    def __get_corner_mode(
+        self,
+        corners: List[str],
+        state_in: State,
+    ) -> Literal["parallel", "sequential"]:
+        if len(corners) <= 1:
+            # Identical, save for the location of the reports
+            return "parallel"
+        if mode := self.config["STA_CORNER_MODE"]:
+            return mode
+        if not self.sequential_corners_equivalent:
+            return "parallel"
+        if self.corner_mode is not None:
+            # Already chosen for the cache key
+            return self.corner_mode
+        scheduler = get_scheduler()
+        mode = choose_sta_corner_mode(
+            len(corners),
+            cpus_available=scheduler.max_cpus - scheduler.cpus_used,
+            memory_available=scheduler.max_memory - scheduler.memory_used,
+            memory_per_process=self.__estimate_memory_usage(state_in),
+        )
+        return mode
+
+    def get_cache_key_extras(self, state_in: State) -> Dict[str, Any]:
+        self.corner_mode = self.__get_corner_mode(self.get_corners(), state_in)
+        return {"sta_corner_mode": self.corner_mode}
+
+    def __run_parallel(
+        self,
+        corners: List[str],
+        env: Dict[str, Any],
+        state_in: State,
+    ) -> MetricsUpdate:
+        def run_corner(corner: str) -> MetricsUpdate:
+            corner_dir = os.path.join(self.step_dir, corner)
+            mkdirp(corner_dir)
+
+            current_env = env.copy()
+            current_env.update(self.get_corner_env(corner, state_in))
+            current_env["CURRENT_CORNER_NAME"] = corner
+            current_env["CURRENT_CORNER_TIMING_VIEWS"] = TclUtils.join(
+                self.get_corner_timing_views(corner)
+            )
+            if DesignFormat.LIB in self.outputs:
+                current_env["LIB_SAVE_DIR"] = corner_dir
+            if DesignFormat.SDF in self.outputs:
+                current_env["SDF_SAVE_DIR"] = corner_dir
+
+            metrics_path = os.path.join(corner_dir, "or_metrics_out.json")
+            try:
+                generated_metrics = self.run_subprocess(
+                    self.get_corner_command(metrics_path),
+                    log_to=os.path.join(corner_dir, "sta.log"),
+                    env=current_env,
+                    silent=True,
+                    report_dir=corner_dir,
+                )
+                generated_metrics.update(load_or_metrics(metrics_path))
+                generated_metrics.update(
+                    self.process_corner(corner, corner_dir, env, state_in)
+                )
+                info(f"Finished STA for the {corner} timing corner.")
+            except subprocess.CalledProcessError as e:
+                err(f"Failed STA for the {corner} timing corner:")
+                raise e
+
+            return generated_metrics
+
+        futures: Dict[str, Future[MetricsUpdate]] = {}
+        for corner in corners:
+            futures[corner] = get_scheduler().submit(run_corner, corner)
+
+        metrics_updates: MetricsUpdate = {}
+        for corner, updates_future in futures.items():
+            metrics_updates.update(updates_future.result())
+        return metrics_updates
+
+    def __run_sequential(
+        self,
+        corners: List[str],
+        env: Dict[str, Any],
+        state_in: State,
+    ) -> MetricsUpdate:
+        current_env = env.copy()
+
+        timing_views: List[str] = []
+        corner_envs: Dict[str, List[str]] = {}
+        for corner in corners:
+            mkdirp(os.path.join(self.step_dir, corner))
+            timing_views.append(corner)
+            timing_views.append(TclUtils.join(self.get_corner_timing_views(corner)))
+            for key, value in self.get_corner_env(corner, state_in).items():
+                corner_envs.setdefault(key, []).append(value)
+        for key, values in corner_envs.items():
+            current_env[key] = " ".join(values)
+        current_env["CURRENT_CORNERS_TIMING_VIEWS"] = TclUtils.join(timing_views)
+        if DesignFormat.LIB in self.outputs:
+            current_env["LIB_SAVE_DIR"] = self.step_dir
+        if DesignFormat.SDF in self.outputs:
+            current_env["SDF_SAVE_DIR"] = self.step_dir
+
+        metrics_path = os.path.join(self.step_dir, "or_metrics_out.json")
+        try:
+            metrics_updates = self.run_subprocess(
+                self.get_corner_command(metrics_path),
+                log_to=os.path.join(self.step_dir, "sta.log"),
+                env=current_env,
+                silent=True,
+            )
+        except subprocess.CalledProcessError as e:
+            err("Failed STA for the timing corners:")
+            raise e
+        metrics_updates.update(load_or_metrics(metrics_path))
+        info(f"Finished STA for {len(corners)} timing corners.")
+
+        # Moved to the same location as in parallel mode
+        for corner in corners:
+            for format in [DesignFormat.LIB, DesignFormat.SDF]:
+                filename = (
+                    f"{self.config['DESIGN_NAME']}__{corner}.{format.value.extension}"
+                )
+                view = os.path.join(self.step_dir, filename)
+                if os.path.exists(view):
+                    os.replace(view, os.path.join(self.step_dir, corner, filename))
+
+        futures: List[Future[MetricsUpdate]] = []
+        for corner in corners:
+            futures.append(
+                get_scheduler().submit(
+                    self.process_corner,
+                    corner,
+                    os.path.join(self.step_dir, corner),
+                    env,
+                    state_in,
+                )
+            )
+        for future in futures:
+            metrics_updates.update(future.result())
+        return metrics_updates
+
+    def __write_path_database(self, report_path: str, corner: str):
+        if not os.path.isfile(report_path):
+            return
+        try:
+            write_path_database(report_path, corner)
+        except (OSError, ValueError) as e:
+            warn(f"Failed to create a timing path database from '{report_path}': {e}")
+
+    def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
+        kwargs, env = self.extract_env(kwargs)
+
+        corners = self.get_corners()
+        self.corner_mode = self.__get_corner_mode(corners, state_in)
+        if len(corners) > 1:
+            verbose(
+                f"Analyzing {len(corners)} timing corners in {self.corner_mode} mode."
+            )
+
+        env = self.prepare_env(env, state_in)
+        if self.corner_mode == "sequential":
+            metrics_updates = self.__run_sequential(corners, env, state_in)
+        else:
+            metrics_updates = self.__run_parallel(corners, env, state_in)
+
+        # Structured versions of the min.rpt and max.rpt reports, see
+        # openlane.common.timing_paths
+        database_futures: List[Future[None]] = []
+        for corner in corners:
+            for report in ["min.rpt", "max.rpt"]:
+                database_futures.append(
+                    get_scheduler().submit(
+                        self.__write_path_database,
+                        os.path.join(self.step_dir, corner, report),
+                        corner,
+                    )
+                )
+        for future in database_futures:
+            future.result()
+
+        views_updates: ViewsUpdate = {}
+        for format in [DesignFormat.LIB, DesignFormat.SDF]:
+            if format not in self.outputs:
+                continue
+            view_dict = state_in[format] or {}
+            if not isinstance(view_dict, dict):
+                raise StepException(
+                    f"Malformed input state: value for {format.name} is not a dictionary."
+                )
+            view_dict = view_dict.copy()
+            for corner in corners:
+                view = os.path.join(
+                    self.step_dir,
+                    corner,
+                    f"{self.config['DESIGN_NAME']}__{corner}.{format.value.extension}",
+                )
+                if os.path.exists(view):
+                    view_dict[corner] = Path(view)
+            views_updates[format] = view_dict
+
+        metric_updates_with_aggregates = aggregate_metrics(
+            metrics_updates,
+            timing_metric_aggregation,
+        )
+
+        return views_updates, metric_updates_with_aggregates
+
 
 @Step.factory.register()
 class STAMidPNR(STAStep):
     """
     Performs `Static Timing Analysis <https://en.wikipedia.org/wiki/Static_timing_analysis>`_
-    using OpenROAD on an OpenROAD database, mid-PnR.
+    using OpenROAD on an OpenROAD database, mid-PnR, for the default timing
+    corner as specified in the ``DEFAULT_CORNER`` variable.
     """
 
     id = "OpenROAD.STAMidPNR"
@@ -333,6 +774,15 @@ class STAMidPNR(STAStep):
     inputs = [DesignFormat.ODB]
     outputs = []
 
+    def get_corners(self) -> List[str]:
+        return [self.config["DEFAULT_CORNER"]]
+
+    def prepare_env(self, env: dict, state: State) -> dict:
+        env = super().prepare_env(env, state)
+        # The design is analyzed as seen by PnR
+        env["STA_PNR_LIBS"] = "1"
+        return env
+
 
 @Step.factory.register()
 class STAPrePNR(STAStep):
@@ -365,35 +815,25 @@ class STAPrePNR(STAStep):
     def get_command(self) -> List[str]:
         return ["sta", "-no_splash", "-exit", self.get_script_path()]
 
-    def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
-        kwargs, env = self.extract_env(kwargs)
+    def get_corners(self) -> List[str]:
+        return [self.config["DEFAULT_CORNER"]]
 
-        timing_corner, timing_file_list = self.toolbox.get_timing_files(
+    def get_corner_command(self, metrics_path: str) -> List[str]:
+        # OpenSTA metrics are printed to the log
+        return self.get_command()
+
+    def get_corner_timing_views(self, corner: str) -> List[str]:
+        _, timing_file_list = self.toolbox.get_timing_files(
             self.config,
+            corner,
             prioritize_nl=self.config["STA_MACRO_PRIORITIZE_NL"],
         )
+        return [str(file) for file in timing_file_list]
 
+    def prepare_env(self, env: dict, state: State) -> dict:
+        env = super().prepare_env(env, state)
         env["OPENSTA"] = "1"
-        env["CURRENT_CORNER_NAME"] = timing_corner
-        env["CURRENT_CORNER_TIMING_VIEWS"] = " ".join(timing_file_list)
-        env["SDF_SAVE_DIR"] = self.step_dir
-
-        views_updates, metrics_updates = super().run(state_in, env=env, **kwargs)
-
-        sdf_dict = state_in[DesignFormat.SDF] or {}
-        if not isinstance(sdf_dict, dict):
-            raise StepException(
-                "Malformed input state: value for LIB is not a dictionary."
-            )
-
-        sdfs = sorted(glob(os.path.join(self.step_dir, "*.sdf")))
-        for sdf in sdfs:
-            _, corner = os.path.basename(sdf)[:-4].split("__")
-            sdf_dict[corner] = Path(sdf)
-
-        views_updates[DesignFormat.SDF] = sdf_dict
-
-        return views_updates, metrics_updates
+        return env
 
 
 @Step.factory.register()
@@ -402,6 +842,13 @@ class STAPostPNR(STAPrePNR):
     Performs multi-corner `Static Timing Analysis <https://en.wikipedia.org/wiki/Static_timing_analysis>`_
     using OpenSTA on the post-PnR Verilog netlist, with extracted parasitics for
     both the top-level module and any associated macros.
+
+    In ``sequential`` mode, a single OpenROAD process instead reads the
+    OpenROAD database once, along with the timing libraries and parasitics of
+    every corner, and also filters the unannotated nets of each corner, which
+    otherwise takes another OpenROAD process per corner. As the design is not
+    read from a netlist, macros are analyzed using their timing libraries, so
+    this mode is only used if ``STA_CORNER_MODE`` is explicitly set to it.
     """
 
     id = "OpenROAD.STAPostPNR"
@@ -419,6 +866,73 @@ class STAPostPNR(STAPrePNR):
     inputs = STAPrePNR.inputs + [DesignFormat.SPEF, DesignFormat.ODB]
     outputs = STAPrePNR.outputs + [DesignFormat.LIB]
 
+    sequential_corners_equivalent = False
+
+    def get_corners(self) -> List[str]:
+        return STAStep.get_corners(self)
+
+    def get_corner_command(self, metrics_path: str) -> List[str]:
+        if self.corner_mode == "sequential":
+            return STAStep.get_corner_command(self, metrics_path)
+        return super().get_corner_command(metrics_path)
+
+    def get_corner_timing_views(self, corner: str) -> List[str]:
+        if self.corner_mode == "sequential":
+            return STAStep.get_corner_timing_views(self, corner)
+        return super().get_corner_timing_views(corner)
+
+    def prepare_env(self, env: dict, state: State) -> dict:
+        env = super().prepare_env(env, state)
+        env["SDC_IN"] = (
+            self.config["SIGNOFF_SDC_FILE"] or self.config["FALLBACK_SDC_FILE"]
+        )
+        if self.corner_mode == "sequential":
+            del env["OPENSTA"]
+            env["STA_FILTER_UNANNOTATED"] = "1"
+            if self.config["MACROS"] and self.config["STA_MACRO_PRIORITIZE_NL"]:
+                warn(
+                    "Macro netlists cannot be used when analyzing all timing corners in a single process: their timing libraries will be used instead."
+                )
+        return env
+
+    def get_corner_env(self, corner: str, state_in: State) -> Dict[str, str]:
+        input_spef_dict = state_in[DesignFormat.SPEF]
+        assert input_spef_dict is not None  # Checked by start
+        if not isinstance(input_spef_dict, dict):
+            raise StepException(
+                "Malformed input state: value for 'spef' is not a dictionary"
+            )
+
+        spefs = self.toolbox.filter_views(self.config, input_spef_dict, corner)
+        if len(spefs) < 1:
+            raise StepException(
+                f"No SPEF file compatible with corner '{corner}' found."
+            )
+        elif len(spefs) > 1:
+            warn(
+                f"Multiple SPEF files compatible with corner '{corner}' found. The first one encountered will be used."
+            )
+        spef = spefs[0]
+        return {"CURRENT_SPEF_BY_CORNER": TclUtils.join([corner, str(spef)])}
+
+    def process_corner(
+        self,
+        corner: str,
+        corner_dir: str,
+        env: Dict[str, Any],
+        state_in: State,
+    ) -> MetricsUpdate:
+        if self.corner_mode == "sequential":
+            # Already filtered by the STA process
+            return {}
+        return self.filter_unannotated_report(
+            corner=corner,
+            checks_report=os.path.join(corner_dir, "checks.rpt"),
+            corner_dir=corner_dir,
+            env=env,
+            odb_design=str(state_in[DesignFormat.ODB]),
+        )
+
     def filter_unannotated_report(
         self,
         corner: str,
@@ -472,97 +986,7 @@ class STAPostPNR(STAPrePNR):
         return filter_unannotated_metrics
 
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
-        kwargs, env = self.extract_env(kwargs)
-
-        env = self.prepare_env(env, state_in)
-
-        env["OPENSTA"] = "1"
-        env["SDC_IN"] = (
-            self.config["SIGNOFF_SDC_FILE"] or self.config["FALLBACK_SDC_FILE"]
-        )
-
-        def run_corner(corner: str):
-            nonlocal env
-
-            current_env = env.copy()
-
-            corner_dir = os.path.join(self.step_dir, corner)
-            mkdirp(corner_dir)
-
-            current_env["CURRENT_CORNER_NAME"] = corner
-            current_env["LIB_SAVE_DIR"] = corner_dir
-            current_env["SDF_SAVE_DIR"] = corner_dir
-
-            if not isinstance(state_in[DesignFormat.SPEF], dict):
-                raise StepException(
-                    "Malformed input state: value for SPEF is not a dictionary."
-                )
-
-            input_spef_dict = state_in[DesignFormat.SPEF]
-            assert input_spef_dict is not None  # Checked by start
-            if not isinstance(input_spef_dict, dict):
-                raise StepException(
-                    "Malformed input state: value for 'spef' is not a dictionary"
-                )
-
-            spefs = self.toolbox.filter_views(self.config, input_spef_dict, corner)
-            if len(spefs) < 1:
-                raise StepException(
-                    f"No SPEF file compatible with corner '{corner}' found."
-                )
-            elif len(spefs) > 1:
-                warn(
-                    f"Multiple SPEF files compatible with corner '{corner}' found. The first one encountered will be used."
-                )
-            spef = spefs[0]
-            current_env["CURRENT_SPEF_BY_CORNER"] = f"{corner} {spef}"
-
-            _, timing_file_list = self.toolbox.get_timing_files(
-                self.config,
-                corner,
-                prioritize_nl=self.config["STA_MACRO_PRIORITIZE_NL"],
-            )
-            current_env["CURRENT_CORNER_TIMING_VIEWS"] = " ".join(timing_file_list)
-
-            log_path = os.path.join(corner_dir, "sta.log")
-
-            try:
-                generated_metrics = self.run_subprocess(
-                    self.get_command(),
-                    log_to=log_path,
-                    env=current_env,
-                    silent=True,
-                    report_dir=corner_dir,
-                )
-
-                filter_unannotated_metrics = self.filter_unannotated_report(
-                    corner=corner,
-                    checks_report=os.path.join(corner_dir, "checks.rpt"),
-                    corner_dir=corner_dir,
-                    env=env,
-                    odb_design=str(state_in[DesignFormat.ODB]),
-                )
-                info(f"Finished STA for the {corner} timing corner.")
-            except subprocess.CalledProcessError as e:
-                err(f"Failed STA for the {corner} timing corner:")
-                raise e
-
-            return {**generated_metrics, **filter_unannotated_metrics}
-
-        futures: Dict[str, Future[MetricsUpdate]] = {}
-        for corner in self.config["STA_CORNERS"]:
-            futures[corner] = get_tpe().submit(
-                run_corner,
-                corner,
-            )
-
-        metrics_updates: MetricsUpdate = {}
-        for corner, updates_future in futures.items():
-            metrics_updates.update(updates_future.result())
-
-        metric_updates_with_aggregates = aggregate_metrics(
-            metrics_updates, timing_metric_aggregation
-        )
+        views_updates, metric_updates_with_aggregates = super().run(state_in, **kwargs)
 
         def format_count(count: Optional[Union[int, float, Decimal]]) -> str:
             if count is None:
@@ -617,37 +1041,6 @@ class STAPostPNR(STAPrePNR):
         with open(os.path.join(self.step_dir, "summary.rpt"), "w") as f:
             rich.print(table, file=f)
 
-        views_updates: ViewsUpdate = {}
-        lib_dict = state_in[DesignFormat.LIB] or {}
-        if not isinstance(lib_dict, dict):
-            raise StepException(
-                "Malformed input state: value for LIB is not a dictionary."
-            )
-
-        for corner in self.config["STA_CORNERS"]:
-            lib_dict[corner] = Path(
-                os.path.join(
-                    self.step_dir, corner, f"{self.config['DESIGN_NAME']}__{corner}.lib"
-                )
-            )
-
-        views_updates[DesignFormat.LIB] = lib_dict
-
-        sdf_dict = state_in[DesignFormat.SDF] or {}
-        if not isinstance(sdf_dict, dict):
-            raise StepException(
-                "Malformed input state: value for LIB is not a dictionary."
-            )
-
-        for corner in self.config["STA_CORNERS"]:
-            sdf_dict[corner] = Path(
-                os.path.join(
-                    self.step_dir, corner, f"{self.config['DESIGN_NAME']}__{corner}.sdf"
-                )
-            )
-
-        views_updates[DesignFormat.SDF] = sdf_dict
-
         return views_updates, metric_updates_with_aggregates
 
 
@@ -1128,6 +1521,12 @@ class DetailedRouting(OpenROADStep):
         info(f"Running TritonRoute with {env['DRT_THREADS']} threads…")
         return super().run(state_in, env=env, **kwargs)
 
+    def reduce_memory_usage(self) -> Optional[Dict[str, Any]]:
+        threads = self.config["DRT_THREADS"] or os.cpu_count() or 1
+        if threads <= 1:
+            return None
+        return {"DRT_THREADS": threads // 2}
+
 
 @Step.factory.register()
 class LayoutSTA(OpenROADStep):
@@ -1267,7 +1666,7 @@ class RCX(OpenROADStep):
 
         futures: Dict[str, Future[str]] = {}
         for corner in self.config["RCX_RULESETS"]:
-            futures[corner] = get_tpe().submit(
+            futures[corner] = get_scheduler().submit(
                 run_corner,
                 corner,
             )
@@ -1778,6 +2177,8 @@ class OpenGUI(Step):
     inputs = [DesignFormat.ODB]
     outputs = []
 
+    cacheable = False
+
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         with tempfile.NamedTemporaryFile("a+", suffix=".tcl") as f:
             f.write(f"read_db \"{state_in['odb']}\"")
@@ -22,13 +22,15 @@ import subprocess
 import textwrap
 import time
 import sys
+import importlib
 
 from signal import Signals
 from inspect import isabstract
 from itertools import zip_longest
+from collections import deque
 from abc import abstractmethod, ABC
 from concurrent.futures import Future
-from threading import Thread
+from threading import Event, Thread
 from typing import (
     Any,
     List,
@@ -41,6 +43,9 @@ from typing import (
     Dict,
     ClassVar,
     Type,
+    Deque,
+    Iterable,
+    TextIO,
 )
 from rich.markup import escape
 
@@ -49,7 +54,13 @@ from ..config import (
     Variable,
     universal_flow_config_variables,
 )
-from ..state import State, InvalidState, StateElement
+from ..state import (
+    State,
+    InvalidState,
+    StateElement,
+    compress_views,
+    decompress_views,
+)
 from ..common import (
     GenericDict,
     GenericImmutableDict,
@@ -65,6 +76,7 @@ from ..common import (
     copy_recursive,
     format_size,
     format_elapsed_time,
+    get_scheduler,
 )
 from ..logging import (
     rule,
@@ -74,7 +86,11 @@ from ..logging import (
     err,
     debug,
 )
+from ..plugins import load_plugins
 from ..__version__ import __version__
+from .cache import get_input_hashes, get_step_cache
+from .object_store import ObjectStore
+from .memory_limit import MemoryLimit, OutOfMemoryError
 
 
 class StepError(RuntimeError):
@@ -119,6 +135,9 @@ REPORT_START_LOCUS = "%OL_CREATE_REPORT"
 REPORT_END_LOCUS = "%OL_END_REPORT"
 METRIC_LOCUS = "%OL_METRIC"
 
+FAILURE_TAIL_LINES = 10
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
 GlobalToolbox = Toolbox(os.path.join(os.getcwd(), "openlane_run", "tmp"))
 LastState: State = State()
 
@@ -126,14 +145,119 @@ ViewsUpdate = Dict[DesignFormat, StateElement]
 MetricsUpdate = Dict[str, Any]
 
 
+PROCESS_SAMPLING_INTERVAL_ENV_VAR = "OPENLANE_PROCESS_SAMPLING_INTERVAL"
+
+#: Processes are first sampled at this interval, in seconds, which then grows
+#: by :data:`PROCESS_SAMPLING_BACKOFF` with every sample...
+PROCESS_SAMPLING_MIN_INTERVAL = 0.01
+
+#: ...until it reaches this interval, which can be overridden using the
+#: environment variable ``OPENLANE_PROCESS_SAMPLING_INTERVAL``.
+PROCESS_SAMPLING_MAX_INTERVAL = 1.0
+
+PROCESS_SAMPLING_BACKOFF = 1.5
+
+
+def _read_proc_usage(pid: int) -> Optional[Tuple[Dict[str, float], bool]]:
+    # See proc(5). The second field, the executable name, may contain spaces.
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    fields = stat[stat.rindex(b")") + 2 :].split()
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    usage = {
+        # Times of children are only included once they have been waited for
+        "cpu_time_user": (int(fields[11]) + int(fields[13])) / clock_ticks,
+        "cpu_time_system": (int(fields[12]) + int(fields[14])) / clock_ticks,
+        "cpu_time_iowait": int(fields[39]) / clock_ticks,
+        "threads": int(fields[17]),
+        "memory_vms": int(fields[20]),
+        "memory_rss": int(fields[21]) * os.sysconf("SC_PAGE_SIZE"),
+        "read_bytes": 0,
+        "write_bytes": 0,
+    }
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            for line in f:
+                key, value = line.split(b":")
+                if key in [b"read_bytes", b"write_bytes"]:
+                    usage[key.decode("utf8")] = int(value)
+    except OSError:  # Kernel built without task I/O accounting
+        pass
+    return usage, fields[0] not in [b"Z", b"X"]
+
+
+def _read_proc_children(pid: int) -> List[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children", "rb") as f:
+            children += [int(child) for child in f.read().split()]
+    return children
+
+
+def wait_no_reap(process: psutil.Popen):
+    """
+    Waits for a process to exit without waiting for it in the sense of
+    ``wait(2)``, so its final resource usage can still be sampled. Does nothing
+    on platforms that do not support this.
+
+    :param process: The process
+    """
+    if not hasattr(os, "waitid"):
+        return
+    try:
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+    except ChildProcessError:  # Already waited for
+        pass
+
+
 class ProcessStatsThread(Thread):
-    def __init__(self, process: psutil.Popen, interval: float = 0.1):
-        Thread.__init__(
-            self,
-        )
+    """
+    Samples the resource usage of a process and all of its descendants, e.g.
+    the processes spawned by wrapper scripts, until the process exits or
+    :meth:`stop` is called.
+
+    On Linux, ``/proc`` is read directly, which is considerably cheaper than
+    going through ``psutil``.
+
+    The process is first sampled every ``min_interval`` seconds, with the
+    interval growing up to ``max_interval`` for long-running processes, so
+    short processes are profiled accurately and long ones cheaply.
+
+    :param process: The process
+    :param min_interval: See :data:`PROCESS_SAMPLING_MIN_INTERVAL`
+    :param max_interval: See :data:`PROCESS_SAMPLING_MAX_INTERVAL`
+
+    :ivar time: The CPU times of the process tree, in seconds.
+    :ivar peak_resources: The peak CPU utilization (in percent), memory usage
+        (in bytes) and number of threads of the process tree.
+    :ivar avg_resources: The averages of the above, weighted by time.
+    :ivar peak_process_memory_vms: The peak virtual memory usage of any single
+        process of the process tree, in bytes.
+    :ivar io: The number of bytes read from and written to storage by the
+        process tree.
+    :ivar samples: Every sample of the above resources as a list for each
+        resource, along with the ``time`` each sample was taken at relative to
+        the start of the thread.
+    """
+
+    def __init__(
+        self,
+        process: psutil.Process,
+        min_interval: float = PROCESS_SAMPLING_MIN_INTERVAL,
+        max_interval: Optional[float] = None,
+    ):
+        Thread.__init__(self, daemon=True)
         self.process = process
-        self.result = None
-        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval or float(
+            os.getenv(
+                PROCESS_SAMPLING_INTERVAL_ENV_VAR,
+                PROCESS_SAMPLING_MAX_INTERVAL,
+            )
+        )
         self.time = {"cpu_time_user": 0.0, "cpu_time_system": 0.0}
         if sys.platform == "linux":
             self.time["cpu_time_iowait"] = 0.0
@@ -150,45 +274,155 @@ class ProcessStatsThread(Thread):
             "memory_vms": 0.0,
             "threads": 0.0,
         }
+        self.peak_process_memory_vms = 0.0
+        self.io = {"read_bytes": 0, "write_bytes": 0}
+        self.samples: Dict[str, List[float]] = {
+            "time": [],
+            **{k: [] for k in self.peak_resources},
+        }
 
-    def run(self):
-        try:
-            count = 1
-            status = self.process.status()
-            while status not in [psutil.STATUS_ZOMBIE, psutil.STATUS_DEAD]:
-                with self.process.oneshot():
-                    cpu = self.process.cpu_percent()
-                    memory = self.process.memory_info()
-                    cpu_time = self.process.cpu_times()
-                    threads = self.process.num_threads()
-
-                    self.time["cpu_time_user"] = cpu_time.user
-                    self.time["cpu_time_system"] = cpu_time.system
-                    if sys.platform == "linux":
-                        self.time["cpu_time_iowait"] = cpu_time.iowait  # type: ignore
+        self.__stopped = Event()
+        self.__use_proc = sys.platform == "linux" and os.path.isfile(
+            f"/proc/{process.pid}/task/{process.pid}/children"
+        )
 
-                    current: Dict[str, float] = {}
-                    current["cpu_percent"] = cpu
-                    current["memory_rss"] = memory.rss
-                    current["memory_vms"] = memory.vms
-                    current["threads"] = threads
+    def stop(self):
+        """
+        Takes a last sample and stops the thread immediately, instead of
+        waiting for the next sample to notice the process has exited.
 
-                    for key in self.peak_resources.keys():
-                        self.peak_resources[key] = max(
-                            current[key], self.peak_resources[key]
-                        )
+        The cumulative CPU time and I/O of a process can only be read until
+        it has been waited for, so this should be called once the process has
+        exited but before it is waited for, e.g. using :func:`wait_no_reap`.
+        """
+        self.__stopped.set()
+
+    def __sample_proc(self) -> Tuple[Dict[str, float], bool]:
+        total: Dict[str, float] = {}
+        root_alive = False
+        pending = [self.process.pid]
+        while len(pending) != 0:
+            pid = pending.pop()
+            result = _read_proc_usage(pid)
+            if result is None:  # Exited since it was listed
+                continue
+            usage, alive = result
+            if pid == self.process.pid:
+                root_alive = alive
+            for key, value in usage.items():
+                total[key] = total.get(key, 0) + value
+            total["memory_vms_process"] = max(
+                total.get("memory_vms_process", 0), usage["memory_vms"]
+            )
+            try:
+                pending += _read_proc_children(pid)
+            except OSError:
+                pass
+        return total, root_alive
 
-                        # moving average
-                        self.avg_resources[key] = (
-                            (count * self.avg_resources[key]) + current[key]
-                        ) / (count + 1)
+    def __sample_psutil(self) -> Tuple[Dict[str, float], bool]:
+        total: Dict[str, float] = {}
+        try:
+            alive = self.process.status() not in [
+                psutil.STATUS_ZOMBIE,
+                psutil.STATUS_DEAD,
+            ]
+            processes = [self.process] + self.process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return total, False
+        for process in processes:
+            try:
+                with process.oneshot():
+                    cpu_time = process.cpu_times()
+                    memory = process.memory_info()
+                    usage = {
+                        "cpu_time_user": cpu_time.user + cpu_time.children_user,
+                        "cpu_time_system": cpu_time.system + cpu_time.children_system,
+                        "threads": process.num_threads(),
+                        "memory_rss": memory.rss,
+                        "memory_vms": memory.vms,
+                    }
+                    if sys.platform == "linux":
+                        usage["cpu_time_iowait"] = cpu_time.iowait  # type: ignore
+                    try:
+                        io = process.io_counters()  # type: ignore
+                        usage["read_bytes"] = io.read_bytes
+                        usage["write_bytes"] = io.write_bytes
+                    except (AttributeError, psutil.AccessDenied):
+                        # Unsupported on macOS
+                        pass
+            except psutil.NoSuchProcess:
+                continue
+            for key, value in usage.items():
+                total[key] = total.get(key, 0) + value
+            total["memory_vms_process"] = max(
+                total.get("memory_vms_process", 0), usage["memory_vms"]
+            )
+        return total, alive
 
-                    count += 1
-                    time.sleep(self.interval)
-                    status = self.process.status()
-        except psutil.Error as e:
+    def run(self):
+        interval = self.min_interval
+        start_time = time.time()
+        last_time = start_time
+        last_cpu_time = 0.0
+        weighted = {k: 0.0 for k in self.avg_resources}
+        current: Dict[str, float] = {}
+        try:
+            while True:
+                final = self.__stopped.is_set()
+                if self.__use_proc:
+                    usage, alive = self.__sample_proc()
+                else:
+                    usage, alive = self.__sample_psutil()
+                if len(usage) == 0:
+                    break
+                now = time.time()
+
+                # Cumulative counters of children briefly disappear between
+                # their exit and their parent waiting for them
+                for key in self.time:
+                    self.time[key] = max(self.time[key], usage.get(key, 0.0))
+                for key in self.io:
+                    self.io[key] = max(self.io[key], int(usage.get(key, 0)))
+                self.peak_process_memory_vms = max(
+                    self.peak_process_memory_vms, usage["memory_vms_process"]
+                )
+
+                cpu_time = self.time["cpu_time_user"] + self.time["cpu_time_system"]
+                current = {
+                    "cpu_percent": 0.0,
+                    "memory_rss": usage["memory_rss"],
+                    "memory_vms": usage["memory_vms"],
+                    "threads": usage["threads"],
+                }
+                if len(self.samples["time"]) != 0 and now > last_time:
+                    current["cpu_percent"] = (
+                        (cpu_time - last_cpu_time) / (now - last_time) * 100
+                    )
+                for key in self.peak_resources:
+                    self.peak_resources[key] = max(
+                        current[key], self.peak_resources[key]
+                    )
+                    weighted[key] += current[key] * (now - last_time)
+                    self.samples[key].append(current[key])
+                self.samples["time"].append(now - start_time)
+                last_time = now
+                last_cpu_time = cpu_time
+
+                if not alive or final:
+                    break
+                self.__stopped.wait(interval)
+                interval = min(interval * PROCESS_SAMPLING_BACKOFF, self.max_interval)
+        except (OSError, psutil.Error) as e:
             warn(e)
 
+        elapsed = last_time - start_time
+        for key in self.avg_resources:
+            if elapsed > 0:
+                self.avg_resources[key] = weighted[key] / elapsed
+            else:
+                self.avg_resources[key] = current.get(key, 0.0)
+
     def stats_as_dict(self):
         return {
             "time": {k: format_elapsed_time(self.time[k]) for k in self.time},
@@ -204,9 +438,110 @@ class ProcessStatsThread(Thread):
                 else format_size(int(self.avg_resources[k]))
                 for k in self.avg_resources
             },
+            "io": {k: format_size(self.io[k]) for k in self.io},
+            "samples": self.samples,
         }
 
 
+class OutputProcessor(ABC):
+    """
+    An abstract base class for processors of subprocess output in
+    :meth:`Step.run_subprocess`.
+
+    One object is created for each processor class in
+    :attr:`Step.output_processors` every time a subprocess is run.
+
+    :param step: The step running the subprocess
+    :param report_dir: The directory in which reports are to be created
+    :param silent: Whether the subprocess is being run silently
+    """
+
+    def __init__(self, step: Step, report_dir: Union[str, os.PathLike], silent: bool):
+        self.step = step
+        self.report_dir = report_dir
+        self.silent = silent
+
+    @abstractmethod
+    def process_line(self, line: str) -> bool:
+        """
+        :param line: A line of output from the subprocess, including the newline
+        :returns: ``True`` if the line was consumed by this processor, i.e.,
+            it should not be passed to the remaining processors nor echoed.
+        """
+        pass
+
+    def result(self) -> Dict[str, Any]:
+        """
+        :returns: Metrics to add to the return value of :meth:`Step.run_subprocess`
+        """
+        return {}
+
+    def close(self):
+        """
+        Called once the subprocess's output has been exhausted (or if processing
+        fails.) Processors should close any files they have opened here.
+        """
+        pass
+
+
+class MetricsProcessor(OutputProcessor):
+    """
+    Handles the ``%OL_METRIC``, ``%OL_METRIC_I`` and ``%OL_METRIC_F`` directives.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generated_metrics: Dict[str, Any] = {}
+
+    def process_line(self, line: str) -> bool:
+        if not line.startswith(METRIC_LOCUS):
+            return False
+        command, name, value = line.split(" ", maxsplit=3)
+        metric_type: Union[Type[str], Type[int], Type[float]] = str
+        if command.endswith("_I"):
+            metric_type = int
+        elif command.endswith("_F"):
+            metric_type = float
+        self.generated_metrics[name] = metric_type(value)
+        return True
+
+    def result(self) -> Dict[str, Any]:
+        return self.generated_metrics
+
+
+class ReportProcessor(OutputProcessor):
+    """
+    Handles the ``%OL_CREATE_REPORT`` and ``%OL_END_REPORT`` directives, redirecting
+    the lines in between to the report file.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.current_report: Optional[TextIO] = None
+
+    def process_line(self, line: str) -> bool:
+        if self.step.step_dir is not None and line.startswith(REPORT_START_LOCUS):
+            self.close()
+            report_name = line[len(REPORT_START_LOCUS) + 1 :].strip()
+            report_path = os.path.join(self.report_dir, report_name)
+            self.current_report = open(report_path, "w", buffering=OUTPUT_BUFFER_SIZE)
+            return True
+        elif line.startswith(REPORT_END_LOCUS):
+            self.close()
+            return True
+        elif self.current_report is not None:
+            # No echo- the timing reports especially can be very large
+            # and terminal emulators will slow the flow down.
+            self.current_report.write(line)
+            return True
+        return False
+
+    def close(self):
+        if self.current_report is not None:
+            self.current_report.close()
+        self.current_report = None
+
+
 class Step(ABC):
     """
     An abstract base class for Step objects.
@@ -284,11 +619,32 @@ class Step(ABC):
     :cvar config_vars: A list of configuration :class:`openlane.config.Variable` objects
         to be used to alter the behavior of this Step.
 
+    :cvar output_processors: A list of :class:`OutputProcessor` classes that
+        process the output of subprocesses run using :meth:`run_subprocess`,
+        in order.
+
+    :cvar reads_metrics: Whether this step reads metrics from its input state.
+
+        Used by flows that schedule independent steps concurrently: a step
+        that reads metrics depends on every step that precedes it. Steps
+        that do not may only depend on the steps generating their input
+        (and output) views.
+
+    :cvar cacheable: Whether the results of this step may be stored in and
+        restored from the step cache, if enabled. Should be set to ``False`` for
+        steps with side effects beyond their outputs, e.g. opening a GUI.
+
     :ivar state_out:
         The last output state from running this step object, if it exists.
 
         If :meth:`start` is called again, the reference is destroyed.
 
+    :ivar updates:
+        The views and metrics updates returned by the last run of this step
+        object (or restored from the step cache), if it exists.
+
+        If :meth:`start` is called again, the reference is destroyed.
+
     :ivar start_time:
         The last starting time from running this step object, if it exists.
 
@@ -304,6 +660,27 @@ class Step(ABC):
         exists.
 
         If :meth:`start` is called again, the reference is destroyed.
+
+    :ivar subprocess_stats:
+        The resource usage of every subprocess run using :meth:`run_subprocess`
+        during the last run of this step object: a list of dictionaries with the
+        command, start and end times, CPU times, peak and average memory usage
+        and I/O of each subprocess.
+
+        If :meth:`start` is called again, the list is emptied.
+
+    :ivar cache_stats:
+        The step cache statistics from the last run of this step object,
+        if the step cache was enabled: a dictionary with the keys ``key``,
+        ``hits``, ``misses`` and ``bytes_restored``.
+
+        If :meth:`start` is called again, the reference is destroyed.
+
+    :ivar oom_retries:
+        The number of times the last run of this step object was retried with
+        reduced memory usage after running out of memory.
+
+        If :meth:`start` is called again, it is reset to zero.
     """
 
     # Class Variables
@@ -311,6 +688,12 @@ class Step(ABC):
     inputs: ClassVar[List[DesignFormat]] = NotImplemented
     outputs: ClassVar[List[DesignFormat]] = NotImplemented
     config_vars: ClassVar[List[Variable]] = []
+    output_processors: ClassVar[List[Type[OutputProcessor]]] = [
+        MetricsProcessor,
+        ReportProcessor,
+    ]
+    reads_metrics: ClassVar[bool] = True
+    cacheable: ClassVar[bool] = True
 
     # Instance Variables
     name: str
@@ -320,8 +703,12 @@ class Step(ABC):
     ## Stateful
     toolbox: Toolbox = GlobalToolbox
     state_out: Optional[State] = None
+    updates: Optional[Tuple[ViewsUpdate, MetricsUpdate]] = None
     start_time: Optional[float] = None
     end_time: Optional[float] = None
+    cache_stats: Optional[Dict[str, Any]] = None
+    subprocess_stats: List[Dict[str, Any]]
+    oom_retries: int = 0
 
     # These are mutable class variables. However, they will only be used
     # when steps are run outside of a Flow, pretty much.
@@ -391,6 +778,7 @@ class Step(ABC):
         else:
             state_in_future = state_in
         self.state_in = state_in_future
+        self.subprocess_stats = []
 
     def __init_subclass__(cls):
         if hasattr(cls, "flow_control_variable"):
@@ -754,6 +1142,9 @@ class Step(ABC):
                 in self.__class__.inputs  # hack to write tests a bit more easily
             ):
                 state_in[format.value.id] = None
+        self.state_in.result().materialize(
+            [format for format in DesignFormat if state_in[format.value.id] is not None]
+        )
         state_in["metrics"] = self.state_in.result().metrics.copy_mut()
         dumpable_state = copy_recursive(state_in, translator=visitor)
         state_path = os.path.join(target_dir, "state_in.json")
@@ -841,6 +1232,10 @@ class Step(ABC):
             self.toolbox = toolbox
 
         state_in_result = self.state_in.result()
+        self.updates = None
+        self.cache_stats = None
+        self.subprocess_stats = []
+        self.oom_retries = 0
 
         if not _no_rule:
             rule(f"{self.long_name}")
@@ -849,12 +1244,8 @@ class Step(ABC):
         with open(os.path.join(self.step_dir, "state_in.json"), "w") as f:
             f.write(state_in_result.dumps())
 
+        config_mut = self.__get_config_dict()
         with open(os.path.join(self.step_dir, "config.json"), "w") as f:
-            config_mut = self.config.to_raw_dict()
-            config_mut["meta"] = {
-                "openlane_version": __version__,
-                "step": self.__class__.get_implementation_id(),
-            }
             f.write(json.dumps(config_mut, cls=GenericDictEncoder, indent=4))
 
         debug(f"{self.step_dir}")
@@ -867,18 +1258,81 @@ class Step(ABC):
                     f"{type(self).__name__}: missing required input '{input.name}'"
                 )
 
-        try:
-            views_updates, metrics_updates = self.run(state_in_result, **kwargs)
-        except subprocess.CalledProcessError as e:
-            if e.returncode is not None and e.returncode < 0:
-                raise StepSignalled(
-                    f"{self.name}: Interrupted ({Signals(-e.returncode).name})"
+        self.__materialize_inputs(state_in_result)
+
+        with open(os.path.join(self.step_dir, "input_hashes.json"), "w") as f:
+            json.dump(
+                get_input_hashes(config_mut, state_in_result, self.inputs),
+                f,
+                indent=4,
+            )
+
+        step_cache = get_step_cache() if self.cacheable else None
+        cache_key: Optional[str] = None
+        restored = None
+        if step_cache is not None:
+            cache_key = step_cache.get_key(
+                self.__class__.get_implementation_id(),
+                config_mut,
+                state_in_result,
+                self.inputs,
+                self.get_cache_key_extras(state_in_result),
+            )
+            restored = step_cache.restore(cache_key, self.step_dir)
+
+        if restored is not None:
+            views_updates, metrics_updates, bytes_restored = restored
+            info(f"Restored results of '{self.name}' from the step cache.")
+        else:
+            bytes_restored = 0
+            try:
+                views_updates, metrics_updates = self.__run_retrying_oom(
+                    state_in_result, **kwargs
                 )
-            else:
+            except OutOfMemoryError as e:
                 raise StepError(
-                    f"{self.name}: subprocess {e.args} failed", underlying_error=e
+                    f"{self.name}: subprocess {e.args} ran out of memory",
+                    underlying_error=e,
+                )
+            except subprocess.CalledProcessError as e:
+                if e.returncode is not None and e.returncode < 0:
+                    raise StepSignalled(
+                        f"{self.name}: Interrupted ({Signals(-e.returncode).name})"
+                    )
+                else:
+                    raise StepError(
+                        f"{self.name}: subprocess {e.args} failed", underlying_error=e
+                    )
+            if step_cache is not None and cache_key is not None:
+                # Retries may have changed the configuration or the choices
+                # made by the step, so the results are stored under the key
+                # of what was actually run
+                cache_key = step_cache.get_key(
+                    self.__class__.get_implementation_id(),
+                    self.__get_config_dict(),
+                    state_in_result,
+                    self.inputs,
+                    self.get_cache_key_extras(state_in_result),
+                )
+                step_cache.store(
+                    cache_key, self.step_dir, views_updates, metrics_updates
                 )
 
+        if cache_key is not None:
+            self.cache_stats = {
+                "key": cache_key,
+                "hits": int(restored is not None),
+                "misses": int(restored is None),
+                "bytes_restored": bytes_restored,
+            }
+            with open(os.path.join(self.step_dir, "cache.json"), "w") as f:
+                json.dump(self.cache_stats, f, indent=4)
+
+        if object_store := ObjectStore.find(self.step_dir):
+            if saved := object_store.put_views(self.step_dir, views_updates):
+                verbose(f"Deduplicated {format_size(saved)} of views.")
+
+        self.updates = (views_updates, metrics_updates)
         metrics = GenericImmutableDict(
             state_in_result.metrics, overrides=metrics_updates
         )
@@ -896,11 +1350,147 @@ class Step(ABC):
         with open(os.path.join(self.step_dir, "state_out.json"), "w") as f:
             f.write(self.state_out.dumps())
 
+        with open(os.path.join(self.step_dir, "profile.json"), "w") as f:
+            json.dump(self.get_profile(), f, indent=4)
+
         if Config.current_interactive:
             LastState = self.state_out
 
         return self.state_out
 
+    def __run_retrying_oom(
+        self,
+        state_in: State,
+        **kwargs,
+    ) -> Tuple[ViewsUpdate, MetricsUpdate]:
+        while True:
+            try:
+                views_updates, metrics_updates = self.__run_decompressed(
+                    state_in, **kwargs
+                )
+                break
+            except OutOfMemoryError:
+                if self.oom_retries >= self.config.get("STEP_OOM_RETRIES", 0):
+                    raise
+                overrides = self.reduce_memory_usage()
+                if overrides is None:
+                    raise
+                self.oom_retries += 1
+                adjustments = ", ".join(f"{k}={v}" for k, v in overrides.items())
+                if adjustments != "":
+                    adjustments = f" ({adjustments})"
+                warn(f"{self.name}: Retrying with reduced memory usage{adjustments}…")
+                self.config = self.config.copy(**overrides)
+                with open(os.path.join(self.step_dir, "config.json"), "w") as f:
+                    f.write(
+                        json.dumps(
+                            self.__get_config_dict(), cls=GenericDictEncoder, indent=4
+                        )
+                    )
+        return views_updates, metrics_updates
+
+    def __run_decompressed(
+        self,
+        state_in: State,
+        **kwargs,
+    ) -> Tuple[ViewsUpdate, MetricsUpdate]:
+        # Tools cannot read compressed views: the step is given decompressed
+        # copies of its inputs, and its outputs are compressed if requested
+        decompressed_dir = os.path.join(self.step_dir, "decompressed")
+        state_decompressed, originals = decompress_views(
+            state_in, self.inputs, decompressed_dir
+        )
+        try:
+            views_updates, metrics_updates = self.run(state_decompressed, **kwargs)
+        finally:
+            if len(originals) != 0:
+                shutil.rmtree(decompressed_dir, ignore_errors=True)
+
+        def restore_original(x: Any) -> Any:
+            if isinstance(x, Path) and (original := originals.get(str(x))):
+                return Path(original)
+            return x
+
+        if len(originals) != 0:
+            views_updates = {
+                format: copy_recursive(value, translator=restore_original)
+                for format, value in views_updates.items()
+            }
+        if self.config.get("COMPRESS_VIEWS"):
+            views_updates = compress_views(views_updates, self.step_dir)
+        return views_updates, metrics_updates
+
+    def __materialize_inputs(self, state_in: State):
+        try:
+            state_in.materialize(self.inputs)
+        except (subprocess.CalledProcessError, ValueError) as e:
+            raise StepError(
+                f"{self.name}: failed to materialize input views: {e}",
+                underlying_error=e,
+            )
+
+    def __get_config_dict(self) -> Dict[str, Any]:
+        config_mut = self.config.to_raw_dict()
+        config_mut["meta"] = {
+            "openlane_version": __version__,
+            "step": self.__class__.get_implementation_id(),
+        }
+        return config_mut
+
+    def try_reuse(self, step_dir: str) -> Optional[State]:
+        """
+        Attempts to reuse the results of a previous run of this step instead of
+        running it again.
+
+        The results are reused if the previous run completed and its
+        configuration, input state and the hashes of the files it used as
+        inputs are all identical to what :meth:`start` would use now.
+
+        :param step_dir: The step directory of the previous run
+        :returns: The output state of the previous run if it was reused, otherwise
+            ``None``.
+        """
+        state_in_result = self.state_in.result()
+
+        def normalize(x: Any) -> Any:
+            return json.loads(json.dumps(x, cls=GenericDictEncoder))
+
+        try:
+            with open(os.path.join(step_dir, "config.json"), encoding="utf8") as f:
+                config_previous = json.load(f)
+            with open(os.path.join(step_dir, "state_in.json"), encoding="utf8") as f:
+                state_in_previous = json.load(f)
+            with open(
+                os.path.join(step_dir, "input_hashes.json"), encoding="utf8"
+            ) as f:
+                input_hashes_previous = json.load(f)
+            with open(os.path.join(step_dir, "state_out.json"), encoding="utf8") as f:
+                state_out = State.loads(f.read())
+        except (OSError, ValueError, InvalidState) as e:
+            debug(f"Not reusing '{step_dir}': {e}")
+            return None
+
+        config_mut = self.__get_config_dict()
+        if normalize(config_mut) != config_previous:
+            debug(f"Not reusing '{step_dir}': configuration changed")
+            return None
+        if json.loads(state_in_result.dumps()) != state_in_previous:
+            debug(f"Not reusing '{step_dir}': input state changed")
+            return None
+        for input in self.inputs:
+            if state_in_result[input] is None:
+                return None
+        self.__materialize_inputs(state_in_result)
+        input_hashes = get_input_hashes(config_mut, state_in_result, self.inputs)
+        if input_hashes != input_hashes_previous:
+            debug(f"Not reusing '{step_dir}': input files changed")
+            return None
+
+        self.step_dir = step_dir
+        self.cache_stats = None
+        self.state_out = state_out
+        return state_out
+
     @protected
     @abstractmethod
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
@@ -924,6 +1514,53 @@ class Step(ABC):
         """
         pass
 
+    @protected
+    def reduce_memory_usage(self) -> Optional[Dict[str, Any]]:
+        """
+        Called when a subprocess of this step ran out of memory, so the step
+        may be retried with a configuration that uses less memory, e.g. by
+        using fewer threads.
+
+        Steps that support this should override this method. Steps may also
+        adjust other state, such as running jobs serially instead of in
+        parallel.
+
+        :returns: Configuration overrides for the retry, or ``None`` if the
+            memory usage cannot be reduced further, in which case the step
+            fails.
+        """
+        return None
+
+    def get_cache_key_extras(self, state_in: State) -> Dict[str, Any]:
+        """
+        Steps whose results depend on anything besides their configuration and
+        inputs, e.g. on choices made according to the available resources,
+        should override this method so these choices are part of their key in
+        the step cache.
+
+        The choices must be made here, so that :meth:`run` makes the same
+        ones.
+
+        :param state_in: The input state
+        :returns: JSON-serializable values added to the step's cache key
+        """
+        return {}
+
+    def get_profile(self) -> Dict[str, Any]:
+        """
+        :returns: The timing and resource usage of the last run of this step
+            object, as written to ``profile.json`` in the step directory.
+        """
+        return {
+            "id": self.id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "cache_hit": self.cache_stats is not None and self.cache_stats["hits"] > 0,
+            "subprocesses": self.subprocess_stats,
+            "oom_retries": self.oom_retries,
+        }
+
     @protected
     def get_log_path(self) -> str:
         """
@@ -962,6 +1599,11 @@ class Step(ABC):
         * ``%OL_METRIC_I <name> <value>``: Adds an integer metric with the name
             <name> and the value <value> to this function's returned object.
 
+        Each line is passed through the step's :attr:`output_processors` in
+        order until one consumes it; lines no processor consumes are echoed to
+        the terminal unless ``silent`` is set. Output is streamed: only the last
+        few lines are retained in memory to be printed if the subprocess fails.
+
         :param cmd: A list of variables, representing a program and its arguments,
             similar to how you would use it in a shell.
         :param log_to: An optional override for the log path from
@@ -980,10 +1622,7 @@ class Step(ABC):
             report_dir = self.step_dir
         mkdirp(report_dir)
 
-        generated_metrics: Dict[str, Any] = {}
-
         log_path = log_to or self.get_log_path()
-        log_file = open(log_path, "w")
         cmd_str = [str(arg) for arg in cmd]
 
         with open(os.path.join(self.step_dir, "COMMANDS"), "a+") as f:
@@ -1008,46 +1647,57 @@ class Step(ABC):
                     raise StepException(
                         f"Environment variable for key '{key}' is of invalid type {type(value)}: {value}"
                     )
-        process = psutil.Popen(
-            cmd_str,
-            encoding="utf8",
-            env=env,
-            **kwargs,
+        scheduler = get_scheduler()
+        history_key = self.get_resource_history_key(log_path)
+        cpus, memory = scheduler.estimate(history_key)
+        with scheduler.reserve(cpus, memory):
+            start_time = time.time()
+            process = psutil.Popen(
+                cmd_str,
+                encoding="utf8",
+                env=env,
+                **kwargs,
+            )
+
+            memory_limit: Optional[MemoryLimit] = None
+            if limit := self.config.get("STEP_MEMORY_LIMIT"):
+                memory_limit = MemoryLimit(int(limit * 1024**3))
+                memory_limit.apply(process)
+
+            process_stats_thread = ProcessStatsThread(process)
+            process_stats_thread.start()
+            with open(log_path, "w", buffering=OUTPUT_BUFFER_SIZE) as log_file:
+                generated_metrics, tail = self.process_output(
+                    process.stdout or [],
+                    report_dir,
+                    silent,
+                    log_file=log_file,
+                )
+            wait_no_reap(process)
+            end_time = time.time()
+            process_stats_thread.stop()
+            process_stats_thread.join()
+            returncode = process.wait()
+
+        scheduler.history.record(
+            history_key,
+            memory_rss=process_stats_thread.peak_resources["memory_rss"],
+            cpu_percent=process_stats_thread.avg_resources["cpu_percent"],
         )
 
-        process_stats_thread = ProcessStatsThread(process)
-        process_stats_thread.start()
-        lines = ""
-        if process_stdout := process.stdout:
-            current_rpt = None
-            while line := process_stdout.readline():
-                lines += line
-                log_file.write(line)
-                if self.step_dir is not None and line.startswith(REPORT_START_LOCUS):
-                    if current_rpt is not None:
-                        current_rpt.close()
-                    report_name = line[len(REPORT_START_LOCUS) + 1 :].strip()
-                    report_path = os.path.join(report_dir, report_name)
-                    current_rpt = open(report_path, "w")
-                elif line.startswith(REPORT_END_LOCUS):
-                    if current_rpt is not None:
-                        current_rpt.close()
-                    current_rpt = None
-                elif line.startswith(METRIC_LOCUS):
-                    command, name, value = line.split(" ", maxsplit=3)
-                    metric_type: Union[Type[str], Type[int], Type[float]] = str
-                    if command.endswith("_I"):
-                        metric_type = int
-                    elif command.endswith("_F"):
-                        metric_type = float
-                    generated_metrics[name] = metric_type(value)
-                elif current_rpt is not None:
-                    # No echo- the timing reports especially can be very large
-                    # and terminal emulators will slow the flow down.
-                    current_rpt.write(line)
-                elif not silent and "table template" not in line:  # sky130 ff hack
-                    verbose(line.strip(), markup=False)
-        process_stats_thread.join()
+        self.subprocess_stats.append(
+            {
+                "command": os.path.basename(cmd_str[0]),
+                "log": os.path.relpath(log_path, self.step_dir),
+                "start_time": start_time,
+                "end_time": end_time,
+                "returncode": returncode,
+                **process_stats_thread.time,
+                "peak_memory_rss": process_stats_thread.peak_resources["memory_rss"],
+                "avg_memory_rss": process_stats_thread.avg_resources["memory_rss"],
+                **process_stats_thread.io,
+            }
+        )
 
         json_stats = f"{os.path.splitext(log_path)[0]}.process_stats.json"
 
@@ -1057,19 +1707,105 @@ class Step(ABC):
                 f,
                 indent=4,
             )
-        returncode = process.wait()
-        log_file.close()
+        out_of_memory = False
+        if memory_limit is not None:
+            out_of_memory = memory_limit.ran_out(
+                returncode, tail, process_stats_thread.peak_process_memory_vms
+            )
+            memory_limit.release()
+
         if returncode != 0:
-            if returncode > 0:
-                split_lines = lines.split("\n")
-                log = "\n".join(split_lines[-10:])
-                if log.strip() != "":
-                    err(escape(log))
-                err(f"Log file: '{os.path.relpath(log_path)}'")
+            self.report_subprocess_failure(returncode, tail, log_path)
+            if out_of_memory:
+                err(
+                    f"'{os.path.basename(cmd_str[0])}' ran out of memory (peak usage: {format_size(int(process_stats_thread.peak_resources['memory_rss']))})."
+                )
+                raise OutOfMemoryError(returncode, process.args)
             raise subprocess.CalledProcessError(returncode, process.args)
 
         return generated_metrics
 
+    @protected
+    def process_output(
+        self,
+        lines: Iterable[str],
+        report_dir: Union[str, os.PathLike],
+        silent: bool = False,
+        log_file: Optional[TextIO] = None,
+    ) -> Tuple[Dict[str, Any], Deque[str]]:
+        """
+        Passes the output of a subprocess through the step's
+        :attr:`output_processors`, as described in :meth:`run_subprocess`.
+
+        :param lines: The lines of output
+        :param report_dir: The directory in which reports are to be created
+        :param silent: If set, lines no processor consumes are not echoed
+        :param log_file: If set, every line is also written to this file
+        :returns: The metrics generated by the processors, and the last
+            few lines of output.
+        """
+        output_processors = [
+            Processor(self, report_dir, silent) for Processor in self.output_processors
+        ]
+        tail: Deque[str] = deque(maxlen=FAILURE_TAIL_LINES)
+        try:
+            for line in lines:
+                tail.append(line)
+                if log_file is not None:
+                    log_file.write(line)
+                for processor in output_processors:
+                    if processor.process_line(line):
+                        break
+                else:
+                    if not silent and "table template" not in line:  # sky130 ff hack
+                        verbose(line.strip(), markup=False)
+        finally:
+            for processor in output_processors:
+                processor.close()
+
+        generated_metrics: Dict[str, Any] = {}
+        for processor in output_processors:
+            generated_metrics.update(processor.result())
+        return generated_metrics, tail
+
+    @protected
+    def report_subprocess_failure(
+        self,
+        returncode: int,
+        tail: Iterable[str],
+        log_path: Union[str, os.PathLike],
+    ):
+        """
+        Prints the last lines of output of a failed subprocess and the path to
+        its log. Nothing is printed for processes killed by signals.
+
+        :param returncode: The exit code of the subprocess
+        :param tail: The last lines of output, as returned by
+            :meth:`process_output`
+        :param log_path: The path to the subprocess's log
+        """
+        if returncode <= 0:
+            return
+        log = "".join(tail).rstrip("\n")
+        if log.strip() != "":
+            err(escape(log))
+        err(f"Log file: '{os.path.relpath(log_path)}'")
+
+    @protected
+    def get_resource_history_key(self, log_path: Union[str, os.PathLike]) -> str:
+        """
+        :param log_path: The path to the log of a subprocess
+        :returns: The key under which the resource usage of the subprocess is
+            recorded in the scheduler's history, and estimated from it.
+        """
+        return "/".join(
+            [
+                str(self.config.get("DESIGN_NAME")),
+                self.__class__.get_implementation_id(),
+                os.path.basename(log_path),
+            ]
+        )
+
     @protected
     def extract_env(self, kwargs) -> Tuple[dict, Dict[str, str]]:
         """
@@ -1115,6 +1851,7 @@ class Step(ABC):
         """
 
         __registry: ClassVar[Dict[str, Type[Step]]] = {}
+        __lazy_modules: ClassVar[Dict[str, str]] = {}
 
         @classmethod
         def register(Self) -> Callable[[Type[Step]], Type[Step]]:
@@ -1132,20 +1869,46 @@ class Step(ABC):
 
             return decorator
 
+        @classmethod
+        def register_lazy(Self, id_prefix: str, module: str):
+            """
+            Declares that the steps whose IDs start with ``{id_prefix}.`` are
+            registered by a module, which is only imported once one of these
+            steps is retrieved (or all steps are listed.)
+
+            :param id_prefix: The part of the step IDs before the first ``.``.
+                Case-insensitive.
+            :param module: The absolute name of the module
+            """
+            Self.__lazy_modules[id_prefix.lower()] = module
+
         @classmethod
         def get(Self, name: str) -> Optional[Type[Step]]:
             """
             Retrieves a Step type from the registry using a lookup string.
 
+            If the step is not registered, the module registering steps with its
+            ID prefix (see :meth:`register_lazy`) and then plugins are imported.
+
             :param name: The registered name of the Step. Case-insensitive.
             """
-            return Self.__registry.get(name.lower())
+            name = name.lower()
+            if name not in Self.__registry:
+                prefix = name.split(".")[0]
+                if module := Self.__lazy_modules.get(prefix):
+                    importlib.import_module(module)
+            if name not in Self.__registry:
+                load_plugins()
+            return Self.__registry.get(name)
 
         @classmethod
         def list(Self) -> List[str]:
             """
             :returns: A list of IDs of all registered names.
             """
+            for module in Self.__lazy_modules.values():
+                importlib.import_module(module)
+            load_plugins()
             return [cls.id for cls in Self.__registry.values()]
 
     factory = StepFactory
@@ -1195,6 +1958,7 @@ class CompositeStep(Step):
         if Self.outputs == NotImplemented:  # Allow for setting explicit outputs
             Self.outputs = list(output_set)
         Self.config_vars = list(config_var_dict.values())
+        Self.reads_metrics = any(step.reads_metrics for step in Self.Steps)
 
     def run(self, state_in: State, **kwargs) -> Tuple[ViewsUpdate, MetricsUpdate]:
         state = state_in
@@ -15,11 +15,13 @@ from __future__ import annotations
 
 import os
 import json
+import uuid
+import hashlib
 from enum import Enum
 from decimal import Decimal
 from abc import abstractmethod
 from dataclasses import is_dataclass, asdict
-from typing import Any, ClassVar, Iterable, List, Mapping, Tuple
+from typing import Any, ClassVar, Dict, Iterable, List, Mapping, Tuple
 
 from .step import ViewsUpdate, MetricsUpdate, Step, StepException
 
@@ -31,8 +33,54 @@ from ..common import (
     get_script_dir,
     protected,
     is_string,
+    mkdirp,
 )
 
+CONFIG_FILE_ENV_VAR = "OPENLANE_TCL_CONFIG_FILE"
+
+#: The environment variable pointing scripts to their configuration file
+CONFIG_FILE_POINTER = "_OPENLANE_CONFIG_TCL"
+
+#: Configuration variables that are still passed as environment variables, as
+#: tools use them before any OpenLane script runs, e.g. in ``.magicrc`` files
+ENVIRONMENT_CONFIG_VARS = ["PDK_ROOT", "PDK", "STD_CELL_LIBRARY"]
+
+
+def config_file_enabled() -> bool:
+    """
+    :returns: Whether the configuration of steps that support it is passed to
+        their scripts in a Tcl file instead of environment variables, which is
+        the case if the environment variable ``OPENLANE_TCL_CONFIG_FILE`` is set
+        to ``1``.
+    """
+    return os.getenv(CONFIG_FILE_ENV_VAR, "0").lower() in ["1", "true", "yes", "on"]
+
+
+def write_config_file(values: Mapping[str, str], directory: str) -> str:
+    """
+    Writes configuration variables to a file containing a Tcl dictionary,
+    which is read by ``scripts/config.tcl``.
+
+    Files are named after the hash of their contents, so identical
+    configurations are only written once per directory.
+
+    :param values: The configuration variables, already converted to Tcl
+    :param directory: The directory to write the file to, e.g. a step directory
+    :returns: The path to the file
+    """
+    content = "\n".join(
+        TclUtils.join([key, value]) for key, value in sorted(values.items())
+    )
+    digest = hashlib.sha256(content.encode("utf8")).hexdigest()
+    path = os.path.abspath(os.path.join(directory, f"config_{digest[:16]}.tcl"))
+    if not os.path.exists(path):
+        mkdirp(directory)
+        tmp_path = f"{path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w", encoding="utf8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return path
+
 
 class TclStep(Step):
     """
@@ -43,9 +91,14 @@ class TclStep(Step):
     a utility.
 
     :cvar reproducibles_allowed: Whether this class can generate reproducibles.
+    :cvar reads_config_file: Whether the scripts of this class source
+        ``scripts/config.tcl``, so configuration variables may be passed in a
+        file instead of environment variables. See :meth:`prepare_env`.
     """
 
     reproducibles_allowed: ClassVar[bool] = True
+    reads_config_file: ClassVar[bool] = False
+    reads_metrics = False
 
     @staticmethod
     def value_to_tcl(value: Any) -> str:
@@ -120,6 +173,13 @@ class TclStep(Step):
 
         The values are converted to strings as per :meth:`value_to_tcl`.
 
+        Large configurations make for large environments, which may exceed the
+        limits of the operating system. If :attr:`reads_config_file` is set and
+        :func:`config_file_enabled`, configuration variables are instead
+        written to a file (see :func:`write_config_file`) that is only pointed
+        to in the environment, and loaded into ``::env`` by the scripts
+        themselves.
+
         :param env: The input environment dictionary
         :param state: The input state
         :returns: a copy of the environment dictionary where ``self.config`` variables
@@ -140,11 +200,23 @@ class TclStep(Step):
         macro_lefs = self.toolbox.get_macro_views(self.config, DesignFormat.LEF)
         env["MACRO_LEFS"] = " ".join([str(lef) for lef in macro_lefs])
 
+        config_values: Dict[str, str] = {}
         for element in self.config.keys():
             value = self.config[element]
             if value is None:
                 continue
-            env[element] = TclStep.value_to_tcl(value)
+            config_values[element] = TclStep.value_to_tcl(value)
+
+        if self.reads_config_file and config_file_enabled():
+            for element in config_values:
+                # Values in the environment take precedence when loading
+                env.pop(element, None)
+            for element in ENVIRONMENT_CONFIG_VARS:
+                if element in config_values:
+                    env[element] = config_values[element]
+            env[CONFIG_FILE_POINTER] = write_config_file(config_values, self.step_dir)
+        else:
+            env.update(config_values)
 
         for input in self.inputs:
             key = f"CURRENT_{input.name}"
@@ -100,6 +100,8 @@ verilog_rtl_cfg_vars = [
 
 
 class YosysStep(TclStep):
+    reads_config_file = True
+
     config_vars = [
         Variable(
             "SYNTH_LATCH_MAP",
@@ -489,6 +491,9 @@ class EQY(YosysStep):
     name = "Equivalence Check"
     long_name = "RTL/Netlist Equivalence Check"
 
+    # Runs EQY rather than an OpenLane script
+    reads_config_file = False
+
     inputs = [DesignFormat.NETLIST]
     outputs = []
 
@@ -17,7 +17,6 @@ import enum
 from decimal import Decimal
 from dataclasses import dataclass
 from collections import UserString
-from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -220,16 +219,102 @@ def test_copy_recursive_visitor():
     assert deep_dict_copy["i"]["j"][1].v == "MY_l", "Copy_recursive visitor not working"
 
 
-def test_tpe():
-    from openlane.common import get_tpe, set_tpe
+def test_scheduler():
+    from openlane.common import get_scheduler, set_scheduler, ResourceScheduler
 
-    tpe = get_tpe()
-    assert tpe._max_workers == os.cpu_count(), "TPE was not initialized properly"
+    scheduler = get_scheduler()
+    assert (
+        scheduler.max_cpus == os.cpu_count()
+    ), "Scheduler was not initialized properly"
+
+    new_scheduler = ResourceScheduler(max_cpus=1)
+    set_scheduler(new_scheduler)
+
+    assert get_scheduler() == new_scheduler, "Failed to set scheduler properly"
+
+    set_scheduler(scheduler)
+
+
+def test_scheduler_nested():
+    from openlane.common import ResourceScheduler
+
+    scheduler = ResourceScheduler(max_cpus=1)
+
+    def inner(i):
+        with scheduler.reserve(cpus=4):
+            assert scheduler.cpus_used == 1, "oversized reservation not clamped"
+            return i
 
-    tpe = ThreadPoolExecutor(1)
-    set_tpe(tpe)
+    def outer():
+        futures = [scheduler.submit(inner, i) for i in range(4)]
+        return [future.result() for future in futures]
 
-    assert get_tpe() == tpe, "Failed to set TPE properly"
+    assert scheduler.submit(outer).result(timeout=10) == [
+        0,
+        1,
+        2,
+        3,
+    ], "nested jobs did not complete"
+    assert scheduler.cpus_used == 0, "reservations were not released"
+
+
+def test_scheduler_reserve_up_to():
+    from openlane.common import ResourceScheduler
+
+    scheduler = ResourceScheduler(max_cpus=4)
+
+    with scheduler.reserve_up_to(8) as cpus:
+        assert cpus == 4, "idle CPU slots not reserved"
+    with scheduler.reserve(cpus=3):
+        with scheduler.reserve_up_to(8) as cpus:
+            assert cpus == 1, "reserved CPU slots not excluded"
+            assert scheduler.cpus_used == 4, "CPU slots not reserved"
+    with scheduler.reserve_up_to(2) as cpus:
+        assert cpus == 2, "request not honored"
+    assert scheduler.cpus_used == 0, "reservations were not released"
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+def test_get_tpe():
+    from concurrent.futures import ThreadPoolExecutor
+    from openlane.common import get_tpe
+
+    tpe = get_tpe()
+    assert isinstance(tpe, ThreadPoolExecutor), "TPE is not a ThreadPoolExecutor"
+    assert tpe._max_workers >= 1, "TPE has no workers"
+    assert get_tpe() is tpe, "TPE not reused"
+
+
+def test_resource_history(tmp_path):
+    import json
+    from openlane.common import ResourceHistory
+
+    path = str(tmp_path / "resource_history.json")
+    a = ResourceHistory(path)
+    b = ResourceHistory(path)
+    assert b.get("x") is None, "Empty history has entries"
+
+    a.record("x", memory_rss=1024, cpu_percent=100)
+    b.record("y", memory_rss=2048, cpu_percent=200)
+    with open(path, encoding="utf8") as f:
+        assert set(json.load(f)) == {
+            "x",
+            "y",
+        }, "Entries recorded by another history overwritten"
+    assert b.get("x") == {
+        "memory_rss": 1024,
+        "cpu_percent": 100,
+    }, "Entries recorded by another history not merged"
+
+
+def test_parse_size():
+    from openlane.common import parse_size
+
+    assert parse_size("512") == 512, "plain byte count parsed incorrectly"
+    assert parse_size("16G") == 16 * 1024**3, "gigabytes parsed incorrectly"
+    assert parse_size("1.5KiB") == 1536, "fractional kibibytes parsed incorrectly"
+    with pytest.raises(ValueError, match="Invalid size"):
+        parse_size("lots")
 
 
 def test_immutable_dict():
@@ -0,0 +1,155 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import textwrap
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_remove_cells():
+    from openlane.common.liberty import LibertyIndex, remove_cells
+
+    with open("in.lib", "w", encoding="utf8") as f:
+        f.write(
+            textwrap.dedent(
+                """
+                library ("lib") {
+                    cell ("a") {
+                        pin ("A") { direction : input; }
+                        pin ("Y") {
+                            function : "(A)";
+                            timing () {
+                                when : "{not a brace}";
+                                /* } { */
+                            }
+                        }
+                    }
+                    cell (b) {
+                        area : 1;
+                    }
+                    cell ("c") { area : 2; }
+                }
+                """
+            )
+        )
+
+    removed = remove_cells("in.lib", "out.lib", ["a", "c"])
+    assert removed == 2, "unexpected number of cells removed"
+    assert open("out.lib", encoding="utf8").read() == textwrap.dedent(
+        """
+        library ("lib") {
+            /* removed a */
+            cell (b) {
+                area : 1;
+            }
+            /* removed c */
+        }
+        """
+    ), "cells removed incorrectly"
+
+    index = LibertyIndex.from_buffer(open("in.lib", "rb").read())
+    cells = [index.cells["c"], index.cells["a"]]
+    assert (
+        remove_cells("in.lib", "indexed.lib", ["a", "c"], cells) == 2
+    ), "unexpected number of cells removed using the index"
+    assert (
+        open("indexed.lib", "rb").read() == open("out.lib", "rb").read()
+    ), "cells removed using the index differ from those found by scanning"
+
+    with open("empty.lib", "w", encoding="utf8") as f:
+        pass
+    assert remove_cells("empty.lib", "empty.out.lib", ["a"]) == 0
+    assert (
+        open("empty.out.lib", encoding="utf8").read() == ""
+    ), "empty file not copied correctly"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_liberty_index():
+    from openlane.common import LibertyIndex, get_liberty_index
+
+    with open("in.lib", "w", encoding="utf8") as f:
+        f.write(
+            textwrap.dedent(
+                """
+                /* a comment mentioning library ("x") */
+                library ("lib") {
+                    default_operating_conditions : "tt";
+                    nom_voltage : 1.80;
+                    operating_conditions ("tt") {
+                        voltage : 1.8;
+                        temperature : 25;
+                    }
+                    cell ("a") {
+                        area : 3.75;
+                        pin ("A") { direction : input; }
+                        bus ("D") {
+                            direction : "input";
+                            pin ("D[0]") { direction : input; }
+                        }
+                        pin ("Y") {
+                            direction : output;
+                            function : "{not a brace}";
+                            timing () { values ("1, 2", \\
+                                "3, 4"); }
+                        }
+                    }
+                    cell (b) {
+                    }
+                }
+                """
+            )
+        )
+
+    index = get_liberty_index("in.lib", cache_dir="cache")
+    assert index.library == "lib", "library name not indexed"
+    assert index.nom_voltage == Decimal("1.80"), "nominal voltage not indexed"
+    assert index.default_operating_conditions == "tt"
+    assert index.operating_conditions == {
+        "tt": {"voltage": "1.8", "temperature": "25"}
+    }, "operating conditions not indexed"
+    assert list(index.cells) == ["a", "b"], "cells not indexed"
+    cell = index.cells["a"]
+    assert cell.area == Decimal("3.75"), "cell area not indexed"
+    assert cell.pins == {
+        "A": "input",
+        "D": "input",
+        "D[0]": "input",
+        "Y": "output",
+    }, "pin directions not indexed"
+    contents = open("in.lib", "rb").read()
+    assert contents[cell.start : cell.end].startswith(b'cell ("a")') and contents[
+        cell.start : cell.end
+    ].endswith(b"}"), "cell offsets not indexed"
+
+    assert len(os.listdir("cache")) == 1, "index not stored"
+    assert get_liberty_index("in.lib", cache_dir="cache") is index, "index not reused"
+
+    os.rename("in.lib", "moved.lib")
+    with mock.patch.object(LibertyIndex, "from_buffer") as from_buffer:
+        assert (
+            get_liberty_index("moved.lib", cache_dir="cache") == index
+        ), "stored index not reused"
+        from_buffer.assert_not_called()
+
+    with open("moved.lib", "a", encoding="utf8") as f:
+        f.write("/* changed */\n")
+    with mock.patch.object(
+        LibertyIndex, "from_buffer", wraps=LibertyIndex.from_buffer
+    ) as from_buffer:
+        get_liberty_index("moved.lib", cache_dir="cache")
+        from_buffer.assert_called_once()
@@ -0,0 +1,56 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import pytest
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_plugin_index(monkeypatch: pytest.MonkeyPatch):
+    import pkgutil
+    from openlane.plugins import find_plugins
+
+    monkeypatch.setenv("XDG_CACHE_HOME", os.getcwd())
+    site = os.path.abspath("site")
+    os.makedirs(os.path.join(site, "openlane_plugin_a"))
+    with open(os.path.join(site, "openlane_plugin_a", "__init__.py"), "w") as f:
+        f.write("")
+    with open(os.path.join(site, "unrelated.py"), "w") as f:
+        f.write("")
+
+    assert find_plugins([site]) == ["openlane_plugin_a"], "Plugin not found"
+    assert os.path.isfile(
+        os.path.join("openlane", "plugin_index.json")
+    ), "Plugin index not written"
+
+    scanned = []
+    iter_modules = pkgutil.iter_modules
+
+    def counting_iter_modules(path=None, prefix=""):
+        scanned.append(path)
+        return iter_modules(path, prefix)
+
+    monkeypatch.setattr(pkgutil, "iter_modules", counting_iter_modules)
+
+    assert find_plugins([site]) == ["openlane_plugin_a"], "Indexed plugin lost"
+    assert len(scanned) == 0, "Unmodified directory scanned again"
+
+    with open(os.path.join(site, "openlane_plugin_b.py"), "w") as f:
+        f.write("")
+    os.utime(site, (0, 0))
+    assert find_plugins([site]) == [
+        "openlane_plugin_a",
+        "openlane_plugin_b",
+    ], "Plugin added to indexed directory not found"
+    assert len(scanned) == 1, "Modified directory not scanned again"
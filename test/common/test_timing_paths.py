@@ -0,0 +1,169 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import math
+
+import pytest
+
+REPORT = """
+===========================================================================
+report_checks -path_delay max (Setup)
+============================================================================
+Startpoint: _1_ (rising edge-triggered flip-flop clocked by clk)
+Endpoint: _2_ (rising edge-triggered flip-flop clocked by clk)
+Path Group: clk
+Path Type: max
+
+Fanout     Cap    Slew   Delay    Time   Description
+-----------------------------------------------------------------------------
+                          0.00    0.00   clock clk (rise edge)
+                          0.00    0.00   clock source latency
+     1    0.01    0.03    0.02    0.02 ^ clk (in)
+                                         clk (net)
+                  0.03    0.00    0.02 ^ _1_/CLK (sky130_fd_sc_hd__dfxtp_1)
+     2    0.00    0.05    0.31    0.33 v _1_/Q (sky130_fd_sc_hd__dfxtp_1)
+                                         net1 (net)
+                  0.05    0.00    0.33 v _2_/D (sky130_fd_sc_hd__dfxtp_1)
+                                  0.33   data arrival time
+
+                         10.00   10.00   clock clk (rise edge)
+                          0.00   10.00   clock source latency
+     1    0.01    0.03    0.02   10.02 ^ clk (in)
+                  0.03    0.00   10.02 ^ _2_/CLK (sky130_fd_sc_hd__dfxtp_1)
+                         -0.25    9.77   clock uncertainty
+                         -0.12    9.65   library setup time
+                                  9.65   data required time
+-----------------------------------------------------------------------------
+                                  9.65   data required time
+                                 -0.33   data arrival time
+-----------------------------------------------------------------------------
+                                  9.32   slack (MET)
+
+
+Startpoint: in (input port clocked by clk)
+Endpoint: _3_ (rising edge-triggered flip-flop clocked by clk)
+Path Group: clk
+Path Type: max
+
+Fanout     Cap    Slew   Delay    Time   Description
+-----------------------------------------------------------------------------
+                          0.00    0.00   clock clk (rise edge)
+                          9.50    9.50 v input external delay
+     1    0.00    0.02    0.01    9.51 v in (in)
+                  0.02    0.00    9.51 v _3_/D (sky130_fd_sc_hd__dfxtp_1)
+                                  9.51   data arrival time
+
+                         10.00   10.00   clock clk (rise edge)
+                         -0.60    9.40   library setup time
+                                  9.40   data required time
+-----------------------------------------------------------------------------
+                                  9.40   data required time
+                                 -9.51   data arrival time
+-----------------------------------------------------------------------------
+                                 -0.11   slack (VIOLATED)
+
+
+Startpoint: a (input port)
+Endpoint: y (output port)
+Path Group: (none)
+Path Type: max
+
+Fanout     Cap    Slew   Delay    Time   Description
+-----------------------------------------------------------------------------
+                  0.00    0.00    0.00 ^ a (in)
+                  0.07    0.10    0.10 ^ y (out)
+                                  0.10   data arrival time
+-----------------------------------------------------------------------------
+(Path is unconstrained)
+"""
+
+
+def test_timing_paths():
+    from openlane.common.timing_paths import TimingPaths
+
+    paths = TimingPaths.from_sta(io.StringIO(REPORT), "nom_tt_025C_1v80")
+
+    assert len(paths) == 3, "Wrong number of paths"
+    first = paths.path(0)
+    assert first.startpoint == "_1_", "Wrong startpoint"
+    assert first.endpoint == "_2_", "Wrong endpoint"
+    assert first.group == "clk", "Wrong path group"
+    assert first.path_type == "max", "Wrong path type"
+    assert first.corner == "nom_tt_025C_1v80", "Wrong corner"
+    assert first.slack == 9.32, "Wrong slack"
+    assert first.arrival == 0.33, "Wrong arrival time"
+    assert first.required == 9.65, "Wrong required time"
+    assert [stage.pin for stage in first.stages] == [
+        "clk",
+        "_1_/CLK",
+        "_1_/Q",
+        "_2_/D",
+    ], "Wrong stages: stages of the required time included"
+    assert first.stages[2].cell == "sky130_fd_sc_hd__dfxtp_1", "Wrong stage cell"
+    assert first.stages[2].delay == 0.31, "Wrong stage delay"
+    assert first.stages[2].time == 0.33, "Wrong stage time"
+    assert [stage.pin for stage in paths.path(1).stages] == [
+        "in",
+        "_3_/D",
+    ], "Input delay counted as a stage"
+
+    unconstrained = paths.path(2)
+    assert unconstrained.endpoint == "y", "Unconstrained path not parsed"
+    assert math.isnan(unconstrained.slack), "Unconstrained path has a slack"
+    assert unconstrained.arrival == 0.10, "Wrong arrival of unconstrained path"
+
+    worst = paths.worst(5)
+    assert [path.endpoint for path in worst] == [
+        "_3_",
+        "_2_",
+    ], "Wrong worst paths"
+    assert paths.worst(5, path_type="min") == [], "Path type not filtered"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_timing_paths_corners():
+    from openlane.common.timing_paths import TimingPaths, write_path_database
+
+    with open("max.rpt", "w") as f:
+        f.write(REPORT)
+    database_path = write_path_database("max.rpt", "nom_tt_025C_1v80")
+    assert database_path == "max.paths", "Database not written next to report"
+
+    paths = TimingPaths.load(database_path)
+    # repr: nan != nan
+    assert repr(paths) == repr(
+        TimingPaths.from_sta(io.StringIO(REPORT), "nom_tt_025C_1v80")
+    ), "Database changed by saving and loading"
+
+    paths.extend(
+        TimingPaths.from_sta(
+            io.StringIO(REPORT.replace("9.32   slack", "-1.50   slack")),
+            "max_ss_100C_1v60",
+        )
+    )
+    assert len(paths) == 6, "Paths not appended"
+    assert paths.path(5).stages == paths.path(2).stages, "Stages not appended"
+    worst = paths.worst(1)[0]
+    assert (worst.corner, worst.slack) == (
+        "max_ss_100C_1v60",
+        -1.50,
+    ), "Wrong worst path across corners"
+    assert (
+        paths.worst(1, corner="nom_tt_025C_1v80")[0].slack == -0.11
+    ), "Corner not filtered"
+
+    assert paths.slack_histogram([-1.0, 0.0, 5.0]) == {
+        "nom_tt_025C_1v80": [0, 1, 0, 1],
+        "max_ss_100C_1v60": [1, 1, 0, 0],
+    }, "Wrong slack histogram"
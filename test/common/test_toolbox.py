@@ -758,3 +758,57 @@ def test_voltage_lib_get(sample_lib_files, caplog: pytest.LogCaptureFixture):
     assert (
         "and the lib file has multiple operating conditions" in caplog.text
     ), "Library with multiple operating conditions and no default did not produce a warning"
+
+
+@pytest.mark.usefixtures("_lib_mock_fs")
+def test_artifact_cache(lib_trim_result):
+    from openlane.common import (
+        Toolbox,
+        ArtifactCache,
+        get_artifact_cache,
+        set_artifact_cache,
+    )
+
+    artifact_cache_bk = get_artifact_cache()
+    artifact_cache = ArtifactCache("/cache")
+    set_artifact_cache(artifact_cache)
+    try:
+        input_lib_files = frozenset(["/cwd/example_lib.lib", "/cwd/example_lib2.lib"])
+        excluded_cells = frozenset(
+            open("/cwd/bad_cell_list.txt", encoding="utf8").read().strip().splitlines()
+        )
+
+        first = Toolbox("/tmp1").remove_cells_from_lib(input_lib_files, excluded_cells)
+        entries = [
+            os.path.join(root, file)
+            for root, _, files in os.walk("/cache")
+            for file in files
+            if not file.startswith(".")
+        ]
+        assert len(entries) == 2, "artifacts were not stored in the cache"
+
+        second = Toolbox("/tmp2").remove_cells_from_lib(input_lib_files, excluded_cells)
+        for file in second:
+            assert file.startswith("/tmp2"), "artifact not restored into tmp dir"
+            assert (
+                open(file, encoding="utf8").read().strip() in lib_trim_result
+            ), "restored artifact has unexpected contents"
+        assert sorted(os.stat(file).st_ino for file in second) == sorted(
+            os.stat(entry).st_ino for entry in entries
+        ), "artifacts were not restored from the cache"
+
+        artifact_cache.max_size = 1
+        Toolbox("/tmp3").remove_cells_from_lib(
+            input_lib_files, frozenset(list(excluded_cells)[:1])
+        )
+        remaining = [
+            file
+            for _, _, files in os.walk("/cache")
+            for file in files
+            if not file.startswith(".")
+        ]
+        assert len(remaining) == 0, "cache was not bounded by its maximum size"
+        for file in first + second:
+            assert os.path.isfile(file), "eviction removed a restored artifact"
+    finally:
+        set_artifact_cache(artifact_cache_bk)
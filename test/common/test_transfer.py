@@ -0,0 +1,49 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import hashlib
+
+import pytest
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_transfer_files():
+    from openlane.common.transfer import transfer_files
+
+    contents = {
+        "small.txt": b"small\n",
+        "large.bin": os.urandom(10000),
+    }
+    for name, data in contents.items():
+        with open(name, "wb") as f:
+            f.write(data)
+
+    files = [(name, os.path.join("copy", "nested", name)) for name in contents]
+    result = transfer_files(files, chunk_size=3000)
+    for name, data in contents.items():
+        target = os.path.join("copy", "nested", name)
+        assert open(target, "rb").read() == data, f"'{name}' copied incorrectly"
+        assert not os.path.samefile(name, target), f"'{name}' linked in copy mode"
+        assert result[target]["size"] == len(data), f"wrong size for '{name}'"
+        assert (
+            result[target]["sha256"] == hashlib.sha256(data).hexdigest()
+        ), f"wrong hash for '{name}'"
+        assert result[target]["method"] in ["copy", "reflink"]
+
+    files = [(name, os.path.join("link", name)) for name in contents]
+    result = transfer_files(files, mode="link", chunk_size=3000)
+    for name in contents:
+        target = os.path.join("link", name)
+        assert os.path.samefile(name, target), f"'{name}' not linked in link mode"
+        assert result[target]["method"] == "link"
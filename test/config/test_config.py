@@ -251,6 +251,59 @@ def test_with_increment():
     ), "_with_increment not properly working as a filter"
 
 
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables()
+def test_with_increment_cache(monkeypatch: pytest.MonkeyPatch):
+    from openlane.config import Config, Variable
+
+    step_variables = config.flow_common_variables + [
+        Variable(
+            "STEP1_VAR",
+            int,
+            description="x",
+        )
+    ]
+
+    cfg, _ = Config.load(
+        {
+            "DESIGN_NAME": "whatever",
+            "VERILOG_FILES": "dir::src/*.v",
+            "STEP1_VAR": 3,
+        },
+        step_variables,
+        design_dir="/cwd",
+        pdk="dummy",
+        scl="dummy_scl",
+        pdk_root="/pdk",
+    )
+
+    validations = []
+    validate = Config._Config__validate_increment
+
+    def counting_validate(self, *args, **kwargs):
+        validations.append(args)
+        return validate(self, *args, **kwargs)
+
+    monkeypatch.setattr(Config, "_Config__validate_increment", counting_validate)
+
+    first = cfg.with_increment(step_variables, {}, True)
+    second = cfg.with_increment(step_variables, {}, True)
+    assert len(validations) == 1, "Identical increment validated more than once"
+    assert first == second, "Memoized increment differs from the original"
+    assert first is not second, "Memoized increment returned as the same object"
+
+    overridden = cfg.with_increment(step_variables, {"STEP1_VAR": 5}, True)
+    assert len(validations) == 2, "Increment with different inputs not validated"
+    assert overridden["STEP1_VAR"] == 5, "Inputs of increment not applied"
+
+    cfg.copy().with_increment(step_variables, {}, True)
+    assert len(validations) == 3, "Increment of a different config not validated"
+
+    Config.clear_increment_cache()
+    cfg.with_increment(step_variables, {}, True)
+    assert len(validations) == 4, "Increment validated despite cleared cache"
+
+
 @pytest.mark.usefixtures("_mock_conf_fs")
 @mock_variables()
 def test_automatic_conversion():
@@ -0,0 +1,99 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+def test_pdk_cache(monkeypatch: pytest.MonkeyPatch):
+    from openlane.common import TclUtils
+    from openlane.config.pdk_cache import load_pdk_env, PDK_CACHE_ENV_VAR
+
+    evaluations = []
+    eval_env = TclUtils._eval_env
+
+    def counting_eval_env(env_in, tcl_in, **kwargs):
+        evaluations.append(tcl_in)
+        return eval_env(env_in, tcl_in, **kwargs)
+
+    monkeypatch.setattr(TclUtils, "_eval_env", counting_eval_env)
+
+    env, scl = load_pdk_env("/pdk", "dummy", None)
+    assert scl == "dummy_scl", "Default SCL not loaded"
+    assert len(evaluations) == 2, "PDK and SCL configuration files not evaluated"
+
+    cached_env, cached_scl = load_pdk_env("/pdk", "dummy", None)
+    assert len(evaluations) == 2, "Cached PDK configuration evaluated again"
+    assert (cached_env, cached_scl) == (env, scl), "Cached configuration differs"
+
+    with open("/pdk/dummy/libs.tech/openlane/dummy_scl/config.tcl", "w") as f:
+        f.write('set ::env(EXTRA_VAR) "1"\n')
+    env, _ = load_pdk_env("/pdk", "dummy", None)
+    assert len(evaluations) == 4, "Modified SCL configuration not evaluated"
+    assert env["EXTRA_VAR"] == "1", "Stale SCL configuration loaded"
+
+    load_pdk_env("/pdk", "dummy2", None)
+    assert len(evaluations) == 6, "Configuration of a different PDK not evaluated"
+
+    monkeypatch.setenv(PDK_CACHE_ENV_VAR, "0")
+    load_pdk_env("/pdk", "dummy", None)
+    assert len(evaluations) == 8, "PDK configuration cached despite being disabled"
+
+
+# Tcl reads the real filesystem, so sourced files cannot be faked
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_pdk_cache_dependencies(monkeypatch: pytest.MonkeyPatch):
+    import os
+    from openlane.common import TclUtils
+    from openlane.config.pdk_cache import load_pdk_env
+
+    evaluations = []
+    eval_env = TclUtils._eval_env
+
+    def counting_eval_env(env_in, tcl_in, **kwargs):
+        evaluations.append(tcl_in)
+        return eval_env(env_in, tcl_in, **kwargs)
+
+    monkeypatch.setattr(TclUtils, "_eval_env", counting_eval_env)
+
+    pdk_root = os.path.abspath("pdk")
+    pdk_dir = os.path.join(pdk_root, "dummy", "libs.tech", "openlane")
+    scl_dir = os.path.join(pdk_dir, "dummy_scl")
+    os.makedirs(scl_dir)
+    extra_path = os.path.join(pdk_root, "extra.tcl")
+    with open(os.path.join(pdk_dir, "config.tcl"), "w") as f:
+        f.write('set ::env(STD_CELL_LIBRARY) "dummy_scl"\n')
+    with open(os.path.join(scl_dir, "config.tcl"), "w") as f:
+        f.write(f"source {extra_path}\n")
+        f.write("set ::env(EXTRA_VAR) $extra\n")
+
+    with open(extra_path, "w") as f:
+        f.write('set extra "1"\n')
+    env, _ = load_pdk_env(pdk_root, "dummy", None)
+    assert env["EXTRA_VAR"] == "1", "Sourced file not evaluated"
+    assert len(evaluations) == 2, "PDK and SCL configuration files not evaluated"
+
+    with open(extra_path, "w") as f:
+        f.write("set extra $::env(PDK_CACHE_TEST_VAR)\n")
+    monkeypatch.setenv("PDK_CACHE_TEST_VAR", "2")
+    env, _ = load_pdk_env(pdk_root, "dummy", None)
+    assert len(evaluations) == 4, "Modified sourced file not evaluated"
+    assert env["EXTRA_VAR"] == "2", "Stale sourced file loaded"
+
+    load_pdk_env(pdk_root, "dummy", None)
+    assert len(evaluations) == 4, "Cached PDK configuration evaluated again"
+
+    monkeypatch.setenv("PDK_CACHE_TEST_VAR", "3")
+    env, _ = load_pdk_env(pdk_root, "dummy", None)
+    assert len(evaluations) == 6, "Modified environment variable not evaluated"
+    assert env["EXTRA_VAR"] == "3", "Stale environment variable loaded"
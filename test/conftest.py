@@ -13,17 +13,30 @@
 # limitations under the License.
 import os
 import tempfile
-from shutil import rmtree
-from unittest import mock
-from decimal import Decimal
-from typing import Any, Literal, Optional, Iterable, Callable, List, Dict
 
-import pytest
-from pyfakefs.fake_filesystem_unittest import Patcher
-from _pytest.fixtures import SubRequest
+# OpenLane's caches are written to a temporary directory instead of the user's.
+# Set before OpenLane is imported, as the paths of some caches are resolved on
+# import.
+TEST_CACHE_HOME = tempfile.mkdtemp(prefix="openlane_test_cache_")
+os.environ["XDG_CACHE_HOME"] = TEST_CACHE_HOME
 
-from openlane.config import Variable, Macro
-from openlane.common import Path, GenericDict
+from shutil import rmtree  # noqa: E402
+from unittest import mock  # noqa: E402
+from decimal import Decimal  # noqa: E402
+from typing import Any, Literal, Optional, Iterable, Callable, List, Dict  # noqa: E402
+
+import pytest  # noqa: E402
+from pyfakefs.fake_filesystem_unittest import Patcher  # noqa: E402
+from _pytest.fixtures import SubRequest  # noqa: E402
+
+from openlane.config import Variable, Macro  # noqa: E402
+from openlane.common import Path, GenericDict  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _test_cache_home():
+    yield TEST_CACHE_HOME
+    rmtree(TEST_CACHE_HOME, ignore_errors=True)
 
 
 def pytest_assertrepr_compare(op, left, right):
@@ -294,6 +307,9 @@ class MockProgress(object):
     def add_task(self, *args):
         self.add_task_called_count += 1
 
+    def remove_task(self, *args):
+        pass
+
     def start(self):
         self.start_called_count += 1
 
@@ -336,3 +352,4 @@ def pytest_addoption(parser):
     parser.addoption("--step-rx", action="store", default="^$")
     parser.addoption("--pdk-root", action="store", default=None)
     parser.addoption("--keep-tmp", action="store_true", default=False)
+    parser.addoption("--benchmark", action="store_true", default=False)
@@ -0,0 +1,94 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import csv
+import json
+
+import pytest
+
+from openlane.flows import flow as flow_module, sequential as sequential_flow_module
+from openlane.steps import step as step_module
+
+mock_variables = pytest.mock_variables
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([flow_module, sequential_flow_module, step_module])
+def test_run_batch():
+    from openlane.steps import Step
+    from openlane.flows import Flow, SequentialFlow, run_batch
+
+    toolboxes = set()
+
+    class DesignNameWriter(Step):
+        id = "Test.DesignNameWriter"
+        inputs = []
+        outputs = []
+
+        def run(self, state_in, **kwargs):
+            toolboxes.add(id(self.toolbox))
+            return {}, {"name": self.config["DESIGN_NAME"]}
+
+    @Flow.factory.register()
+    class BatchTestFlow(SequentialFlow):
+        Steps = [DesignNameWriter]
+
+    config_files = []
+    for design in ["spm", "xor", "broken"]:
+        design_dir = os.path.join("/cwd", design)
+        os.makedirs(os.path.join(design_dir, "src"))
+        with open(os.path.join(design_dir, "src", "top.v"), "w") as f:
+            f.write("")
+        config = {
+            "DESIGN_NAME": design,
+            "VERILOG_FILES": "dir::src/top.v",
+        }
+        if design == "broken":
+            del config["VERILOG_FILES"]
+        config_file = os.path.join(design_dir, "config.json")
+        with open(config_file, "w") as f:
+            json.dump(config, f)
+        config_files.append(config_file)
+
+    results = run_batch(
+        config_files,
+        flow_name="BatchTestFlow",
+        pdk="dummy",
+        scl="dummy_scl",
+        pdk_root="/pdk",
+        tag="nightly",
+        batch_dir="/cwd/batch",
+        max_designs=2,
+    )
+
+    assert [result.success for result in results] == [
+        True,
+        True,
+        False,
+    ], "unexpected batch outcome"
+    assert (
+        results[2].error is not None and "VERILOG_FILES" in results[2].error
+    ), "invalid configuration not reported"
+    assert results[0].run_dir == os.path.join(
+        "/cwd", "spm", "runs", "nightly"
+    ), "run directory does not use the batch tag"
+    assert len(toolboxes) == 1, "toolbox not shared between designs"
+
+    with open("/cwd/batch/metrics.csv", encoding="utf8") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["design"], row["status"], row["name"]) for row in rows] == [
+        ("spm", "success", "spm"),
+        ("xor", "success", "xor"),
+        ("", "failed", ""),
+    ], "aggregate metrics table has unexpected contents"
@@ -85,26 +85,28 @@ def test_log_level_flag(caplog: pytest.LogCaptureFixture):
     caplog.clear()
 
 
-def test_worker_count_cb():
+def test_resource_cbs():
     import click
 
     from openlane.flows import cloup_flow_opts
-    from openlane.common import get_tpe, set_tpe
+    from openlane.common import get_scheduler, set_scheduler, ResourceScheduler
 
     @click.command()
     @cloup_flow_opts(volare_by_default=False)
     def cli_fn(**kwargs):
         return kwargs
 
-    tpe_backup = get_tpe()
+    scheduler_backup = get_scheduler()
+    set_scheduler(ResourceScheduler())
 
     cli_fn(
-        ["-j", "3"],
+        ["-j", "3", "--max-memory", "2G"],
         standalone_mode=False,
     )
-    assert get_tpe()._max_workers == 3, "--jobs callback failed"
+    assert get_scheduler().max_cpus == 3, "--max-cpus callback failed"
+    assert get_scheduler().max_memory == 2 * 1024**3, "--max-memory callback failed"
 
-    set_tpe(tpe_backup)
+    set_scheduler(scheduler_backup)
 
 
 def test_initial_state(fs: FakeFilesystem, caplog: pytest.LogCaptureFixture):
@@ -162,3 +164,31 @@ def test_initial_state(fs: FakeFilesystem, caplog: pytest.LogCaptureFixture):
         "is not a dictionary" in caplog.text
     ), "Non-dictionary JSON file did not report an error"
     caplog.clear()
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_lazy_imports():
+    import os
+    import sys
+    import subprocess
+
+    env = os.environ.copy()
+    env["XDG_CACHE_HOME"] = os.getcwd()
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+
+    script = "import sys, openlane.flows; print(' '.join(sys.modules))"
+    modules = set(
+        subprocess.check_output([sys.executable, "-c", script], env=env)
+        .decode("utf8")
+        .split()
+    )
+    for module in [
+        "openlane.flows.classic",
+        "openlane.steps.openroad",
+        "tkinter",
+        "requests",
+    ]:
+        assert module not in modules, f"{module} imported eagerly by openlane.flows"
+    assert not any(
+        module.startswith("openlane_plugin_") for module in modules
+    ), "Plugins imported eagerly by openlane.flows"
@@ -0,0 +1,138 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+
+def make_profile(id, start_time, end_time, peak_memory_rss=1024):
+    return (
+        {
+            "id": id,
+            "name": id,
+            "start_time": start_time,
+            "end_time": end_time,
+            "cache_hit": False,
+            "subprocesses": [
+                {
+                    "command": "openroad",
+                    "log": f"{id}.log",
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "returncode": 0,
+                    "cpu_time_user": end_time - start_time,
+                    "cpu_time_system": 0.0,
+                    "peak_memory_rss": peak_memory_rss,
+                    "avg_memory_rss": peak_memory_rss / 2,
+                    "read_bytes": 10,
+                    "write_bytes": 20,
+                }
+            ],
+        },
+        f"/run/{id}",
+    )
+
+
+@pytest.fixture()
+def profiles():
+    # A forks into B and C, which both join into D. C takes longer than B.
+    return [
+        make_profile("A", 0.0, 10.0),
+        make_profile("B", 10.0, 15.0),
+        make_profile("C", 10.0, 40.0),
+        make_profile("D", 40.0, 50.0),
+    ]
+
+
+def test_report(profiles):
+    from openlane.flows.profiling import create_profile_report
+
+    report = create_profile_report(profiles)
+
+    assert report["wall_time"] == 50.0, "Wrong flow wall time"
+    assert report["cpu_time"] == 55.0, "Wrong flow CPU time"
+    assert report["critical_path"] == [
+        "A",
+        "C",
+        "D",
+    ], "Wrong critical path"
+    assert report["critical_path_time"] == 50.0, "Wrong critical path time"
+    assert [step["critical"] for step in report["steps"]] == [
+        True,
+        False,
+        True,
+        True,
+    ], "Critical steps not marked"
+    step_c = report["steps"][2]
+    assert step_c["peak_memory_rss"] == 1024, "Wrong step peak memory"
+    assert step_c["avg_memory_rss"] == 512, "Wrong step average memory"
+    assert step_c["write_bytes"] == 20, "Wrong step I/O"
+    assert step_c["subprocesses"][0]["wall_time"] == 30.0, "Wrong subprocess time"
+
+
+def test_chrome_trace(profiles):
+    from openlane.flows.profiling import create_profile_report, to_chrome_trace
+
+    trace = to_chrome_trace(create_profile_report(profiles))
+    steps = {
+        event["name"]: event for event in trace["traceEvents"] if event["cat"] == "step"
+    }
+    assert steps["C"]["ts"] == 10e6, "Wrong event timestamp"
+    assert steps["C"]["dur"] == 30e6, "Wrong event duration"
+    assert (
+        steps["B"]["tid"] != steps["C"]["tid"]
+    ), "Concurrent steps were placed on the same row"
+    assert steps["D"]["tid"] == steps["A"]["tid"], "Free row was not reused"
+    assert steps["C"].get("cname") == "bad", "Critical step not highlighted"
+    assert "cname" not in steps["B"], "Non-critical step highlighted"
+    assert len(trace["traceEvents"]) == 8, "Subprocesses were not added to the timeline"
+
+
+def test_regressions(profiles):
+    from openlane.flows.profiling import create_profile_report
+
+    baseline = create_profile_report(profiles)
+    current = [
+        make_profile("A", 0.0, 10.5),  # Within threshold
+        make_profile("B", 10.5, 16.0, peak_memory_rss=1024**3),
+        make_profile("C", 10.5, 60.0),
+        make_profile("D", 60.0, 70.0),
+    ]
+    report = create_profile_report(current, baseline)
+
+    regressions = {(r["step"], r["metric"]) for r in report["regressions"]}
+    assert regressions == {
+        ("B", "peak_memory_rss"),
+        ("C", "wall_time"),
+        ("C", "cpu_time"),
+    }, "Wrong regressions flagged"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_baseline_from_steps(profiles):
+    import os
+    import json
+    from openlane.flows.profiling import load_profile_report
+
+    for profile, step_dir in profiles:
+        step_dir = os.path.join("baseline", f"1-{profile['id']}")
+        os.makedirs(step_dir)
+        with open(os.path.join(step_dir, "profile.json"), "w") as f:
+            json.dump(profile, f)
+
+    report = load_profile_report("baseline")
+    assert [step["id"] for step in report["steps"]] == [
+        "A",
+        "B",
+        "C",
+        "D",
+    ], "Report of unfinished baseline run not created from step profiles"
@@ -11,6 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+import json
 from typing import Type
 
 import pytest
@@ -76,6 +78,13 @@ def test_sequential_flow(MetricIncrementer: Type[Step]):
     state = flow.start()
     assert state.metrics["counter"] == 4, "SequentialFlow did not run properly"
 
+    assert flow.run_dir is not None
+    with open(os.path.join(flow.run_dir, "profile.json"), encoding="utf8") as f:
+        report = json.load(f)
+    assert (
+        len(report["critical_path"]) == 4
+    ), "Not every step of a sequential flow is on its critical path"
+
 
 @pytest.mark.usefixtures("_mock_conf_fs")
 @mock_variables([flow_module, sequential_flow_module, step_module])
@@ -348,3 +357,191 @@ def test_gating_validation(MetricIncrementer):
 
         class _Test2(Dummy):
             gating_config_vars = {"Test.MetricIncrementer": ["BAD_GATING_VARIABLE"]}
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([flow_module, sequential_flow_module, step_module])
+def test_parallel():
+    import time
+    import threading
+    from openlane.common import Path
+    from openlane.common import slugify
+    from openlane.flows import SequentialFlow
+    from openlane.state import DesignFormat, State
+
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    class ViewWriter(Step):
+        id = "Test.ViewWriter"
+        inputs = []
+        outputs = [DesignFormat.NETLIST]
+        reads_metrics = False
+        shared = "changed"
+
+        def run(self, state_in, **kwargs):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(running, max_running)
+            time.sleep(0.1)
+            with lock:
+                running -= 1
+            out = os.path.join(self.step_dir, "out.nl.v")
+            with open(out, "w") as f:
+                f.write(self.id)
+            return {self.outputs[0]: Path(out)}, {
+                "writer": self.id,
+                "shared": self.shared,
+            }
+
+    class OtherViewWriter(ViewWriter):
+        id = "Test.OtherViewWriter"
+        outputs = [DesignFormat.POWERED_NETLIST]
+        # Equal to the value in its input state
+        shared = "initial"
+
+    class ViewReader(Step):
+        id = "Test.ViewReader"
+        inputs = [DesignFormat.NETLIST]
+        outputs = []
+        reads_metrics = False
+
+        def run(self, state_in, **kwargs):
+            netlist = open(state_in[DesignFormat.NETLIST]).read()
+            return {}, {"netlist_writer": netlist}
+
+    class Dummy(SequentialFlow):
+        Steps = [ViewWriter, OtherViewWriter, ViewReader]
+
+    dependencies = [
+        [Dummy.depends_on(step, earlier) for earlier in Dummy.Steps[:i]]
+        for i, step in enumerate(Dummy.Steps)
+    ]
+    assert dependencies == [
+        [],
+        [False],
+        [True, False],
+    ], "dependency graph built incorrectly"
+
+    flow = Dummy(
+        {
+            "DESIGN_NAME": "WHATEVER",
+            "VERILOG_FILES": ["/cwd/src/a.v"],
+        },
+        design_dir="/cwd",
+        pdk="dummy",
+        scl="dummy_scl",
+        pdk_root="/pdk",
+    )
+    state = flow.start(
+        parallel=True,
+        with_initial_state=State(metrics={"shared": "initial"}),
+    )
+
+    assert max_running == 2, "independent steps did not run concurrently"
+    assert (
+        state.metrics["netlist_writer"] == "Test.ViewWriter"
+    ), "dependent step did not receive the output of its dependency"
+    assert (
+        state.metrics["writer"] == "Test.OtherViewWriter"
+    ), "metrics were not merged in the declared order"
+    assert (
+        state[DesignFormat.NETLIST] is not None
+        and state[DesignFormat.POWERED_NETLIST] is not None
+    ), "views of concurrent steps were not merged"
+    assert (
+        state.metrics["shared"] == "initial"
+    ), "metric equal to the step's input was overridden by an earlier step"
+    assert sorted(
+        entry for entry in os.listdir(flow.run_dir) if entry[0].isdigit()
+    ) == [
+        f"{i + 1}-{slugify(step.id)}" for i, step in enumerate(Dummy.Steps)
+    ], "step directories not numbered in the declared order"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([flow_module, sequential_flow_module, step_module])
+def test_incremental():
+    from openlane.common import Path
+    from openlane.config import Variable
+    from openlane.flows import SequentialFlow
+    from openlane.state import DesignFormat
+
+    runs = []
+
+    class ViewWriter(Step):
+        id = "Test.ViewWriter"
+        inputs = []
+        outputs = [DesignFormat.NETLIST]
+
+        def run(self, state_in, **kwargs):
+            runs.append(self.id)
+            out = os.path.join(self.step_dir, "out.nl.v")
+            with open(out, "w") as f:
+                f.write(self.id)
+            return {self.outputs[0]: Path(out)}, {}
+
+    class ViewReader(Step):
+        id = "Test.ViewReader"
+        inputs = [DesignFormat.NETLIST]
+        outputs = []
+        config_vars = [
+            Variable("TEST_READER_SETTING", int, description="x", default=0),
+        ]
+
+        def run(self, state_in, **kwargs):
+            runs.append(self.id)
+            netlist = open(state_in[DesignFormat.NETLIST]).read()
+            return {}, {
+                "netlist": netlist,
+                "setting": self.config["TEST_READER_SETTING"],
+            }
+
+    class Dummy(SequentialFlow):
+        Steps = [ViewWriter, ViewReader]
+
+    def start(setting: int, **kwargs):
+        flow = Dummy(
+            {
+                "DESIGN_NAME": "WHATEVER",
+                "VERILOG_FILES": ["/cwd/src/a.v"],
+                "TEST_READER_SETTING": setting,
+            },
+            design_dir="/cwd",
+            pdk="dummy",
+            scl="dummy_scl",
+            pdk_root="/pdk",
+        )
+        return flow.start(tag="incremental", **kwargs)
+
+    start(0)
+    assert runs == ["Test.ViewWriter", "Test.ViewReader"], "initial run incomplete"
+
+    runs.clear()
+    state = start(1, incremental=True)
+    assert runs == [
+        "Test.ViewReader"
+    ], "steps before the changed configuration variable were not reused"
+    assert state.metrics["setting"] == 1, "changed step did not use the new config"
+
+    runs.clear()
+    start(1, incremental=True)
+    assert runs == [], "unchanged steps were run again"
+
+    with open(state[DesignFormat.NETLIST], "w") as f:
+        f.write("modified")
+
+    runs.clear()
+    state = start(1, incremental=True)
+    assert runs == [
+        "Test.ViewReader"
+    ], "step with a modified input file was not run again"
+    assert state.metrics["netlist"] == "modified", "modified input file was not read"
+
+    runs.clear()
+    state = start(2, incremental=True, parallel=True)
+    assert runs == ["Test.ViewReader"], "steps were not reused when running in parallel"
+    assert state.metrics["setting"] == 2, "changed step did not run in parallel"
+    assert state.metrics["netlist"] == "modified", "reused state not passed on"
@@ -221,6 +221,15 @@ def test_save():
     f.close()
     assert save_spef_contents == test_file_contents
 
+    manifest = json.load(open(os.path.join(save_path, "manifest.json")))
+    assert set(manifest["files"]) == {
+        os.path.join("nl", test_file),
+        os.path.join("spef", "nom", test_file),
+    }, "manifest does not list all views"
+    assert manifest["files"][os.path.join("nl", test_file)]["size"] == len(
+        test_file_contents
+    ), "manifest lists the wrong size"
+
 
 @pytest.mark.usefixtures("_mock_fs")
 def test_loads():
@@ -238,3 +247,126 @@ def test_loads():
 
     new_state = State.loads(json.dumps(state.to_raw_dict()))
     assert new_state.to_raw_dict() == state.to_raw_dict()
+
+
+@pytest.mark.usefixtures("_mock_fs")
+def test_lazy_views():
+    from unittest import mock
+    from openlane.state import (
+        State,
+        DesignFormat,
+        defer_view,
+        is_lazy_view,
+        register_materializer,
+    )
+    from openlane.state import lazy
+    from openlane.common import Path
+
+    with open("test.odb", "w") as f:
+        f.write("layout\n")
+
+    calls = []
+    with mock.patch.dict(lazy._materializers, clear=True):
+
+        @register_materializer(DesignFormat.ODB, DesignFormat.DEF)
+        def odb_to_def(source, target):
+            calls.append(source)
+            with open(source) as i, open(target, "w") as o:
+                o.write(f"def of {i.read()}")
+
+        defer_view(
+            os.path.abspath("test.def"),
+            DesignFormat.DEF,
+            os.path.abspath("test.odb"),
+            DesignFormat.ODB,
+        )
+        assert is_lazy_view("test.def"), "view not recorded as lazy"
+
+        state = State(
+            {DesignFormat.ODB: Path("test.odb"), DesignFormat.DEF: Path("test.def")}
+        )
+        state.validate()
+        loaded = State.loads(state.dumps())
+        assert not os.path.exists("test.def"), "lazy view materialized too early"
+
+        loaded.save_snapshot("out")
+        assert (
+            open(os.path.join("out", "def", "test.def")).read() == "def of layout\n"
+        ), "lazy view not materialized for the snapshot"
+        assert not is_lazy_view("test.def"), "lazy view not recorded as materialized"
+
+        state.materialize()
+        assert len(calls) == 1, "lazy view materialized more than once"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_compressed_views():
+    from openlane.state import State, DesignFormat, compress_views, decompress_views
+    from openlane.common import Path
+
+    contents = {
+        "a/test.def": "DESIGN test ;\nEND DESIGN\n",
+        "a/test.odb": "not compressible",
+        "a/nom.spef": "*SPEF nom\n",
+        "b/test.def": "DESIGN test ;\nEND DESIGN\n",
+    }
+    for path, data in contents.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(data)
+
+    views = compress_views(
+        {
+            DesignFormat.DEF: Path(os.path.abspath("a/test.def")),
+            DesignFormat.ODB: Path(os.path.abspath("a/test.odb")),
+            DesignFormat.SPEF: {"nom": Path(os.path.abspath("a/nom.spef"))},
+        },
+        "a",
+    )
+    assert views[DesignFormat.DEF] == os.path.abspath("a/test.def.gz")
+    assert views[DesignFormat.ODB] == os.path.abspath(
+        "a/test.odb"
+    ), "incompressible view compressed"
+    assert views[DesignFormat.SPEF] == {"nom": os.path.abspath("a/nom.spef.gz")}
+    assert not os.path.exists("a/test.def"), "uncompressed view not removed"
+    compress_views({DesignFormat.DEF: Path(os.path.abspath("b/test.def"))}, "b")
+    assert (
+        open("a/test.def.gz", "rb").read() == open("b/test.def.gz", "rb").read()
+    ), "compression not deterministic"
+
+    state = State(views)
+    state.validate()
+    decompressed, originals = decompress_views(
+        state, [DesignFormat.DEF, DesignFormat.SPEF], os.path.abspath("tmp")
+    )
+    assert decompressed[DesignFormat.ODB] == state[DesignFormat.ODB]
+    assert (
+        open(decompressed[DesignFormat.DEF]).read() == contents["a/test.def"]
+    ), "view decompressed incorrectly"
+    assert (
+        open(decompressed[DesignFormat.SPEF]["nom"]).read() == contents["a/nom.spef"]
+    ), "nested view decompressed incorrectly"
+    assert originals[decompressed[DesignFormat.DEF]] == state[DesignFormat.DEF]
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_compressed_views_ratio():
+    from openlane.state import DesignFormat, compress_views
+    from openlane.common import Path
+
+    with open("test.spef", "w") as f:
+        f.write('*SPEF "IEEE 1481-1998"\n*DESIGN "test"\n')
+        for i in range(2000):
+            f.write(
+                f"*D_NET net{i} 0.0{i % 97}\n*CONN\n*I _{i}_:A I *L 0.00{i % 13}\n"
+                f"*CAP\n1 _{i}_:A 0.000{i % 89}\n*RES\n1 _{i}_:A _{i + 1}_:Y 0.{i % 7}\n"
+                "*END\n\n"
+            )
+    size = os.path.getsize("test.spef")
+
+    views = compress_views(
+        {DesignFormat.SPEF: {"nom": Path(os.path.abspath("test.spef"))}}, "."
+    )
+    compressed_size = os.path.getsize(views[DesignFormat.SPEF]["nom"])
+
+    assert compressed_size * 3 < size, "unexpectedly poor compression ratio"
@@ -0,0 +1,62 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+
+import pytest
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_object_store():
+    from openlane.common import Path
+    from openlane.state import State, DesignFormat
+    from openlane.steps.object_store import ObjectStore
+
+    files = {
+        os.path.join("run", "1-a", "a.nl.v"): "same",
+        os.path.join("run", "2-b", "b.nl.v"): "same",
+        os.path.join("run", "2-b", "b.sdc"): "unique",
+    }
+    for path, contents in files.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf8") as f:
+            f.write(contents)
+
+    assert ObjectStore.find(os.path.join("run", "1-a")) is None
+    ObjectStore.create("run")
+    store = ObjectStore.find(os.path.join("run", "1-a"))
+    assert store is not None, "object store not found from step directory"
+
+    a_views = {DesignFormat.NETLIST: Path(os.path.abspath("run/1-a/a.nl.v"))}
+    b_views = {
+        DesignFormat.NETLIST: Path(os.path.abspath("run/2-b/b.nl.v")),
+        DesignFormat.SDC: Path(os.path.abspath("run/2-b/b.sdc")),
+    }
+    assert store.put_views("run/1-a", a_views) == 0, "unique view deduplicated"
+    assert store.put_views("run/2-b", b_views) == len("same"), "view not deduplicated"
+    assert os.path.samefile("run/1-a/a.nl.v", "run/2-b/b.nl.v"), "views not linked"
+    assert (
+        open("run/2-b/b.nl.v", encoding="utf8").read() == "same"
+    ), "deduplicated view corrupted"
+    assert len(os.listdir(store.path)) == 2, "unexpected number of objects"
+
+    with open("run/1-a/state_out.json", "w", encoding="utf8") as f:
+        f.write(State(a_views).dumps())
+
+    removed, freed = store.collect_garbage()
+    assert removed == 1, "unreferenced object not removed"
+    assert freed == 0, "contents still linked from a step directory counted as freed"
+    assert os.path.exists("run/2-b/b.sdc"), "view removed with its object"
+    assert (
+        store.collect_garbage()[0] == 0
+    ), "object referenced by a state_out.json removed"
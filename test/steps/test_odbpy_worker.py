@@ -0,0 +1,263 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+import json
+import textwrap
+from typing import Optional
+
+import pytest
+
+from openlane.steps import step
+
+mock_variables = pytest.mock_variables
+
+# Stand-ins for OpenROAD and its Python modules: the "database" is an integer
+# stored in a file
+FAKE_OPENROAD = f"""#!{sys.executable}
+import sys
+import runpy
+
+index = sys.argv.index("-python")
+sys.argv = sys.argv[index + 1 :]
+runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+FAKE_UTL = """
+def metric_integer(name, value):
+    raise RuntimeError("no metrics file")
+"""
+
+FAKE_READER = """
+import os
+
+state = {"value": None}
+
+
+class OdbReader(object):
+    def __init__(self, *args, **kwargs):
+        if len(args) == 1:
+            state["value"] = int(open(args[0]).read())
+            with open(os.environ["LOADS_LOG"], "a") as f:
+                f.write(args[0] + "\\n")
+
+
+write_fn = {
+    "odb": lambda reader, file: file and open(file, "w").write(str(state["value"])),
+}
+"""
+
+INCREMENT_SCRIPT = """
+import sys
+import utl
+import reader
+
+input_odb, output_odb = sys.argv[1:3]
+odb_reader = reader.OdbReader(input_odb)
+if "--fail" in sys.argv:
+    print("failing")
+    sys.exit(2)
+reader.state["value"] += 1
+reader.write_fn["odb"](odb_reader, output_odb)
+utl.metric_integer("value", reader.state["value"])
+print("done")
+"""
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_odbpy_worker_pool():
+    from openlane.steps.odbpy_worker import OdbpyWorkerPool
+
+    os.mkdir("bin")
+    os.mkdir("modules")
+    files = {
+        "bin/openroad": FAKE_OPENROAD,
+        "modules/utl.py": FAKE_UTL,
+        "modules/reader.py": FAKE_READER,
+        "increment.py": INCREMENT_SCRIPT,
+        "0.odb": "0",
+    }
+    for path, contents in files.items():
+        with open(path, "w", encoding="utf8") as f:
+            f.write(textwrap.dedent(contents).lstrip())
+    os.chmod("bin/openroad", 0o755)
+
+    env = {
+        "PATH": f"{os.path.abspath('bin')}:{os.environ['PATH']}",
+        "PYTHONPATH": os.path.abspath("modules"),
+        "LOADS_LOG": os.path.abspath("loads.log"),
+    }
+
+    def get_loads():
+        if not os.path.exists("loads.log"):
+            return []
+        return open("loads.log", encoding="utf8").read().split()
+
+    pool = OdbpyWorkerPool(max_idle=1)
+    try:
+        workers = []
+        for i in range(2):
+            with pool.acquire(f"{i}.odb", env) as worker:
+                workers.append(worker)
+                returncode = worker.run(
+                    os.path.abspath("increment.py"),
+                    [f"{i}.odb", f"{i + 1}.odb"],
+                    env,
+                    f"{i}.log",
+                    f"{i}.metrics.json",
+                    f"{i + 1}.odb",
+                )
+            assert returncode == 0, "script failed in worker"
+            assert (
+                "done" in open(f"{i}.log", encoding="utf8").read()
+            ), "log not captured"
+            assert json.load(open(f"{i}.metrics.json", encoding="utf8")) == {
+                "value": i + 1
+            }, "metrics not captured"
+
+        assert workers[0] is workers[1], "worker not reused for its own output"
+        assert get_loads() == ["0.odb"], "resident database was loaded again"
+        assert open("2.odb", encoding="utf8").read() == "2", "wrong output"
+
+        with pool.acquire("0.odb", env) as worker:
+            assert worker is not workers[0], "worker reused for a foreign input"
+            returncode = worker.run(
+                os.path.abspath("increment.py"),
+                ["0.odb", "other.odb", "--fail"],
+                env,
+                "fail.log",
+                "fail.metrics.json",
+                "other.odb",
+            )
+        assert returncode == 2, "exit code of failing script not returned"
+        assert not worker.alive, "worker kept running after a failure"
+
+        with pool.acquire("2.odb", env) as worker:
+            assert worker is workers[0], "idle worker not reused"
+            returncode = worker.run(
+                os.path.abspath("increment.py"),
+                ["0.odb", "other.odb"],
+                env,
+                "restart.log",
+                "restart.metrics.json",
+                "other.odb",
+            )
+        assert returncode is None, "worker did not request a restart"
+        assert not worker.alive, "worker kept running after requesting a restart"
+    finally:
+        pool.close()
+
+
+STEP_SCRIPT = """
+import sys
+import reader
+
+output_odb = sys.argv[sys.argv.index("--output-odb") + 1]
+odb_reader = reader.OdbReader(sys.argv[-1])
+reader.state["value"] += 1
+reader.write_fn["odb"](odb_reader, output_odb)
+print(f"%OL_METRIC_I value {reader.state['value']}")
+"""
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@pytest.mark.parametrize("memory_limit", [None, "8"])
+@mock_variables([step])
+def test_odbpy_step_worker(
+    monkeypatch: pytest.MonkeyPatch, memory_limit: Optional[str]
+):
+    from unittest import mock
+    from openlane.common import Path, get_scheduler
+    from decimal import Decimal
+    from openlane.config import Config, Variable
+    from openlane.state import DesignFormat, State
+    from openlane.steps.odb import OdbpyStep
+    from openlane.steps.odbpy_worker import ODBPY_WORKER_ENV_VAR
+
+    os.mkdir("bin")
+    os.mkdir("modules")
+    files = {
+        "bin/openroad": FAKE_OPENROAD,
+        "modules/utl.py": FAKE_UTL,
+        "modules/reader.py": FAKE_READER,
+        "script.py": STEP_SCRIPT,
+        "in.odb": "0",
+    }
+    for path, contents in files.items():
+        with open(path, "w", encoding="utf8") as f:
+            f.write(textwrap.dedent(contents).lstrip())
+    os.chmod("bin/openroad", 0o755)
+    monkeypatch.setenv("PATH", f"{os.path.abspath('bin')}:{os.environ['PATH']}")
+    monkeypatch.setenv("PYTHONPATH", os.path.abspath("modules"))
+    monkeypatch.setenv("LOADS_LOG", os.path.abspath("loads.log"))
+    monkeypatch.setenv(ODBPY_WORKER_ENV_VAR, "1")
+
+    class TestOdbpy(OdbpyStep):
+        id = "Test.Odbpy"
+        # Not among the mocked flow variables
+        config_vars = [Variable("STEP_MEMORY_LIMIT", Optional[Decimal], "x")]
+
+        def get_script_path(self):
+            return os.path.abspath("script.py")
+
+        def get_command(self):
+            return [
+                "openroad",
+                "-exit",
+                "-no_splash",
+                "-metrics",
+                os.path.join(self.step_dir, "or_metrics_out.json"),
+                "-python",
+                self.get_script_path(),
+            ]
+
+    config = Config(
+        {
+            "DESIGN_NAME": "whatever",
+            "DESIGN_DIR": os.getcwd(),
+            "EXAMPLE_PDK_VAR": "bla",
+            "PDK_ROOT": "/pdk",
+            "PDK": "dummy",
+            "STD_CELL_LIBRARY": "dummy_scl",
+            "VERILOG_FILES": ["/cwd/src/a.v"],
+            "GRT_REPAIR_ANTENNAS": True,
+            "RUN_HEURISTIC_DIODE_INSERTION": False,
+            "MACROS": None,
+            "DIODE_ON_PORTS": None,
+            "TECH_LEFS": {},
+            "DEFAULT_CORNER": "nom_tt_025C_1v80",
+            "STEP_MEMORY_LIMIT": memory_limit and Decimal(memory_limit),
+        }
+    )
+    test_step = TestOdbpy(
+        config=config,
+        state_in=State({DesignFormat.ODB: Path(os.path.abspath("in.odb"))}),
+        _no_revalidate_conf=True,
+    )
+
+    history = get_scheduler().history
+    with mock.patch.object(history, "record", wraps=history.record) as record:
+        state_out = test_step.start(step_dir=os.path.abspath("step"))
+
+    assert state_out.metrics["value"] == 1, "metrics of the script not processed"
+    assert (
+        open(state_out[DesignFormat.ODB], encoding="utf8").read() == "1"
+    ), "wrong output"
+    assert [call.args[0] for call in record.call_args_list] == [
+        test_step.get_resource_history_key(test_step.get_log_path())
+    ], "resource usage not recorded"
+    # Only subprocesses are profiled
+    assert (len(test_step.subprocess_stats) == 0) == (
+        memory_limit is None
+    ), "worker used despite a memory limit, or not used without one"
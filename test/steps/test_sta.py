@@ -0,0 +1,250 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import sys
+
+import pytest
+
+from openlane.steps import step
+
+mock_variables = pytest.mock_variables
+
+# Stand-in for OpenSTA running corner.tcl: one report, one metric and one SDF
+# file per corner
+FAKE_STA = """
+import os
+import shlex
+
+if "CURRENT_CORNERS_TIMING_VIEWS" in os.environ:
+    corners = shlex.split(os.environ["CURRENT_CORNERS_TIMING_VIEWS"])[::2]
+else:
+    corners = [os.environ["CURRENT_CORNER_NAME"]]
+
+for corner in corners:
+    prefix = f"{corner}/" if len(corners) > 1 else ""
+    print(f"%OL_CREATE_REPORT {prefix}checks.rpt")
+    print(corner)
+    print("%OL_END_REPORT")
+    print(f"%OL_CREATE_REPORT {prefix}max.rpt")
+    print("Startpoint: in (input port clocked by clk)")
+    print("Endpoint: out (output port clocked by clk)")
+    print("-" * 40)
+    print(f"  0.00  {len(corner)}.00 ^ in (in)")
+    print(f"  {len(corner)}.00   data arrival time")
+    print(f"  {len(corner)}.00   slack (MET)")
+    print("%OL_END_REPORT")
+    print(f"%OL_METRIC_F timing__setup__ws__corner:{corner} {len(corner)}")
+    sdf = os.path.join(os.environ["SDF_SAVE_DIR"], f"{os.environ['DESIGN_NAME']}__{corner}.sdf")
+    with open(sdf, "w") as f:
+        f.write(corner)
+"""
+
+
+def test_choose_sta_corner_mode():
+    from openlane.steps.openroad import choose_sta_corner_mode
+
+    gib = 1024 * 1024 * 1024
+    assert (
+        choose_sta_corner_mode(6, 16, 64 * gib, 4 * gib) == "parallel"
+    ), "Corners not analyzed in parallel despite sufficient resources"
+    assert (
+        choose_sta_corner_mode(6, 1, 64 * gib, 4 * gib) == "sequential"
+    ), "Corners analyzed in parallel without idle CPUs"
+    assert (
+        choose_sta_corner_mode(6, 16, 16 * gib, 4 * gib) == "sequential"
+    ), "Corners analyzed in parallel without enough memory"
+    assert (
+        choose_sta_corner_mode(6, 2, 16 * gib, 4 * gib) == "parallel"
+    ), "Memory of processes that cannot run concurrently counted"
+    assert (
+        choose_sta_corner_mode(1, 1, 0, 4 * gib) == "parallel"
+    ), "Single corner not analyzed on its own"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_sta_corner_modes():
+    from typing import List, Literal, Optional
+    from openlane.steps.openroad import STAStep
+    from openlane.config import Config, Variable
+    from openlane.state import DesignFormat, State
+    from openlane.common import TimingPaths
+
+    dir = os.getcwd()
+    with open("sta.py", "w", encoding="utf8") as f:
+        f.write(FAKE_STA)
+    corners = ["nom_tt_025C_1v80", "min_ss_100C_1v60"]
+
+    class TestSTA(STAStep):
+        id = "TestSTA"
+        inputs = []
+        outputs = [DesignFormat.SDF]
+        # Not among the mocked flow variables
+        config_vars = [
+            Variable("STA_CORNERS", List[str], "x"),
+            Variable(
+                "STA_CORNER_MODE",
+                Optional[Literal["parallel", "sequential"]],
+                "x",
+            ),
+        ]
+
+        def prepare_env(self, env, state):
+            env = env.copy()
+            env["DESIGN_NAME"] = self.config["DESIGN_NAME"]
+            return env
+
+        def get_corner_command(self, metrics_path):
+            return [sys.executable, os.path.join(dir, "sta.py")]
+
+        def get_corner_timing_views(self, corner):
+            return [f"/pdk/{corner}.lib"]
+
+        def process_corner(self, corner, corner_dir, env, state_in):
+            report = open(os.path.join(corner_dir, "checks.rpt")).read().strip()
+            return {f"checked__corner:{corner}": report == corner}
+
+    def run(mode):
+        config = Config(
+            {
+                "DESIGN_NAME": "whatever",
+                "DESIGN_DIR": dir,
+                "EXAMPLE_PDK_VAR": "bla",
+                "PDK_ROOT": "/pdk",
+                "PDK": "dummy",
+                "STD_CELL_LIBRARY": "dummy_scl",
+                "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+                "GRT_REPAIR_ANTENNAS": True,
+                "RUN_HEURISTIC_DIODE_INSERTION": False,
+                "MACROS": None,
+                "DIODE_ON_PORTS": None,
+                "TECH_LEFS": {
+                    "nom_*": "/pdk/dummy/libs.ref/techlef/dummy_scl/dummy_tech_lef.tlef"
+                },
+                "DEFAULT_CORNER": "nom_tt_025C_1v80",
+                "STEP_MEMORY_LIMIT": None,
+                "STEP_OOM_RETRIES": 2,
+                "STA_CORNERS": corners,
+                "STA_CORNER_MODE": mode,
+            }
+        )
+        sta_step = TestSTA(config=config, state_in=State(), _no_revalidate_conf=True)
+        step_dir = os.path.join(dir, mode)
+        state_out = sta_step.start(step_dir=step_dir)
+        return sta_step, step_dir, state_out
+
+    results = {}
+    for mode in ["parallel", "sequential"]:
+        sta_step, step_dir, state_out = run(mode)
+        for corner in corners:
+            assert state_out[DesignFormat.SDF][corner] == os.path.join(
+                step_dir, corner, f"whatever__{corner}.sdf"
+            ), f"SDF of {corner} not in its corner directory in {mode} mode"
+        assert sta_step.corner_mode == mode, f"Corners not analyzed in {mode} mode"
+        results[mode] = state_out.metrics.copy_mut()
+        reduced = sta_step.reduce_memory_usage()
+        if mode == "parallel":
+            assert reduced == {
+                "STA_CORNER_MODE": "sequential"
+            }, "Memory usage not reduced by analyzing corners sequentially"
+        else:
+            assert reduced is None, "Memory usage reduced beyond sequential mode"
+
+    for corner in corners:
+        assert results["sequential"][
+            f"checked__corner:{corner}"
+        ], f"Report of {corner} not in its corner directory"
+        for mode in ["parallel", "sequential"]:
+            paths = TimingPaths.load(os.path.join(dir, mode, corner, "max.paths"))
+            assert [(path.corner, path.slack) for path in paths.worst()] == [
+                (corner, len(corner))
+            ], f"Wrong path database in {mode} mode"
+    assert results["parallel"] == results["sequential"], "Metrics differ by mode"
+    assert results["parallel"]["timing__setup__ws"] == min(
+        len(corner) for corner in corners
+    ), "Per-corner metrics not aggregated"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_sta_corner_mode_automatic(monkeypatch: pytest.MonkeyPatch):
+    from typing import List, Literal, Optional
+    from openlane.steps import openroad
+    from openlane.config import Config, Variable
+    from openlane.state import State
+
+    monkeypatch.setattr(
+        openroad, "choose_sta_corner_mode", lambda *args, **kwargs: "sequential"
+    )
+
+    class TestSTA(openroad.STAStep):
+        id = "TestSTA"
+        inputs = []
+        outputs = []
+        config_vars = [
+            Variable("STA_CORNERS", List[str], "x"),
+            Variable(
+                "STA_CORNER_MODE",
+                Optional[Literal["parallel", "sequential"]],
+                "x",
+            ),
+        ]
+
+    class TestSTANotEquivalent(TestSTA):
+        id = "TestSTANotEquivalent"
+        sequential_corners_equivalent = False
+
+    config = Config(
+        {
+            "DESIGN_NAME": "whatever",
+            "DESIGN_DIR": "/cwd",
+            "EXAMPLE_PDK_VAR": "bla",
+            "PDK_ROOT": "/pdk",
+            "PDK": "dummy",
+            "STD_CELL_LIBRARY": "dummy_scl",
+            "VERILOG_FILES": ["/cwd/src/a.v"],
+            "GRT_REPAIR_ANTENNAS": True,
+            "RUN_HEURISTIC_DIODE_INSERTION": False,
+            "MACROS": None,
+            "DIODE_ON_PORTS": None,
+            "TECH_LEFS": {},
+            "DEFAULT_CORNER": "nom_tt_025C_1v80",
+            "STA_CORNERS": ["nom_tt_025C_1v80", "min_ss_100C_1v60"],
+            "STA_CORNER_MODE": None,
+        }
+    )
+
+    equivalent = TestSTA(config=config, state_in=State(), _no_revalidate_conf=True)
+    assert equivalent.get_cache_key_extras(State()) == {
+        "sta_corner_mode": "sequential"
+    }, "Automatically chosen mode not part of the cache key"
+
+    not_equivalent = TestSTANotEquivalent(
+        config=config, state_in=State(), _no_revalidate_conf=True
+    )
+    assert not_equivalent.get_cache_key_extras(State()) == {
+        "sta_corner_mode": "parallel"
+    }, "Mode performing a different analysis chosen automatically"
+    assert (
+        not_equivalent.reduce_memory_usage() is None
+    ), "Mode performing a different analysis chosen when out of memory"
+
+    not_equivalent = TestSTANotEquivalent(
+        config=config.copy(STA_CORNER_MODE="sequential"),
+        state_in=State(),
+        _no_revalidate_conf=True,
+    )
+    assert not_equivalent.get_cache_key_extras(State()) == {
+        "sta_corner_mode": "sequential"
+    }, "Explicitly requested mode not used"
@@ -380,3 +380,436 @@ def test_run_subprocess(mock_run):
 
     with pytest.raises(subprocess.CalledProcessError):
         step.run_subprocess(["false"])
+
+    assert [
+        (stats["command"], stats["returncode"]) for stats in step.subprocess_stats
+    ] == [
+        ("cat", 0),
+        ("false", 1),
+    ], ".run_subprocess() did not record the resource usage of subprocesses"
+
+
+def test_process_stats_tree():
+    import sys
+    import time
+    import psutil
+    from openlane.steps.step import ProcessStatsThread
+
+    # The memory is allocated by a child of the process being sampled
+    allocation = 64 * 1024 * 1024
+    script = f"import time; x = bytearray({allocation}); x[::4096] = b'1' * len(x[::4096]); time.sleep(0.5)"
+    process = psutil.Popen(["sh", "-c", f'"{sys.executable}" -c "{script}"; true'])
+    stats = ProcessStatsThread(process)
+    stats.start()
+    process.wait()
+    exited = time.time()
+    stats.stop()
+    stats.join()
+    assert time.time() - exited < 0.1, "Sampling thread did not stop immediately"
+
+    assert (
+        stats.peak_resources["memory_rss"] >= allocation
+    ), "Memory usage of child processes was not sampled"
+    assert (
+        0 < stats.avg_resources["memory_rss"] <= stats.peak_resources["memory_rss"]
+    ), "Invalid average memory usage"
+    assert len(stats.samples["time"]) > 1, "Time series was not recorded"
+    assert len(stats.samples["memory_rss"]) == len(
+        stats.samples["time"]
+    ), "Time series are misaligned"
+    assert stats.samples["time"] == sorted(
+        stats.samples["time"]
+    ), "Samples are out of order"
+
+
+def test_process_stats_final_sample():
+    import sys
+    import psutil
+    from openlane.steps.step import ProcessStatsThread, wait_no_reap
+
+    script = "import time\nend = time.time() + 0.3\nwhile time.time() < end: pass"
+    process = psutil.Popen([sys.executable, "-c", script])
+    # Only sampled when started and when stopped
+    stats = ProcessStatsThread(process, min_interval=10, max_interval=10)
+    stats.start()
+    wait_no_reap(process)
+    stats.stop()
+    stats.join()
+    assert process.wait() == 0, "Process not waited for"
+
+    assert len(stats.samples["time"]) == 2, "Last sample not taken"
+    assert (
+        stats.time["cpu_time_user"] + stats.time["cpu_time_system"] >= 0.2
+    ), "CPU time of the exited process not sampled"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_step_cache(mock_config):
+    import json
+    from openlane.common import Path
+    from openlane.common import Toolbox
+    from openlane.state import DesignFormat, State
+    from openlane.steps import Step
+    from openlane.steps.cache import StepCache, set_step_cache, get_step_cache
+
+    with open("test.nl.v", "w") as f:
+        f.write("module a; endmodule\n")
+
+    run_count = 0
+    choice = "a"
+
+    class TestStep(Step):
+        inputs = [DesignFormat.NETLIST]
+        outputs = [DesignFormat.POWERED_NETLIST]
+        id = "TestStep"
+
+        def get_cache_key_extras(self, state_in):
+            return {"choice": choice}
+
+        def run(self, state_in, **kwargs):
+            nonlocal run_count
+            run_count += 1
+            out_path = os.path.join(self.step_dir, "test.pnl.v")
+            with open(out_path, "w") as f:
+                f.write(open(state_in[DesignFormat.NETLIST]).read())
+            return {DesignFormat.POWERED_NETLIST: Path(out_path)}, {"runs": 1}
+
+    def start(step_dir):
+        step = TestStep(
+            config=mock_config,
+            state_in=State({DesignFormat.NETLIST: Path("/cwd/test.nl.v")}),
+        )
+        return step, step.start(toolbox=Toolbox(tmp_dir="/cwd/tmp"), step_dir=step_dir)
+
+    previous_cache = get_step_cache()
+    set_step_cache(StepCache("/cache"))
+    try:
+        step_a, state_a = start("/cwd/a")
+        step_b, state_b = start("/cwd/b")
+        choice = "c"
+        step_c, _ = start("/cwd/c")
+    finally:
+        set_step_cache(previous_cache)
+
+    assert run_count == 2, "step was re-run despite a cached result"
+    assert (
+        step_c.cache_stats is not None and step_c.cache_stats["misses"] == 1
+    ), "choice made by the step not part of the cache key"
+    assert step_a.cache_stats is not None and step_a.cache_stats["misses"] == 1
+    assert step_b.cache_stats is not None and step_b.cache_stats["hits"] == 1
+    assert (
+        state_b[DesignFormat.POWERED_NETLIST] == "/cwd/b/test.pnl.v"
+    ), "cached view was not restored into the step directory"
+    assert (
+        open("/cwd/b/test.pnl.v").read() == "module a; endmodule\n"
+    ), "restored view has mismatched contents"
+    assert state_b.metrics == state_a.metrics, "cached metrics mismatched"
+    assert (
+        json.load(open("/cwd/b/cache.json"))["bytes_restored"] == 20
+    ), "step directory cache statistics are incorrect"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_step_compressed_views(mock_config):
+    import gzip
+    from openlane.config import Variable
+    from openlane.common import Path
+    from openlane.common import Toolbox
+    from openlane.state import DesignFormat, State
+    from openlane.steps import Step
+
+    with gzip.open("/cwd/test.nl.v.gz", "wt") as f:
+        f.write("module a; endmodule\n")
+
+    class TestStep(Step):
+        inputs = [DesignFormat.NETLIST]
+        outputs = [DesignFormat.POWERED_NETLIST]
+        id = "TestStep"
+        # Not among the mocked flow variables
+        config_vars = [Variable("COMPRESS_VIEWS", bool, "x", default=False)]
+
+        def run(self, state_in, **kwargs):
+            netlist = state_in[DesignFormat.NETLIST]
+            assert not netlist.endswith(".gz"), "input not decompressed"
+            out_path = os.path.join(self.step_dir, "test.pnl.v")
+            with open(out_path, "w") as f:
+                f.write(open(netlist).read())
+            return {
+                DesignFormat.NETLIST: netlist,
+                DesignFormat.POWERED_NETLIST: Path(out_path),
+            }, {}
+
+    step = TestStep(
+        config=mock_config.copy(COMPRESS_VIEWS=True),
+        state_in=State({DesignFormat.NETLIST: Path("/cwd/test.nl.v.gz")}),
+    )
+    state_out = step.start(toolbox=Toolbox(tmp_dir="/cwd/tmp"), step_dir="/cwd/step")
+    assert (
+        state_out[DesignFormat.NETLIST] == "/cwd/test.nl.v.gz"
+    ), "passed-through input does not point to the compressed original"
+    assert (
+        state_out[DesignFormat.POWERED_NETLIST] == "/cwd/step/test.pnl.v.gz"
+    ), "output not compressed"
+    assert (
+        gzip.open("/cwd/step/test.pnl.v.gz", "rt").read() == "module a; endmodule\n"
+    ), "output compressed incorrectly"
+    assert not os.path.exists(
+        "/cwd/step/decompressed"
+    ), "decompressed inputs not removed"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_step_oom_retry():
+    import sys
+    import json
+    from decimal import Decimal
+    from typing import Optional
+    from openlane.steps import Step
+    from openlane.config import Config, Variable
+    from openlane.state import State
+
+    dir = os.getcwd()
+
+    class TestStep(Step):
+        inputs = []
+        outputs = []
+        id = "TestStep"
+        # Not among the mocked flow variables
+        config_vars = [
+            Variable("STEP_MEMORY_LIMIT", Optional[Decimal], "x"),
+            Variable("STEP_OOM_RETRIES", int, "x", default=2),
+            Variable("THREADS", int, "x"),
+        ]
+
+        def run(self, state_in, **kwargs):
+            # Allocates 64 MiB per "thread"
+            size = self.config["THREADS"] * 64 * 1024 * 1024
+            self.run_subprocess(
+                [sys.executable, "-c", f"bytearray({size})"],
+                silent=True,
+            )
+            return {}, {}
+
+        def reduce_memory_usage(self):
+            if self.config["THREADS"] <= 1:
+                return None
+            return {"THREADS": self.config["THREADS"] // 2}
+
+    def make_step(threads):
+        config = Config(
+            {
+                "DESIGN_NAME": "whatever",
+                "DESIGN_DIR": dir,
+                "EXAMPLE_PDK_VAR": "bla",
+                "PDK_ROOT": "/pdk",
+                "PDK": "dummy",
+                "STD_CELL_LIBRARY": "dummy_scl",
+                "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+                "GRT_REPAIR_ANTENNAS": True,
+                "RUN_HEURISTIC_DIODE_INSERTION": False,
+                "MACROS": None,
+                "DIODE_ON_PORTS": None,
+                "TECH_LEFS": {
+                    "nom_*": "/pdk/dummy/libs.ref/techlef/dummy_scl/dummy_tech_lef.tlef"
+                },
+                "DEFAULT_CORNER": "nom_tt_025C_1v80",
+                "STEP_MEMORY_LIMIT": Decimal("0.25"),
+                "STEP_OOM_RETRIES": 2,
+                "THREADS": threads,
+            }
+        )
+        return TestStep(config=config, state_in=State(), _no_revalidate_conf=True)
+
+    test_step = make_step(threads=8)
+    state_out = test_step.start(step_dir=os.path.join(dir, "retried"))
+    assert test_step.config["THREADS"] == 2, "Step not retried with fewer threads"
+    assert test_step.oom_retries == 2, "Retries not counted"
+    with open(os.path.join(dir, "retried", "profile.json"), encoding="utf8") as f:
+        assert json.load(f)["oom_retries"] == 2, "Retries not recorded in the profile"
+    assert (
+        "run__oom_retry__count__step:TestStep" not in state_out.metrics
+    ), "Retries recorded as a design metric"
+
+    test_step = make_step(threads=64)
+    with pytest.raises(step.StepError, match="ran out of memory"):
+        test_step.start(step_dir=os.path.join(dir, "failed"))
+
+
+def test_memory_limit_ran_out():
+    import signal
+    from openlane.steps.memory_limit import MemoryLimit
+
+    memory_limit = MemoryLimit(1000)
+    assert not memory_limit.ran_out(
+        -signal.SIGKILL, [], 100
+    ), "Killed process considered out of memory"
+    assert memory_limit.ran_out(1, [], 950), "Process at the limit not out of memory"
+    assert memory_limit.ran_out(
+        1, ["terminate called after throwing an instance of 'std::bad_alloc'"], 100
+    ), "Allocation failure not considered out of memory"
+    assert not memory_limit.ran_out(
+        0, [], 1000
+    ), "Successful process considered out of memory"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_step_signalled():
+    import sys
+    from openlane.steps import Step
+    from openlane.config import Config
+    from openlane.state import State
+
+    class TestStep(Step):
+        inputs = []
+        outputs = []
+        id = "TestStep"
+
+        def run(self, state_in, **kwargs):
+            self.run_subprocess(
+                [
+                    sys.executable,
+                    "-c",
+                    "import os, signal; print('out of memory'); os.kill(os.getpid(), signal.SIGKILL)",
+                ],
+                silent=True,
+            )
+            return {}, {}
+
+    config = Config(
+        {
+            "DESIGN_NAME": "whatever",
+            "DESIGN_DIR": os.getcwd(),
+            "EXAMPLE_PDK_VAR": "bla",
+            "PDK_ROOT": "/pdk",
+            "PDK": "dummy",
+            "STD_CELL_LIBRARY": "dummy_scl",
+            "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+            "GRT_REPAIR_ANTENNAS": True,
+            "RUN_HEURISTIC_DIODE_INSERTION": False,
+            "MACROS": None,
+            "DIODE_ON_PORTS": None,
+            "TECH_LEFS": {},
+            "DEFAULT_CORNER": "nom_tt_025C_1v80",
+        }
+    )
+    test_step = TestStep(config=config, state_in=State(), _no_revalidate_conf=True)
+    # Without a memory limit, neither SIGKILL nor the output indicate that
+    # the subprocess ran out of memory
+    with pytest.raises(step.StepSignalled, match="SIGKILL"):
+        test_step.start(step_dir=os.path.join(os.getcwd(), "killed"))
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_run_subprocess_large_log(mock_run):
+    import sys
+    import subprocess
+    from openlane.steps import Step
+    from openlane.config import Config
+    from openlane.state import DesignFormat, State
+
+    log_size = 8 * 1024 * 1024
+
+    dir = os.getcwd()
+
+    class StepTest(Step):
+        inputs = []
+        outputs = []
+        id = "LargeLogStep"
+        step_dir = dir
+        run = mock_run
+
+    config_dict = {
+        "DESIGN_NAME": "whatever",
+        "DESIGN_DIR": dir,
+        "EXAMPLE_PDK_VAR": "bla",
+        "PDK_ROOT": "/pdk",
+        "PDK": "dummy",
+        "STD_CELL_LIBRARY": "dummy_scl",
+        "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+        "GRT_REPAIR_ANTENNAS": True,
+        "RUN_HEURISTIC_DIODE_INSERTION": False,
+        "MACROS": None,
+        "DIODE_ON_PORTS": None,
+        "TECH_LEFS": {
+            "nom_*": "/pdk/dummy/libs.ref/techlef/dummy_scl/dummy_tech_lef.tlef"
+        },
+        "DEFAULT_CORNER": "nom_tt_025C_1v80",
+    }
+    step = StepTest(
+        config=Config(config_dict),
+        state_in=State({DesignFormat.NETLIST: "abc"}),
+        _no_revalidate_conf=True,
+    )
+
+    generator = textwrap.dedent(
+        """
+        import sys
+        target, exit_code = int(sys.argv[1]), int(sys.argv[2])
+        line = "[INFO] " + "x" * 120 + "\\n"
+        chunk = line * 1024
+        written = 0
+        i = 0
+        while written < target:
+            if i % 64 == 0:
+                sys.stdout.write(f"%OL_CREATE_REPORT report_{i % 4}.rpt\\n")
+                sys.stdout.write(chunk)
+                sys.stdout.write("%OL_END_REPORT\\n")
+            else:
+                sys.stdout.write(chunk)
+            sys.stdout.write(f"%OL_METRIC_I chunks {i + 1}\\n")
+            written += len(chunk)
+            i += 1
+        sys.stdout.write("last line\\n")
+        sys.exit(exit_code)
+        """
+    )
+
+    metrics = step.run_subprocess(
+        [sys.executable, "-c", generator, str(log_size), "0"],
+        silent=True,
+        log_to="large.log",
+    )
+
+    assert os.path.getsize("large.log") >= log_size, "log file was truncated"
+    chunk_size = 128 * 1024
+    assert (
+        metrics["chunks"] == (log_size + chunk_size - 1) // chunk_size
+    ), "metrics were not processed"
+    assert os.path.exists("report_0.rpt"), "reports were not created"
+
+    with pytest.raises(subprocess.CalledProcessError):
+        step.run_subprocess(
+            [sys.executable, "-c", generator, str(1024), "1"],
+            silent=True,
+            log_to="failure.log",
+        )
+
+
+def test_step_factory_lazy():
+    import sys
+    import subprocess
+
+    script = textwrap.dedent(
+        """
+        import sys
+        from openlane.steps import Step
+
+        assert "openlane.steps.openroad" not in sys.modules
+        Step.factory.get("OpenROAD.STAPrePNR")
+        assert "openlane.steps.openroad" in sys.modules
+        assert "openlane.steps.magic" not in sys.modules
+        """
+    )
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, env=env
+    )
+    assert (
+        result.returncode == 0
+    ), f"Step modules not imported on retrieval:\n{result.stderr.decode('utf8')}"
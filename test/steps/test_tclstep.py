@@ -194,3 +194,89 @@ def test_env(mock_config):  # noqa: F811
             assert env[var] == TclStep.value_to_tcl(
                 mock_config[var]
             ), "Wrong prepared env. Mismatching configuration variable"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_env_config_file(mock_config, monkeypatch):  # noqa: F811
+    import os
+    from openlane.steps import TclStep
+    from openlane.steps.tclstep import CONFIG_FILE_ENV_VAR, CONFIG_FILE_POINTER
+    from openlane.state import DesignFormat, State
+
+    monkeypatch.setenv(CONFIG_FILE_ENV_VAR, "1")
+    state_in = State({DesignFormat.NETLIST: "abc"})
+
+    class TclStepTest(TclStep):
+        inputs = [DesignFormat.NETLIST]
+        outputs = [DesignFormat.NETLIST]
+        id = "Test.TclStep"
+        step_dir = "/dummy_step_dir"
+        reads_config_file = True
+
+        def get_script_path(self):
+            return "/dummy_path"
+
+    step = TclStepTest(config=mock_config, state_in=state_in)
+    env = step.prepare_env({"DESIGN_NAME": "stale", "EXTRA": "1"}, state_in)
+    assert env["CURRENT_NETLIST"] == "abc", "Inputs not passed in the environment"
+    assert env["EXTRA"] == "1", "Unrelated environment variable dropped"
+    assert env["PDK"] == mock_config["PDK"], "PDK not passed in the environment"
+    assert "DESIGN_NAME" not in env, "Configuration variable in the environment"
+
+    config_file = env[CONFIG_FILE_POINTER]
+    assert (
+        os.path.dirname(config_file) == TclStepTest.step_dir
+    ), "Config file not written to the step directory"
+    interpreter = tkinter.Tcl()
+    interpreter.setvar("config", open(config_file, encoding="utf8").read())
+    config = interpreter.eval("dict get $config DESIGN_NAME")
+    assert config == mock_config["DESIGN_NAME"], "Wrong value in config file"
+
+    assert (
+        step.prepare_env({}, state_in)[CONFIG_FILE_POINTER] == config_file
+    ), "Config file not reused for an identical configuration"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_config_tcl():
+    import os
+    from openlane.common import get_script_dir
+    from openlane.steps.tclstep import CONFIG_FILE_POINTER, write_config_file
+
+    config_file = write_config_file(
+        {
+            "_TEST_CONFIG_STRING": "a [b] {c}",
+            "_TEST_CONFIG_LIST": 'x "y z"',
+            "_TEST_CONFIG_OVERRIDDEN": "config",
+        },
+        os.getcwd(),
+    )
+
+    interpreter = tkinter.Tcl()
+    try:
+        interpreter.eval(
+            f"""
+            set ::env({CONFIG_FILE_POINTER}) {{{config_file}}}
+            set ::env(_TEST_CONFIG_OVERRIDDEN) step
+            source {{{os.path.join(get_script_dir(), "config.tcl")}}}
+            """
+        )
+        assert (
+            interpreter.eval("set ::env(_TEST_CONFIG_STRING)") == "a [b] {c}"
+        ), "String not loaded verbatim"
+        assert (
+            interpreter.eval("lindex $::env(_TEST_CONFIG_LIST) 1") == "y z"
+        ), "List not loaded"
+        assert (
+            interpreter.eval("set ::env(_TEST_CONFIG_OVERRIDDEN)") == "step"
+        ), "Value set by the step overridden"
+    finally:
+        interpreter.eval(
+            f"""
+            foreach key [array names ::env _TEST_CONFIG_*] {{
+                unset ::env($key)
+            }}
+            unset ::env({CONFIG_FILE_POINTER})
+            """
+        )
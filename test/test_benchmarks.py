@@ -0,0 +1,386 @@
+# Copyright 2023 Efabless Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Benchmarks, which print their timings and are only run with --benchmark.
+# The behavior they exercise is tested by the unit tests of each module.
+import os
+import re
+import sys
+import time
+import textwrap
+
+import pytest
+
+from openlane.steps import step
+
+mock_variables = pytest.mock_variables
+
+
+@pytest.fixture(autouse=True)
+def _benchmark_only(request: pytest.FixtureRequest):
+    if not request.config.getoption("--benchmark"):
+        pytest.skip("benchmarks are only run with --benchmark")
+
+
+@pytest.fixture()
+def mock_run():
+    def run(self, state_in, **kwargs):
+        return {}, {}
+
+    return run
+
+
+def _remove_cells_line_based(input_path, output_path, excluded_cells):
+    # The line-based implementation remove_cells replaced, used as a reference
+    cell_start_rx = re.compile(r"(\s*)cell\s*\(\"?(.*?)\"?\)\s*\{")
+    in_cell = False
+    excluded = False
+    brace_count = 0
+    with open(input_path, encoding="utf8") as i, open(
+        output_path, "w", encoding="utf8"
+    ) as o:
+        write = lambda x: print(x, file=o, end="")
+        for line in i:
+            if not in_cell:
+                cell_m = cell_start_rx.search(line)
+                if cell_m is not None:
+                    in_cell = True
+                    excluded = cell_m[2] in excluded_cells
+                    brace_count = 1
+                    if excluded:
+                        write(f"{cell_m[1]}/* removed {cell_m[2]} */\n")
+                        continue
+                write(line)
+            else:
+                if "{" in line:
+                    brace_count += 1
+                if "}" in line:
+                    brace_count -= 1
+                if not excluded:
+                    write(line)
+                if brace_count == 0:
+                    in_cell = False
+
+
+# Replays a multi-gigabyte log.
+@pytest.mark.usefixtures("_chdir_tmp")
+@mock_variables([step])
+def test_run_subprocess_benchmark(mock_run):
+    import resource
+    from openlane.steps import Step
+    from openlane.config import Config
+    from openlane.state import DesignFormat, State
+
+    log_size = 2 * 1024 * 1024 * 1024
+    dir = os.getcwd()
+
+    class StepTest(Step):
+        inputs = []
+        outputs = []
+        id = "BenchmarkStep"
+        step_dir = dir
+        run = mock_run
+
+    config_dict = {
+        "DESIGN_NAME": "whatever",
+        "DESIGN_DIR": dir,
+        "EXAMPLE_PDK_VAR": "bla",
+        "PDK_ROOT": "/pdk",
+        "PDK": "dummy",
+        "STD_CELL_LIBRARY": "dummy_scl",
+        "VERILOG_FILES": ["/cwd/src/a.v", "/cwd/src/b.v"],
+        "GRT_REPAIR_ANTENNAS": True,
+        "RUN_HEURISTIC_DIODE_INSERTION": False,
+        "MACROS": None,
+        "DIODE_ON_PORTS": None,
+        "TECH_LEFS": {
+            "nom_*": "/pdk/dummy/libs.ref/techlef/dummy_scl/dummy_tech_lef.tlef"
+        },
+        "DEFAULT_CORNER": "nom_tt_025C_1v80",
+    }
+    step = StepTest(
+        config=Config(config_dict),
+        state_in=State({DesignFormat.NETLIST: "abc"}),
+        _no_revalidate_conf=True,
+    )
+
+    generator = textwrap.dedent(
+        """
+        import sys
+        target = int(sys.argv[1])
+        line = "[INFO] " + "x" * 120 + "\\n"
+        chunk = line * 1024
+        written = 0
+        i = 0
+        while written < target:
+            if i % 64 == 0:
+                sys.stdout.write(f"%OL_CREATE_REPORT report_{i % 4}.rpt\\n")
+                sys.stdout.write(chunk)
+                sys.stdout.write("%OL_END_REPORT\\n")
+            else:
+                sys.stdout.write(chunk)
+            sys.stdout.write(f"%OL_METRIC_I chunks {i + 1}\\n")
+            written += len(chunk)
+            i += 1
+        """
+    )
+
+    maxrss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    step.run_subprocess(
+        [sys.executable, "-c", generator, str(log_size)],
+        silent=True,
+        log_to="benchmark.log",
+    )
+    elapsed = time.time() - start
+    maxrss_growth = (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - maxrss_before
+    ) * 1024
+
+    log_bytes = os.path.getsize("benchmark.log")
+    print(
+        f"run_subprocess: {log_bytes / elapsed / (1024 ** 2):.1f} MiB/s over {log_bytes} bytes, peak RSS growth {maxrss_growth} bytes"
+    )
+    assert (
+        maxrss_growth < 256 * 1024 * 1024
+    ), "subprocess output was accumulated in memory"
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+@mock_variables([step])
+def test_step_construction_benchmark(mock_run, mock_config):
+    from openlane.steps import Step
+    from openlane.config import Config
+    from openlane.state import State
+
+    count = 1000
+
+    class StepTest(Step):
+        inputs = []
+        outputs = []
+        id = "BenchmarkStep"
+        run = mock_run
+
+    def construct(cached: bool) -> float:
+        Config.clear_increment_cache()
+        start = time.perf_counter()
+        for _ in range(count):
+            if not cached:
+                Config.clear_increment_cache()
+            StepTest(config=mock_config, state_in=State())
+        return (time.perf_counter() - start) / count
+
+    uncached = construct(cached=False)
+    cached = construct(cached=True)
+    print(
+        f"Step construction: {uncached * 1e6:.1f}us uncached, {cached * 1e6:.1f}us cached over {count} steps"
+    )
+
+
+# Run with --pdk-root to use real liberty files instead of a synthetic one.
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_remove_cells_benchmark(request: pytest.FixtureRequest):
+    import glob
+    from openlane.common.liberty import remove_cells
+
+    lib_files = []
+    if pdk_root := request.config.getoption("--pdk-root"):
+        lib_files = sorted(
+            glob.glob(
+                os.path.join(pdk_root, "sky130A", "libs.ref", "*", "lib", "*.lib")
+            )
+        )[:4]
+
+    if len(lib_files) == 0:
+        with open("synthetic.lib", "w", encoding="utf8") as f:
+            f.write('library ("synthetic") {\n')
+            for i in range(200000):
+                f.write(
+                    f'    cell ("cell_{i}") {{\n'
+                    "        area : 1.0;\n"
+                    '        pin ("A") {\n'
+                    "            direction : input;\n"
+                    "            capacitance : 0.001;\n"
+                    "        }\n"
+                    '        pin ("Y") {\n'
+                    "            direction : output;\n"
+                    '            function : "!A";\n'
+                    "            timing () {\n"
+                    '                related_pin : "A";\n'
+                    '                cell_rise ("del_1_7_7") {\n'
+                    '                    values ("0.1, 0.2", "0.3, 0.4");\n'
+                    "                }\n"
+                    "            }\n"
+                    "        }\n"
+                    "    }\n"
+                )
+            f.write("}\n")
+        lib_files = ["synthetic.lib"]
+
+    for i, lib_file in enumerate(lib_files):
+        with open(lib_file, encoding="utf8") as f:
+            cells = re.findall(r"^\s*cell\s*\(\s*\"?(.*?)\"?\s*\)", f.read(), re.M)
+        excluded_cells = frozenset(cells[::3])
+
+        start = time.time()
+        _remove_cells_line_based(lib_file, f"{i}.reference.lib", excluded_cells)
+        reference_elapsed = time.time() - start
+
+        start = time.time()
+        remove_cells(lib_file, f"{i}.lib", excluded_cells)
+        elapsed = time.time() - start
+
+        print(
+            f"{lib_file}: {os.path.getsize(lib_file)} bytes, "
+            f"{reference_elapsed:.2f}s (line-based) vs. {elapsed:.2f}s"
+        )
+        assert (
+            open(f"{i}.lib", "rb").read() == open(f"{i}.reference.lib", "rb").read()
+        ), f"output for '{lib_file}' differs from the line-based implementation"
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_compressed_views_benchmark():
+    from openlane.state import DesignFormat, compress_views, decompress_views, State
+    from openlane.common import Path
+
+    with open("test.spef", "w") as f:
+        f.write('*SPEF "IEEE 1481-1998"\n*DESIGN "test"\n')
+        for i in range(400000):
+            f.write(
+                f"*D_NET net{i} 0.0{i % 97}\n*CONN\n*I _{i}_:A I *L 0.00{i % 13}\n"
+                f"*CAP\n1 _{i}_:A 0.000{i % 89}\n*RES\n1 _{i}_:A _{i + 1}_:Y 0.{i % 7}\n"
+                "*END\n\n"
+            )
+    size = os.path.getsize("test.spef")
+
+    start = time.time()
+    views = compress_views(
+        {DesignFormat.SPEF: {"nom": Path(os.path.abspath("test.spef"))}}, "."
+    )
+    compression_elapsed = time.time() - start
+    compressed_size = os.path.getsize(views[DesignFormat.SPEF]["nom"])
+
+    start = time.time()
+    decompress_views(State(views), [DesignFormat.SPEF], os.path.abspath("tmp"))
+    decompression_elapsed = time.time() - start
+
+    print(
+        f"{size} bytes -> {compressed_size} bytes ({size / compressed_size:.1f}x), "
+        f"compressed in {compression_elapsed:.2f}s, "
+        f"decompressed in {decompression_elapsed:.2f}s"
+    )
+
+
+@pytest.mark.usefixtures("_mock_conf_fs")
+def test_pdk_cache_benchmark(monkeypatch: pytest.MonkeyPatch):
+    from openlane.config.pdk_cache import load_pdk_env, PDK_CACHE_ENV_VAR
+
+    count = 500
+
+    def load() -> float:
+        start = time.perf_counter()
+        for _ in range(count):
+            load_pdk_env("/pdk", "dummy", None)
+        return (time.perf_counter() - start) / count
+
+    monkeypatch.setenv(PDK_CACHE_ENV_VAR, "0")
+    uncached = load()
+    monkeypatch.setenv(PDK_CACHE_ENV_VAR, "1")
+    load_pdk_env("/pdk", "dummy", None)
+    cached = load()
+    print(
+        f"PDK configuration: {uncached * 1e3:.2f}ms evaluated, {cached * 1e3:.2f}ms cached over {count} loads"
+    )
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_import_time_benchmark():
+    import subprocess
+
+    runs = 10
+
+    env = os.environ.copy()
+    env["XDG_CACHE_HOME"] = os.getcwd()
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+
+    commands = {
+        "import openlane": [sys.executable, "-c", "import openlane"],
+        "openlane --version": [sys.executable, "-m", "openlane", "--version"],
+    }
+    for name, command in commands.items():
+        elapsed = 0.0
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.check_call(command, stdout=subprocess.DEVNULL, env=env)
+            elapsed += time.perf_counter() - start
+        print(f"{name}: {elapsed / runs * 1000:.0f}ms")
+
+
+TIMING_REPORT = """
+Startpoint: _1_ (rising edge-triggered flip-flop clocked by clk)
+Endpoint: _2_ (rising edge-triggered flip-flop clocked by clk)
+Path Group: clk
+Path Type: max
+
+Fanout     Cap    Slew   Delay    Time   Description
+-----------------------------------------------------------------------------
+                          0.00    0.00   clock clk (rise edge)
+                          0.00    0.00   clock source latency
+     1    0.01    0.03    0.02    0.02 ^ clk (in)
+                                         clk (net)
+                  0.03    0.00    0.02 ^ _1_/CLK (sky130_fd_sc_hd__dfxtp_1)
+     2    0.00    0.05    0.31    0.33 v _1_/Q (sky130_fd_sc_hd__dfxtp_1)
+                                         net1 (net)
+                  0.05    0.00    0.33 v _2_/D (sky130_fd_sc_hd__dfxtp_1)
+                                  0.33   data arrival time
+
+                         10.00   10.00   clock clk (rise edge)
+                          0.00   10.00   clock source latency
+     1    0.01    0.03    0.02   10.02 ^ clk (in)
+                  0.03    0.00   10.02 ^ _2_/CLK (sky130_fd_sc_hd__dfxtp_1)
+                         -0.25    9.77   clock uncertainty
+                         -0.12    9.65   library setup time
+                                  9.65   data required time
+-----------------------------------------------------------------------------
+                                  9.65   data required time
+                                 -0.33   data arrival time
+-----------------------------------------------------------------------------
+                                  9.32   slack (MET)
+
+"""
+
+
+@pytest.mark.usefixtures("_chdir_tmp")
+def test_timing_paths_benchmark():
+    from openlane.common.timing_paths import TimingPaths, write_path_database
+
+    copies = 150000
+    with open("max.rpt", "w") as f:
+        for _ in range(copies):
+            f.write(TIMING_REPORT)
+    report_bytes = os.path.getsize("max.rpt")
+
+    start = time.time()
+    database_path = write_path_database("max.rpt", "nom_tt_025C_1v80")
+    elapsed = time.time() - start
+
+    start = time.time()
+    paths = TimingPaths.load(database_path)
+    paths.worst(100)
+    load_elapsed = time.time() - start
+
+    print(
+        f"TimingPaths: {report_bytes / elapsed / (1024 ** 2):.1f} MiB/s over {report_bytes} bytes, database {os.path.getsize(database_path)} bytes, loaded and queried in {load_elapsed:.3f}s"
+    )